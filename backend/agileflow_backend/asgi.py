@@ -2,6 +2,9 @@
 ASGI config for agileflow_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+With ASGI_ASYNC_READ_VIEWS on, requests are routed with ASGI_URLCONF, which
+serves the hot read endpoints (and the change feed) with the async views in
+api.async_views; otherwise they get the same sync views as under WSGI.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -9,8 +12,37 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'agileflow_backend.settings')
 
-application = get_asgi_application()
+
+class AsyncReadsASGIHandler(ASGIHandler):
+    """
+    ASGIHandler resolving requests with ASGI_URLCONF instead of ROOT_URLCONF
+    when `async_reads` is true. It defaults to the ASGI_ASYNC_READ_VIEWS setting.
+    """
+
+    def __init__(self, async_reads=None):
+        super().__init__()
+        self.async_reads = async_reads
+
+    def create_request(self, scope, body_file):
+        request, error_response = super().create_request(scope, body_file)
+        async_reads = self.async_reads
+        if async_reads is None:
+            async_reads = getattr(settings, 'ASGI_ASYNC_READ_VIEWS', False)
+        if request is not None and async_reads:
+            request.urlconf = getattr(settings, 'ASGI_URLCONF', settings.ROOT_URLCONF)
+        return request, error_response
+
+
+def get_application():
+    # What get_asgi_application() does, with the handler above
+    django.setup(set_prefix=False)
+    return AsyncReadsASGIHandler()
+
+
+application = get_application()
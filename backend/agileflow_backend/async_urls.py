@@ -0,0 +1,12 @@
+"""
+URL configuration of the ASGI application: the async read views first,
+then everything in ROOT_URLCONF.
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/', include('api.async_urls')),
+    *sync_urlpatterns,
+]
@@ -0,0 +1,228 @@
+"""
+Per-endpoint cost accounting: SQL query count and time, response rendering
+time and wall time for every request, kept as rolling samples per view
+action. Queries are observed with a connection execute_wrapper, so nothing
+depends on DEBUG and the per-query overhead is a counter and a dict update.
+"""
+import logging
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# render_ms is encoding the response body; building serializer data happens
+# in the view, so it counts towards app_ms
+METRICS = ('queries', 'db_ms', 'render_ms', 'app_ms', 'total_ms')
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(ordered, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, -(-len(ordered) * pct // 100) - 1)
+    return ordered[index]
+
+
+class EndpointStats:
+    """Rolling samples of one endpoint, the most recent `size` requests"""
+
+    def __init__(self, size):
+        self.count = 0
+        self.samples = deque(maxlen=size)
+
+    def add(self, sample):
+        self.count += 1
+        self.samples.append(sample)
+
+    def as_dict(self):
+        samples = list(self.samples)
+        summary = {'count': self.count, 'samples': len(samples)}
+        for index, metric in enumerate(METRICS):
+            ordered = sorted(sample[index] for sample in samples)
+            summary[metric] = {
+                f'p{pct}': round(percentile(ordered, pct), 2) for pct in PERCENTILES
+            }
+            summary[metric]['max'] = round(ordered[-1], 2)
+        return summary
+
+
+class RequestStats:
+    """Endpoint name -> EndpointStats for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, sample):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                size = getattr(settings, 'REQUEST_STATS_SAMPLES', 1000)
+                stats = self._endpoints[endpoint] = EndpointStats(size)
+            stats.add(sample)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def as_dict(self):
+        with self._lock:
+            endpoints = {name: stats for name, stats in self._endpoints.items() if stats.samples}
+            return {name: endpoints[name].as_dict() for name in sorted(endpoints)}
+
+
+stats = RequestStats()
+
+
+class QueryRecorder:
+    """execute_wrapper counting queries, their time and repeats of the same SQL"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[sql] += 1
+
+    def duplicates(self, threshold):
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+# The recorder of the async request being handled (see RequestStatsMiddleware)
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+def record_current_query(execute, sql, params, many, context):
+    """execute_wrapper handing each query to the recorder of the request that ran it"""
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def watch_connection(sender, connection, **kwargs):
+    # First, not last: connections open inside an execute_wrapper() block,
+    # which pops the last wrapper when it exits
+    if record_current_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_current_query)
+
+
+connection_created.connect(watch_connection)
+
+
+def endpoint_name(view_func, request):
+    """`TaskViewSet.list` for DRF viewsets, the view's dotted name otherwise"""
+    view_class = getattr(view_func, 'cls', None)
+    if view_class is not None:
+        actions = getattr(view_func, 'actions', None) or {}
+        action = actions.get(request.method.lower(), request.method.lower())
+        return f'{view_class.__name__}.{action}'
+    return f'{view_func.__module__}.{getattr(view_func, "__qualname__", view_func.__class__.__name__)}'
+
+
+class RequestStatsMiddleware:
+    """
+    Records what every request to a resolved view cost and reports it in a
+    Server-Timing header. Should be first in MIDDLEWARE so the wall time
+    covers the whole stack. Statements repeated at least
+    REQUEST_STATS_DUPLICATE_QUERY_THRESHOLD times in one request (the
+    signature of an N+1 loop) are logged as warnings.
+
+    Under ASGI the ORM runs in worker threads, so queries are attributed
+    through a context variable that follows the request into those threads
+    and a wrapper every connection gets when it is opened.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_STATS_ENABLED', True)
+        self.duplicate_threshold = getattr(settings, 'REQUEST_STATS_DUPLICATE_QUERY_THRESHOLD', 10)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        started = time.perf_counter()
+        recorder = QueryRecorder()
+        request._stats_render_seconds = 0.0
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        started = time.perf_counter()
+        recorder = QueryRecorder()
+        request._stats_render_seconds = 0.0
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    def finish(self, request, response, recorder, total):
+        """Record the request's sample and add the Server-Timing header"""
+        endpoint = getattr(request, '_stats_endpoint', None)
+        if endpoint is None:
+            return response
+        render = request._stats_render_seconds
+        sample = (
+            recorder.count,
+            recorder.seconds * 1000,
+            render * 1000,
+            max(total - recorder.seconds - render, 0) * 1000,
+            total * 1000,
+        )
+        stats.record(endpoint, sample)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={sample[1]:.1f};desc="{recorder.count} queries"',
+            f'render;dur={sample[2]:.1f}',
+            f'app;dur={sample[3]:.1f}',
+            f'total;dur={sample[4]:.1f}',
+        ])
+        for sql, count in recorder.duplicates(self.duplicate_threshold):
+            logger.warning("%s ran the same query %d times: %s", endpoint, count, sql)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.enabled:
+            request._stats_endpoint = endpoint_name(view_func, request)
+
+    def process_template_response(self, request, response):
+        # DRF responses render their body after the view returns; time that step
+        if self.enabled:
+            render = response.render
+
+            def timed_render():
+                started = time.perf_counter()
+                try:
+                    return render()
+                finally:
+                    request._stats_render_seconds += time.perf_counter() - started
+                    del response.render
+
+            response.render = timed_render
+        return response
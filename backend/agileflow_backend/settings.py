@@ -43,6 +43,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its wall time covers every other middleware
+    'agileflow_backend.instrumentation.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -54,6 +56,12 @@ MIDDLEWARE = [
 ]
 
 ROOT_URLCONF = 'agileflow_backend.urls'
+# URLconf of the ASGI application when ASGI_ASYNC_READ_VIEWS is on: the hot
+# read endpoints served by async views, and the change feed
+ASGI_URLCONF = 'agileflow_backend.async_urls'
+# Off until the async views beat the sync ones: benchmark_concurrency still
+# measures them slower under ASGI than the WSGI thread pool
+ASGI_ASYNC_READ_VIEWS = False
 
 TEMPLATES = [
     {
@@ -89,6 +97,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Serialized API payloads are cached here (see api.payload_cache). Point
+# BACKEND at Redis or Memcached to share the cache between processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'agileflow',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Seconds a cached payload may be served before it is rebuilt
+API_CACHE_TIMEOUT = 300
+# The workload report is not invalidated by task writes, so it is only kept briefly
+WORKLOAD_CACHE_TIMEOUT = 30
+
+# Per-endpoint query count and latency accounting (see agileflow_backend.instrumentation)
+REQUEST_STATS_ENABLED = True
+# Recent requests per endpoint the percentiles are computed over
+REQUEST_STATS_SAMPLES = 1000
+# Log a warning when one request runs the same SQL this many times
+REQUEST_STATS_DUPLICATE_QUERY_THRESHOLD = 10
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -119,12 +155,38 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
+    # orjson-backed when installed, stdlib json otherwise (see api.renderers)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
+# Live change feed (see api.events). LocalBackend only reaches the clients of
+# this process; use api.events.RedisBackend when running several processes
+CHANGE_FEED_BACKEND = 'api.events.LocalBackend'
+CHANGE_FEED_REDIS_URL = 'redis://localhost:6379/0'
+# Events queued per client before it is told to resync instead
+CHANGE_FEED_MAX_EVENTS = 1000
+# Seconds between keepalive comments on an idle feed
+CHANGE_FEED_KEEPALIVE = 15
+
+# Delta sync (see api.sync): tasks and dependencies per page, and how many
+# seconds the watermark trails the clock; keep it above the longest write
+# transaction, or rows it commits late are never sent
+SYNC_PAGE_SIZE = 1000
+SYNC_WATERMARK_LAG = 60
+
+# The browsable API is a development aid; production serves JSON only
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append(
+        'rest_framework.renderers.BrowsableAPIRenderer'
+    )
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # For development only
 CORS_ALLOW_CREDENTIALS = True  # Allow credentials
@@ -0,0 +1,13 @@
+"""
+Settings for `manage.py benchmark_api`: the regular settings on SQLite, so
+benchmark runs are reproducible without a database server. The benchmark
+itself runs on a throwaway test database.
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'benchmark.sqlite3',
+    }
+}
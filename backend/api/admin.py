@@ -1,14 +1,23 @@
 from django.contrib import admin
 from .models import Project, Task, TaskDependency
+from .search import search
+
+class IndexedSearchAdmin(admin.ModelAdmin):
+    """Search `search_fields` through the full-text index (api.search) instead of ILIKE scans"""
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return search(queryset, search_term), False
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(IndexedSearchAdmin):
     list_display = ('name', 'start_date', 'end_date', 'is_completed', 'created_at')
     list_filter = ('is_completed', 'start_date')
     search_fields = ('name', 'description')
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(IndexedSearchAdmin):
     list_display = ('name', 'project', 'assigned_user', 'priority', 'start_date', 'end_date', 'is_completed')
     list_filter = ('priority', 'is_completed', 'project')
     search_fields = ('name', 'description')
@@ -0,0 +1,83 @@
+from django.db.models import Count, F, Q
+
+from .models import Project, Task
+
+PRIORITY_KEYS = {value: label.lower() for value, label in Task.PRIORITY_CHOICES}
+
+
+def percentage(part, total):
+    return round(part * 100 / total) if total else 0
+
+
+def get_analytics(project_id=None, user_id=None):
+    """
+    Aggregate the dashboard statistics in three queries: one over tasks,
+    one over projects and one for the per-project progress, which reads the
+    project counters unless the tasks are narrowed to a user.
+    """
+    tasks = Task.objects.all()
+    projects = Project.objects.all()
+    # Conditions applied to the `tasks` relation when grouping by project
+    project_task_filter = Q()
+
+    if project_id is not None:
+        tasks = tasks.filter(project_id=project_id)
+        projects = projects.filter(pk=project_id)
+    if user_id is not None:
+        tasks = tasks.filter(assigned_user_id=user_id)
+        projects = projects.filter(pk__in=tasks.values('project_id'))
+        project_task_filter &= Q(tasks__assigned_user_id=user_id)
+
+    open_tasks = Q(is_completed=False)
+    task_stats = tasks.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(is_completed=True)),
+        todo=Count('id', filter=open_tasks & Q(start_date__isnull=True)),
+        in_progress=Count(
+            'id', filter=open_tasks & Q(start_date__isnull=False, end_date__isnull=True)
+        ),
+        **{
+            f'priority_{key}': Count('id', filter=Q(priority=value))
+            for value, key in PRIORITY_KEYS.items()
+        },
+    )
+    project_stats = projects.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(is_completed=True)),
+    )
+    columns = ['id', 'name', 'start_date', 'end_date', 'is_completed']
+    if user_id is None:
+        # Whole projects: read the maintained counters (see api.counters)
+        progress = projects.order_by('id').values(
+            *columns, 'task_count', completed_tasks=F('completed_task_count'),
+        )
+    else:
+        progress = [
+            dict(row, task_count=row.pop('user_task_count'))
+            for row in projects.order_by('id').values(
+                *columns,
+                user_task_count=Count('tasks', filter=project_task_filter),
+                completed_tasks=Count('tasks', filter=project_task_filter & Q(tasks__is_completed=True)),
+            )
+        ]
+
+    return {
+        'total_projects': project_stats['total'],
+        'completed_projects': project_stats['completed'],
+        'project_completion_rate': percentage(project_stats['completed'], project_stats['total']),
+        'total_tasks': task_stats['total'],
+        'completed_tasks': task_stats['completed'],
+        'task_completion_rate': percentage(task_stats['completed'], task_stats['total']),
+        'status_distribution': {
+            'todo': task_stats['todo'],
+            'in_progress': task_stats['in_progress'],
+            'completed': task_stats['completed'],
+        },
+        'priority_distribution': {
+            key: task_stats[f'priority_{key}'] for key in PRIORITY_KEYS.values()
+        },
+        'projects': [
+            dict(row, completion=percentage(row['completed_tasks'], row['task_count']))
+            for row in progress
+        ],
+    }
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import async_views
+
+# Matched before api.urls by the ASGI application (see agileflow_backend.asgi)
+urlpatterns = [
+    path('project/', async_views.project_list),
+    path('project/<str:pk>/', async_views.project_detail),
+    path('project/<str:pk>/tasks/', async_views.project_tasks),
+    path('task/', async_views.task_list),
+    path('task/dependencies/', async_views.task_dependencies),
+    path('changes/', async_views.change_feed),
+]
@@ -0,0 +1,254 @@
+"""
+Async-native versions of the hot read endpoints, served by the ASGI
+application when ASGI_ASYNC_READ_VIEWS is on (see agileflow_backend.asgi). They return the same payloads
+and validators as the DRF viewsets, but read through the async ORM so a
+slow request does not hold a worker thread while it waits. Anything they
+do not handle natively (writes, ?fields=, ?expand=, cursor pagination,
+other formats, ?search=) is passed on to the regular DRF view for the same URL.
+The change feed (server-sent events) only exists here.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.paginator import InvalidPage, Page
+from django.db.models import Prefetch, aprefetch_related_objects
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import resolve
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .conditional import (
+    project_list_validators,
+    project_tasks_validators,
+    project_validators,
+    response_validators,
+    set_validator_headers,
+    task_list_validators,
+)
+from .events import RESYNC, hub
+from .filters import FilterError, TaskFilter, is_id
+from .models import Project, Task, TaskDependency
+from .payload_cache import (
+    DEPENDENCIES_VERSION,
+    USERS_VERSION,
+    acached_payload,
+    project_version,
+)
+from .renderers import FastJSONRenderer
+from .serializers import (
+    ProjectListSerializer,
+    ProjectSerializer,
+    TaskDependencyValuesSerializer,
+    TaskValuesSerializer,
+)
+
+# Query parameters only the DRF views implement
+DELEGATED_PARAMS = {'fields', 'expand', 'pagination', 'format', 'search'}
+
+
+def json_response(data, status=200, validators=None):
+    response = HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type='application/json'
+    )
+    if validators is not None:
+        set_validator_headers(response, validators)
+    return response
+
+
+async def delegate(request):
+    """Serve the request with the DRF view the regular URLconf routes it to"""
+    match = resolve(request.path_info, urlconf=settings.ROOT_URLCONF)
+    request.resolver_match = match
+    return await sync_to_async(match.func)(request, *match.args, **match.kwargs)
+
+
+def async_read_view(handler):
+    """
+    Turn `handler(request, **kwargs)` into a view answering GET and HEAD.
+    The handler returns a response, or None to pass the request on.
+    """
+    @csrf_exempt
+    async def view(request, **kwargs):
+        if request.method in ('GET', 'HEAD') and not DELEGATED_PARAMS & request.GET.keys():
+            response = await handler(request, **kwargs)
+            if response is not None:
+                return response
+        return await delegate(request)
+
+    view.__name__ = view.__qualname__ = handler.__name__
+    return view
+
+
+async def conditional(request, validators_function, *args):
+    """(304 response or None, validators) like ConditionalGetMixin.not_modified"""
+    validators = await sync_to_async(validators_function)(request, *args)
+    if validators is None:
+        return None, None
+    validators = response_validators(validators)
+    etag, last_modified = validators
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        set_validator_headers(not_modified, validators)
+    return not_modified, validators
+
+
+async def paginate(request, queryset):
+    """
+    The page DRF's default pagination would return for `queryset`, counted
+    and sliced with the async ORM. Returns (paginator, error response);
+    the paginator is None when pagination is off.
+    """
+    paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+    drf_request = Request(request)
+    page_size = paginator.get_page_size(drf_request)
+    if not page_size:
+        return None, None
+    django_paginator = paginator.django_paginator_class(queryset, page_size)
+    # Paginator.count is a cached_property; prime it without a sync query
+    django_paginator.count = await queryset.acount()
+    page_number = paginator.get_page_number(drf_request, django_paginator)
+    try:
+        number = django_paginator.validate_number(page_number)
+    except InvalidPage as exc:
+        message = paginator.invalid_page_message.format(page_number=page_number, message=str(exc))
+        return None, json_response({'detail': message}, status=404)
+    bottom = (number - 1) * page_size
+    top = bottom + page_size
+    if top + django_paginator.orphans >= django_paginator.count:
+        top = django_paginator.count
+    rows = [row async for row in queryset[bottom:top]]
+    paginator.page = Page(rows, number, django_paginator)
+    paginator.request = drf_request
+    return paginator, None
+
+
+@async_read_view
+async def project_list(request):
+    not_modified, validators = await conditional(request, project_list_validators)
+    if not_modified is not None:
+        return not_modified
+    paginator, error = await paginate(request, Project.objects.all())
+    if error is not None:
+        return error
+    if paginator is None:
+        projects = [project async for project in Project.objects.all()]
+        return json_response(ProjectListSerializer(projects, many=True).data, validators=validators)
+    data = ProjectListSerializer(paginator.page.object_list, many=True).data
+    return json_response(paginator.get_paginated_response(data).data, validators=validators)
+
+
+@async_read_view
+async def project_detail(request, pk):
+    if not is_id(pk):
+        return None
+    not_modified, validators = await conditional(request, project_validators, pk)
+    if validators is None:
+        return None
+    if not_modified is not None:
+        return not_modified
+
+    async def build():
+        project = await Project.objects.aget(pk=pk)
+        await aprefetch_related_objects(
+            [project], Prefetch('tasks', queryset=Task.objects.select_related('assigned_user'))
+        )
+        return ProjectSerializer(project).data
+
+    data = await acached_payload('project', pk, [project_version(pk), USERS_VERSION], build)
+    return json_response(data, validators=validators)
+
+
+@async_read_view
+async def project_tasks(request, pk):
+    if not is_id(pk):
+        return None
+    not_modified, validators = await conditional(request, project_tasks_validators, pk)
+    if not_modified is not None:
+        return not_modified
+    if not await Project.objects.filter(pk=pk).aexists():
+        return None
+
+    async def build():
+        rows = TaskValuesSerializer.values(Task.objects.filter(project_id=pk))
+        return TaskValuesSerializer([row async for row in rows.aiterator()]).data
+
+    data = await acached_payload('project-tasks', pk, [project_version(pk), USERS_VERSION], build)
+    return json_response(data, validators=validators)
+
+
+@async_read_view
+async def task_list(request):
+    try:
+        queryset = TaskFilter().filter_params(Task.objects.all(), request.GET)
+    except FilterError as exc:
+        return json_response({"error": str(exc)}, status=400)
+    not_modified, validators = await conditional(request, task_list_validators, queryset)
+    if not_modified is not None:
+        return not_modified
+    rows = TaskValuesSerializer.values(queryset)
+    paginator, error = await paginate(request, rows)
+    if error is not None:
+        return error
+    if paginator is None:
+        data = TaskValuesSerializer([row async for row in rows.aiterator()]).data
+        return json_response(data, validators=validators)
+    data = TaskValuesSerializer(paginator.page.object_list).data
+    return json_response(paginator.get_paginated_response(data).data, validators=validators)
+
+
+@async_read_view
+async def task_dependencies(request):
+    async def build():
+        rows = TaskDependencyValuesSerializer.values(TaskDependency.objects.all())
+        # values_list() querysets run their SQL as iteration starts, which
+        # aiterator() does on the event loop; fetch them in one thread hop
+        return TaskDependencyValuesSerializer(await sync_to_async(list)(rows)).data
+
+    return json_response(await acached_payload('dependencies', 'all', [DEPENDENCIES_VERSION], build))
+
+
+def server_sent_event(name, data):
+    return b'event: ' + name.encode() + b'\ndata: ' + FastJSONRenderer().render(data) + b'\n\n'
+
+
+async def change_stream(project_ids):
+    keepalive = getattr(settings, 'CHANGE_FEED_KEEPALIVE', 15)
+    async with hub.subscribe(project_ids) as subscription:
+        # Subscribed before `since`, so /api/sync/?since= covers anything earlier
+        yield b'retry: 5000\n' + server_sent_event('ready', {'since': timezone.now()})
+        while True:
+            event = await subscription.get(keepalive)
+            if event is None:
+                yield b': keepalive\n\n'
+            elif event is RESYNC:
+                yield server_sent_event('resync', {'since': timezone.now()})
+            else:
+                yield server_sent_event('change', event)
+
+
+@csrf_exempt
+async def change_feed(request):
+    """
+    Server-sent events for the changes to the ?project= projects (a comma
+    separated list; every project without it). A `ready` event carries the
+    time the feed starts from, `change` events carry change events (see
+    api.events) and `resync` tells a client that fell behind to catch up
+    through /api/sync/.
+    """
+    if request.method != 'GET':
+        return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+    project_ids = None
+    value = request.GET.get('project')
+    if value is not None:
+        parts = [part.strip() for part in value.split(',') if part.strip()]
+        if not parts or not all(is_id(part) for part in parts):
+            return json_response({"error": "project must be a comma-separated list of ids"},
+                                 status=400)
+        project_ids = {int(part) for part in parts}
+    response = StreamingHttpResponse(change_stream(project_ids), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell buffering proxies to pass events through as they come
+    response['X-Accel-Buffering'] = 'no'
+    return response
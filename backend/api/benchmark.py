@@ -0,0 +1,406 @@
+"""
+API benchmark suite. Drives the project, task and dependency endpoints
+through the Django test client and reports throughput, latency percentiles
+and queries per request for each scenario. Run it with
+`manage.py benchmark_api` (see that command for the database it uses).
+ConcurrencyBenchmark compares the WSGI and ASGI applications under many
+concurrent clients (`manage.py benchmark_concurrency`).
+"""
+import asyncio
+import io
+import platform
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import django
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_framework.test import APIClient
+
+from agileflow_backend.instrumentation import QueryRecorder, percentile
+
+from .models import Project, Task
+from .synthetic import WORDS
+
+
+class Scenario:
+    """One endpoint call; `path(targets, rng)` picks the URL for each request"""
+
+    def __init__(self, name, path, method='get', data=None):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.data = data
+
+
+def random_project(targets, rng):
+    return rng.choice(targets['projects'])
+
+
+def random_task(targets, rng):
+    return rng.choice(targets['tasks'])
+
+
+def random_page(targets, rng, page_size):
+    return rng.randint(1, max(1, -(-len(targets['tasks']) // page_size)))
+
+
+SCENARIOS = [
+    Scenario('project-list', lambda targets, rng: '/api/project/'),
+    Scenario('project-detail', lambda targets, rng: f'/api/project/{random_project(targets, rng)}/'),
+    Scenario('project-tasks', lambda targets, rng: f'/api/project/{random_project(targets, rng)}/tasks/'),
+    Scenario('project-tasks-cursor',
+             lambda targets, rng: f'/api/project/{random_project(targets, rng)}/tasks/?pagination=cursor'),
+    Scenario('project-schedule',
+             lambda targets, rng: f'/api/project/{random_project(targets, rng)}/schedule/'),
+    Scenario('task-list',
+             lambda targets, rng: f'/api/task/?page={random_page(targets, rng, 100)}&page_size=100'),
+    Scenario('task-list-cursor', lambda targets, rng: '/api/task/?pagination=cursor&page_size=100'),
+    Scenario('task-search',
+             lambda targets, rng: f'/api/task/?search={rng.choice(WORDS)}+{rng.choice(WORDS)}&page_size=100'),
+    Scenario('task-detail', lambda targets, rng: f'/api/task/{random_task(targets, rng)}/'),
+    Scenario('dependencies', lambda targets, rng: '/api/task/dependencies/'),
+    Scenario('analytics', lambda targets, rng: '/api/analytics/'),
+    Scenario('task-update', lambda targets, rng: f'/api/task/{random_task(targets, rng)}/',
+             method='patch', data={'priority': 3}),
+]
+
+
+def benchmark_targets():
+    return {
+        'projects': list(Project.objects.order_by('id').values_list('id', flat=True)),
+        'tasks': list(Task.objects.order_by('id').values_list('id', flat=True)),
+    }
+
+
+def scenario_results(durations, queries):
+    durations = sorted(durations)
+    total = sum(durations)
+    return {
+        'requests': len(durations),
+        'requests_per_second': round(len(durations) / total, 1) if total else None,
+        'mean_ms': round(total * 1000 / len(durations), 3),
+        'p50_ms': round(percentile(durations, 50) * 1000, 3),
+        'p99_ms': round(percentile(durations, 99) * 1000, 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+class BenchmarkRunner:
+    """
+    Runs each scenario `requests` times after `warmup` untimed requests.
+    With `cold_cache` the payload cache is cleared before every request,
+    which measures the uncached paths.
+    """
+
+    def __init__(self, requests=200, warmup=10, seed=0, cold_cache=False, scenarios=None):
+        self.requests = requests
+        self.warmup = warmup
+        self.seed = seed
+        self.cold_cache = cold_cache
+        self.scenarios = [
+            scenario for scenario in SCENARIOS if not scenarios or scenario.name in scenarios
+        ]
+        self.client = APIClient()
+
+    def run(self):
+        targets = benchmark_targets()
+        if not targets['projects'] or not targets['tasks']:
+            raise ValueError("The database has no projects or tasks to benchmark")
+        results = {}
+        for scenario in self.scenarios:
+            results[scenario.name] = self.run_scenario(scenario, targets)
+        return {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connections['default'].vendor,
+                'projects': len(targets['projects']),
+                'tasks': len(targets['tasks']),
+                'requests': self.requests,
+                'warmup': self.warmup,
+                'seed': self.seed,
+                'cold_cache': self.cold_cache,
+            },
+            'results': results,
+        }
+
+    def request(self, scenario, targets, rng):
+        if self.cold_cache:
+            cache.clear()
+        path = scenario.path(targets, rng)
+        if scenario.method == 'get':
+            response = self.client.get(path)
+        else:
+            response = getattr(self.client, scenario.method)(path, scenario.data, format='json')
+        if response.status_code >= 400:
+            raise RuntimeError(f"{scenario.method.upper()} {path} returned {response.status_code}")
+        return response
+
+    def run_scenario(self, scenario, targets):
+        # Every scenario replays the same sequence of targets
+        rng = random.Random(f'{self.seed}:{scenario.name}')
+        for _ in range(self.warmup):
+            self.request(scenario, targets, rng)
+        durations, queries = [], []
+        for _ in range(self.requests):
+            recorder = QueryRecorder()
+            with connections['default'].execute_wrapper(recorder):
+                started = time.perf_counter()
+                self.request(scenario, targets, rng)
+                durations.append(time.perf_counter() - started)
+            queries.append(recorder.count)
+        return scenario_results(durations, queries)
+
+
+@contextmanager
+def benchmark_database(existing=False, stdout=None, **data_options):
+    """
+    Unless `existing`, a throwaway test database filled by generate_data
+    with `data_options` for the duration of the block
+    """
+    setup_test_environment(debug=False)
+    old_config = None
+    try:
+        if not existing:
+            old_config = setup_databases(verbosity=0, interactive=False)
+            call_command('generate_data', stdout=stdout, **data_options)
+        yield
+    finally:
+        if old_config is not None:
+            teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def compare(current, baseline):
+    """Per scenario: relative change of p50, p99 and queries against a previous run"""
+    changes = {}
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            continue
+        changes[name] = {
+            metric: round((result[metric] - previous[metric]) * 100 / previous[metric], 1)
+            if previous[metric] else None
+            for metric in ('p50_ms', 'p99_ms', 'queries_per_request')
+        }
+    return changes
+
+
+# Read endpoints served by the async views under ASGI
+CONCURRENT_SCENARIOS = ['project-list', 'project-detail', 'project-tasks', 'task-list', 'dependencies']
+
+
+def wsgi_get(application, path):
+    """(status, body) of a GET through a WSGI application"""
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'HTTP_HOST': 'testserver',
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(), 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        body = b''.join(response)
+    finally:
+        response.close()
+    return int(statuses[0].split()[0]), body
+
+
+async def asgi_get(application, path, headers=()):
+    """(status, body) of a GET through an ASGI application, with extra (name, value) headers"""
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'testserver')] + [(name.encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    requested = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    status, body = None, []
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            body.append(message.get('body', b''))
+
+    try:
+        await application(scope, receive, send)
+    finally:
+        disconnected.set()
+    return status, b''.join(body)
+
+
+class ConcurrencyBenchmark:
+    """
+    Serves the same mix of read requests through the WSGI application, with
+    a pool of `wsgi_threads` worker threads as a threaded WSGI server would,
+    and through the ASGI application on one event loop, with `concurrency`
+    clients each sending requests back to back. Reports throughput and
+    latency percentiles per server and concurrency level.
+
+    An in-process database answers in microseconds, which hides what the
+    servers do while they wait on a real one. `db_latency` adds that many
+    seconds of network round trip to every query.
+    """
+
+    def __init__(self, requests=400, concurrency=(1, 16, 64), wsgi_threads=8, seed=0,
+                 scenarios=None, db_latency=0.0):
+        self.requests = requests
+        self.concurrency = concurrency
+        self.wsgi_threads = wsgi_threads
+        self.seed = seed
+        self.db_latency = db_latency
+        self.scenarios = [
+            scenario for scenario in SCENARIOS
+            if scenario.name in (scenarios or CONCURRENT_SCENARIOS)
+        ]
+
+    def paths(self, targets):
+        rng = random.Random(self.seed)
+        return [
+            rng.choice(self.scenarios).path(targets, rng) for _ in range(self.requests)
+        ]
+
+    def run(self):
+        from agileflow_backend.asgi import AsyncReadsASGIHandler
+        from agileflow_backend.wsgi import application as wsgi_application
+
+        # The async views are measured whether or not ASGI_ASYNC_READ_VIEWS is on
+        asgi_application = AsyncReadsASGIHandler(async_reads=True)
+
+        targets = benchmark_targets()
+        if not targets['projects'] or not targets['tasks']:
+            raise ValueError("The database has no projects or tasks to benchmark")
+        paths = self.paths(targets)
+        results = {}
+        with self.simulated_latency():
+            # Warm the payload cache and the code paths of both servers
+            self.run_wsgi(wsgi_application, sorted(set(paths)), 1)
+            self.run_asgi(asgi_application, sorted(set(paths)), 1)
+            for concurrency in self.concurrency:
+                results[f'wsgi-{concurrency}'] = self.run_wsgi(wsgi_application, paths, concurrency)
+                results[f'asgi-{concurrency}'] = self.run_asgi(asgi_application, paths, concurrency)
+        return {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connections['default'].vendor,
+                'requests': self.requests,
+                'wsgi_threads': self.wsgi_threads,
+                'db_latency_ms': self.db_latency * 1000,
+                'scenarios': [scenario.name for scenario in self.scenarios],
+                'seed': self.seed,
+            },
+            'results': results,
+        }
+
+    @contextmanager
+    def simulated_latency(self):
+        """Delay every query on every connection, including those opened by the servers' threads"""
+        if not self.db_latency:
+            yield
+            return
+
+        def delay(execute, sql, params, many, context):
+            time.sleep(self.db_latency)
+            return execute(sql, params, many, context)
+
+        def add_delay(sender, connection, **kwargs):
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.insert(0, delay)
+
+        for connection in connections.all():
+            add_delay(None, connection)
+        connection_created.connect(add_delay, weak=False)
+        try:
+            yield
+        finally:
+            connection_created.disconnect(add_delay)
+            for connection in connections.all():
+                connection.execute_wrappers.remove(delay)
+
+    def results(self, durations, seconds):
+        durations = sorted(durations)
+        return {
+            'requests': len(durations),
+            'requests_per_second': round(len(durations) / seconds, 1),
+            'p50_ms': round(percentile(durations, 50) * 1000, 3),
+            'p99_ms': round(percentile(durations, 99) * 1000, 3),
+        }
+
+    def check(self, path, status):
+        if status >= 400:
+            raise RuntimeError(f"GET {path} returned {status}")
+
+    def run_wsgi(self, application, paths, concurrency):
+        pending = iter(paths)
+        lock = threading.Lock()
+        durations = []
+
+        def client(server):
+            while True:
+                with lock:
+                    path = next(pending, None)
+                if path is None:
+                    return
+                started = time.perf_counter()
+                status, _ = server.submit(wsgi_get, application, path).result()
+                self.check(path, status)
+                with lock:
+                    durations.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(self.wsgi_threads) as server, ThreadPoolExecutor(concurrency) as clients:
+            for future in [clients.submit(client, server) for _ in range(concurrency)]:
+                future.result()
+        return self.results(durations, time.perf_counter() - started)
+
+    def run_asgi(self, application, paths, concurrency):
+        async def run():
+            pending = iter(paths)
+            durations = []
+
+            async def client():
+                for path in pending:
+                    started = time.perf_counter()
+                    status, _ = await asgi_get(application, path)
+                    self.check(path, status)
+                    durations.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(client() for _ in range(concurrency)))
+            return self.results(durations, time.perf_counter() - started)
+
+        return asyncio.run(run())
@@ -0,0 +1,126 @@
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .models import DeletionLog, Project, Task, TaskDependency
+from .payload_cache import USERS_VERSION, version_tokens
+
+
+def latest_deletion(*models):
+    """When a row of these models was last deleted; deletions never bump updated_at"""
+    return DeletionLog.objects.filter(model__in=models).aggregate(
+        latest=Max('deleted_at')
+    )['latest']
+
+
+def users_marker():
+    """Changes whenever a user embedded as assigned_user does (see api.signals)"""
+    return version_tokens(USERS_VERSION)[0]
+
+
+def queryset_state(queryset):
+    """Row count and newest updated_at of a queryset, in one aggregate query"""
+    state = queryset.order_by().aggregate(count=Count('id'), latest=Max('updated_at'))
+    return [state['count'], state['latest']]
+
+
+def project_list_validators(request):
+    # The maintained task counters stand in for an aggregate over the tasks table
+    state = Project.objects.aggregate(
+        count=Count('id'), latest=Max('updated_at'),
+        tasks=Sum('task_count'), tasks_latest=Max('tasks_updated_at'),
+    )
+    return list(state.values()) + [
+        latest_deletion('project', 'task'), users_marker(), request.get_full_path(),
+    ]
+
+
+def project_validators(request, pk):
+    state = Project.objects.filter(pk=pk).values_list(
+        'updated_at', 'task_count', 'tasks_updated_at'
+    ).first()
+    if state is None:
+        return None
+    return list(state) + [latest_deletion('task'), users_marker(), request.get_full_path()]
+
+
+def project_tasks_validators(request, pk):
+    return queryset_state(Task.objects.filter(project_id=pk)) + [
+        latest_deletion('task'), users_marker(), request.get_full_path(),
+    ]
+
+
+def task_list_validators(request, queryset):
+    validators = queryset_state(queryset) + [
+        latest_deletion('task'), users_marker(), request.get_full_path(),
+    ]
+    if 'blocked' in request.GET:
+        # Whether a task is blocked depends on other tasks and on its dependencies
+        validators += queryset_state(Task.objects.all()) + [
+            TaskDependency.objects.aggregate(latest=Max('created_at'))['latest'],
+            latest_deletion('taskdependency'),
+        ]
+    return validators
+
+
+def task_validators(request, pk):
+    state = Task.objects.filter(pk=pk).annotate(
+        dependency_count=Count('dependencies'),
+        dependencies_created=Max('dependencies__created_at'),
+    ).values_list(
+        'updated_at', 'dependency_count', 'dependencies_created',
+        'assigned_user__username', 'assigned_user__email',
+        'assigned_user__first_name', 'assigned_user__last_name',
+    ).first()
+    if state is None:
+        return None
+    return list(state) + [latest_deletion('taskdependency'), request.get_full_path()]
+
+
+def response_validators(validators):
+    """(ETag, Last-Modified timestamp) for a list of validator values"""
+    etag = quote_etag(hashlib.md5(repr(validators).encode(), usedforsecurity=False).hexdigest())
+    timestamps = [value for value in validators if hasattr(value, 'timestamp')]
+    last_modified = int(max(timestamps).timestamp()) if timestamps else None
+    return etag, last_modified
+
+
+def set_validator_headers(response, validators):
+    if response.status_code in (200, 304):
+        etag, last_modified = validators
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified support for read actions. Validators come from
+    cheap aggregates (row counts, newest updated_at and tombstones), so a
+    304 is answered without loading or serializing the body. Subclasses
+    implement get_validators() for the actions they support. Cursor pages
+    are not validated: their aggregate would cost the COUNT(*) they avoid.
+    """
+
+    def get_validators(self):
+        return None
+
+    def not_modified(self, request):
+        """Return a 304 response if the client's copy is current, else None"""
+        self._validators = None
+        if request.method not in ('GET', 'HEAD') or self.use_cursor_pagination():
+            return None
+        validators = self.get_validators()
+        if validators is None:
+            return None
+        self._validators = etag, last_modified = response_validators(validators)
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, '_validators', None)
+        if validators:
+            set_validator_headers(response, validators)
+        return response
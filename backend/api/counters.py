@@ -0,0 +1,186 @@
+"""
+Denormalized per-project task counters (Project.task_count and friends).
+Task writes are folded into a ProjectCounters batch that issues one
+UPDATE ... SET x = x + delta per affected project, so concurrent writers
+never lose an increment. recount_projects() rebuilds every counter from
+the tasks table in one GROUP BY pass.
+"""
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Project, Task
+
+PRIORITY_COUNTERS = {
+    value: f'{label.lower()}_priority_count' for value, label in Task.PRIORITY_CHOICES
+}
+COUNTER_FIELDS = list(Project.COUNTER_FIELDS)
+
+
+def task_state(task):
+    """What the counters count a task as"""
+    return (task.project_id, task.is_completed, task.priority)
+
+
+def count_states(queryset):
+    """task_state() -> number of tasks in `queryset`, in one GROUP BY"""
+    return {
+        (project_id, is_completed, priority): count
+        for project_id, is_completed, priority, count in queryset.order_by()
+        .values('project_id', 'is_completed', 'priority').annotate(count=Count('id'))
+        .values_list('project_id', 'is_completed', 'priority', 'count')
+    }
+
+
+def latest_task_update(project_ref):
+    return Subquery(
+        Task.objects.filter(project=project_ref).order_by()
+        .values('project').annotate(latest=Max('updated_at')).values('latest')
+    )
+
+
+class ProjectCounters:
+    """A batch of counter changes, applied with apply()"""
+
+    def __init__(self):
+        self.deltas = defaultdict(Counter)
+        self.latest = {}
+        self.stale_latest = set()
+
+    def add(self, state, count=1):
+        project_id, is_completed, priority = state
+        deltas = self.deltas[project_id]
+        deltas['task_count'] += count
+        if is_completed:
+            deltas['completed_task_count'] += count
+        if priority in PRIORITY_COUNTERS:
+            deltas[PRIORITY_COUNTERS[priority]] += count
+
+    def remove(self, state, count=1):
+        self.add(state, -count)
+
+    def touch(self, project_id, updated_at):
+        """A task of the project was written at `updated_at`"""
+        if updated_at is not None:
+            previous = self.latest.get(project_id)
+            self.latest[project_id] = updated_at if previous is None else max(previous, updated_at)
+
+    def forget_latest(self, project_id):
+        """The project's newest task may be gone; recompute tasks_updated_at"""
+        self.stale_latest.add(project_id)
+
+    def save(self, task, update_fields=None):
+        """Count a task that was just created or saved, writing `update_fields` if given"""
+        previous = getattr(task, '_counted_as', None)
+        current = task_state(task)
+        if previous is not None and update_fields is not None:
+            # Fields the save did not write keep the row's values
+            written = [{'project', 'project_id'} & set(update_fields),
+                       'is_completed' in update_fields, 'priority' in update_fields]
+            current = tuple(new if write else old
+                            for new, old, write in zip(current, previous, written))
+        if previous != current:
+            if previous is not None:
+                self.remove(previous)
+                if previous[0] != current[0]:
+                    self.forget_latest(previous[0])
+            self.add(current)
+        self.touch(task.project_id, task.updated_at)
+        task._counted_as = current
+
+    def delete(self, task):
+        state = getattr(task, '_counted_as', None) or task_state(task)
+        self.remove(state)
+        self.forget_latest(state[0])
+
+    def patch(self, states, changes, updated_at):
+        """Tasks counted in `states` (see count_states) all had `changes` applied"""
+        for state, count in states.items():
+            project_id, is_completed, priority = state
+            project = changes.get('project')
+            current = (
+                project.pk if project is not None else project_id,
+                changes.get('is_completed', is_completed),
+                changes.get('priority', priority),
+            )
+            if current != state:
+                self.remove(state, count)
+                self.add(current, count)
+                if current[0] != project_id:
+                    self.forget_latest(project_id)
+            self.touch(current[0], updated_at)
+
+    def apply(self):
+        project_ids = set(self.deltas) | set(self.latest) | self.stale_latest
+        for project_id in project_ids:
+            values = {
+                field: F(field) + delta
+                for field, delta in self.deltas.get(project_id, {}).items() if delta
+            }
+            if project_id in self.stale_latest:
+                values['tasks_updated_at'] = latest_task_update(OuterRef('pk'))
+            elif project_id in self.latest:
+                latest = Value(self.latest[project_id])
+                values['tasks_updated_at'] = Greatest(Coalesce('tasks_updated_at', latest), latest)
+            if values:
+                Project.objects.filter(pk=project_id).update(**values)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def project_counters():
+    """
+    Collect counter changes and apply them when the block exits without an
+    error. Nested blocks, such as the Task signals fired inside a bulk
+    delete, join the outermost batch.
+    """
+    counters = getattr(_local, 'counters', None)
+    if counters is not None:
+        yield counters
+        return
+    counters = _local.counters = ProjectCounters()
+    try:
+        yield counters
+    finally:
+        _local.counters = None
+    counters.apply()
+
+
+def recount_projects(project_ids=None):
+    """
+    Recompute the counters from the tasks table with one GROUP BY and write
+    the projects whose counters were wrong. Returns how many there were.
+    """
+    tasks = Task.objects.all()
+    projects = Project.objects.all()
+    if project_ids is not None:
+        tasks = tasks.filter(project_id__in=project_ids)
+        projects = projects.filter(pk__in=project_ids)
+    actual = {
+        row.pop('project_id'): row
+        for row in tasks.order_by().values('project_id').annotate(
+            task_count=Count('id'),
+            completed_task_count=Count('id', filter=Q(is_completed=True)),
+            tasks_updated_at=Max('updated_at'),
+            **{
+                field: Count('id', filter=Q(priority=value))
+                for value, field in PRIORITY_COUNTERS.items()
+            },
+        )
+    }
+    empty = {field: 0 for field in COUNTER_FIELDS}
+    empty['tasks_updated_at'] = None
+    wrong = []
+    for project in projects.only('id', *COUNTER_FIELDS):
+        expected = actual.get(project.pk, empty)
+        if any(getattr(project, field) != expected[field] for field in COUNTER_FIELDS):
+            for field in COUNTER_FIELDS:
+                setattr(project, field, expected[field])
+            wrong.append(project)
+    Project.objects.bulk_update(wrong, COUNTER_FIELDS, batch_size=1000)
+    return len(wrong)
@@ -0,0 +1,193 @@
+"""
+Live change feed. Writes publish compact change events, such as
+{"type": "task", "action": "updated", "id": 7, "project": 2}, once their
+transaction commits. The hub fans them out to the subscribers of this
+process: the server-sent events stream in api.async_views, filtered by
+project. Events only say what changed; clients fetch the objects, or
+/api/sync/, to catch up. Actions are created, updated and deleted, and
+changed for a project whose board was rewritten in bulk, as by an import.
+
+The backend named by CHANGE_FEED_BACKEND carries events between
+processes. LocalBackend delivers within the process, which is enough for
+a single server and for tests. RedisBackend uses Redis pub/sub so every
+process sees every write.
+"""
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = aioredis = None
+
+# Delivered in place of the events a subscriber fell too far behind to receive
+RESYNC = {'type': 'resync'}
+
+
+def task_event(task_id, project_id, action, previous_project=None):
+    event = {'type': 'task', 'action': action, 'id': task_id, 'project': project_id}
+    if previous_project is not None and previous_project != project_id:
+        event['previous_project'] = previous_project
+    return event
+
+
+def project_event(project_id, action):
+    return {'type': 'project', 'action': action, 'id': project_id, 'project': project_id}
+
+
+def dependency_event(dependency_id, task_id, dependent_on_task_id, project_id, action):
+    return {
+        'type': 'dependency', 'action': action, 'id': dependency_id, 'task': task_id,
+        'dependent_on_task': dependent_on_task_id, 'project': project_id,
+    }
+
+
+class Subscription:
+    """Events for one client, queued on its event loop"""
+
+    def __init__(self, project_ids=None, max_events=1000):
+        self.project_ids = project_ids
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_events)
+        self.behind = False
+
+    def matches(self, event):
+        if self.project_ids is None:
+            return True
+        return (event.get('project') in self.project_ids
+                or event.get('previous_project') in self.project_ids)
+
+    def deliver(self, event):
+        """Called from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The client's loop closed before it unsubscribed
+            pass
+
+    def _put(self, event):
+        if self.behind:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog; the client resynchronizes instead
+            self.behind = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout=None):
+        """The next event, or None after `timeout` seconds without one"""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is RESYNC:
+            self.behind = False
+        return event
+
+
+class ChangeFeedHub:
+    """Publishes events through the configured backend and delivers them to local subscribers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            backend_class = import_string(
+                getattr(settings, 'CHANGE_FEED_BACKEND', 'api.events.LocalBackend')
+            )
+            self._backend = backend_class(self)
+        return self._backend
+
+    def publish(self, events):
+        """Publish `events` when the current transaction commits"""
+        events = list(events)
+        if events:
+            transaction.on_commit(lambda: self.backend.publish(events))
+
+    def deliver(self, events):
+        """Hand events that came through the backend to this process' subscribers"""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            for event in events:
+                if subscription.matches(event):
+                    subscription.deliver(event)
+
+    @asynccontextmanager
+    async def subscribe(self, project_ids=None):
+        subscription = Subscription(
+            project_ids, getattr(settings, 'CHANGE_FEED_MAX_EVENTS', 1000)
+        )
+        await self.backend.listen()
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+
+class LocalBackend:
+    """Delivers events within this process only"""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, events):
+        self.hub.deliver(events)
+
+    async def listen(self):
+        pass
+
+
+class RedisBackend:
+    """
+    Publishes events to a Redis channel and delivers what every process
+    published to local subscribers. Needs the redis package and
+    CHANGE_FEED_REDIS_URL.
+    """
+    channel = 'agileflow:changes'
+
+    def __init__(self, hub):
+        if redis is None:
+            raise ImproperlyConfigured("RedisBackend requires the redis package")
+        self.hub = hub
+        self.url = getattr(settings, 'CHANGE_FEED_REDIS_URL', 'redis://localhost:6379/0')
+        self.client = redis.Redis.from_url(self.url)
+        self._listener = None
+
+    def publish(self, events):
+        self.client.publish(self.channel, json.dumps(events))
+
+    async def listen(self):
+        """Start relaying the channel on the running event loop, once"""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self.relay())
+
+    async def relay(self):
+        pubsub = aioredis.Redis.from_url(self.url).pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                self.hub.deliver(json.loads(message['data']))
+        finally:
+            await pubsub.aclose()
+
+
+hub = ChangeFeedHub()
@@ -0,0 +1,142 @@
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+
+from .filters import is_id
+from .models import Project, Task, TaskDependency
+
+CHUNK_SIZE = 2000
+
+# (output column, values_list() lookup) for each exported resource
+EXPORT_COLUMNS = {
+    'projects': [
+        ('id', 'id'), ('name', 'name'), ('description', 'description'),
+        ('start_date', 'start_date'), ('end_date', 'end_date'),
+        ('is_completed', 'is_completed'), ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ],
+    'tasks': [
+        ('id', 'id'), ('name', 'name'), ('description', 'description'),
+        ('start_date', 'start_date'), ('end_date', 'end_date'), ('priority', 'priority'),
+        ('project', 'project_id'), ('assigned_user', 'assigned_user_id'),
+        ('is_completed', 'is_completed'), ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ],
+    'dependencies': [
+        ('id', 'id'), ('task', 'task_id'), ('dependent_on_task', 'dependent_on_task_id'),
+        ('created_at', 'created_at'),
+    ],
+}
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+
+# How each resource is narrowed to a single project
+PROJECT_LOOKUPS = {
+    'projects': 'pk',
+    'tasks': 'project_id',
+    'dependencies': 'task__project_id',
+}
+
+
+def export_querysets(*resources):
+    """Querysets for the given resources, in export order"""
+    querysets = {
+        'projects': Project.objects.order_by('id'),
+        'tasks': Task.objects.order_by('id'),
+        'dependencies': TaskDependency.objects.order_by('id'),
+    }
+    return {name: querysets[name] for name in resources}
+
+
+def iter_rows(queryset, resource):
+    """Yield plain tuples in chunks without building model instances"""
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS[resource]]
+    return queryset.values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+
+
+def iter_ndjson(querysets):
+    """One JSON object per line, tagged with a "type" of project/task/dependency"""
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    record_types = {'projects': 'project', 'tasks': 'task', 'dependencies': 'dependency'}
+    for resource, queryset in querysets.items():
+        record_type = record_types[resource]
+        columns = [column for column, _ in EXPORT_COLUMNS[resource]]
+        for row in iter_rows(queryset, resource):
+            record = dict(zip(columns, row), type=record_type)
+            yield encoder.encode(record) + '\n'
+
+
+class Echo:
+    """File-like object whose write() returns the line for csv.writer to yield"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, resource):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, _ in EXPORT_COLUMNS[resource]])
+    for row in iter_rows(queryset, resource):
+        yield writer.writerow(row)
+
+
+async def aiter_chunks(chunks):
+    """
+    `chunks` as an async iterator, so the ASGI handler streams it instead
+    of buffering the whole export. The generator advances CHUNK_SIZE lines
+    per hop onto the thread that owns the database connection.
+    """
+    chunks = iter(chunks)
+    take = sync_to_async(lambda: ''.join(islice(chunks, CHUNK_SIZE)))
+    while chunk := await take():
+        yield chunk
+
+
+def export_response(request, querysets, file_format, resource, filename):
+    """
+    Stream an export: NDJSON covers every resource in `querysets`, CSV
+    covers the single `resource` since each has its own columns.
+    """
+    if file_format == 'csv':
+        chunks, content_type = iter_csv(querysets[resource], resource), 'text/csv'
+        filename = f'{filename}-{resource}.csv'
+    else:
+        chunks, content_type = iter_ndjson(querysets), 'application/x-ndjson'
+        filename = f'{filename}.ndjson'
+    if isinstance(request._request, ASGIRequest):
+        chunks = aiter_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def streaming_export(request, querysets, filename):
+    """
+    Stream `querysets` as ?file_format=ndjson (default) or csv, narrowed
+    to one ?project= when given. CSV exports one ?resource= at a time.
+    """
+    file_format = request.query_params.get('file_format', 'ndjson')
+    resource = request.query_params.get('resource', 'tasks')
+    project_id = request.query_params.get('project')
+    error = None
+    if file_format not in EXPORT_FORMATS:
+        error = f"file_format must be one of: {', '.join(EXPORT_FORMATS)}"
+    elif resource not in querysets:
+        error = f"resource must be one of: {', '.join(querysets)}"
+    elif project_id is not None and not is_id(project_id):
+        error = "project must be an integer"
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    if project_id is not None:
+        querysets = {
+            name: queryset.filter(**{PROJECT_LOOKUPS[name]: project_id})
+            for name, queryset in querysets.items()
+        }
+    return export_response(request, querysets, file_format, resource, filename)
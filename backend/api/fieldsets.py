@@ -0,0 +1,132 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.serializers import BaseSerializer
+
+
+def parse_names(request, param):
+    """Comma-separated names of a query parameter, or None when it is absent"""
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return [name for name in (part.strip() for part in value.split(',')) if name]
+
+
+class Fieldset:
+    """
+    The part of a payload a client asked for. `fields` lists the keys to
+    render (None: all of them) and `expand` the nested objects to embed
+    (None: the serializer's defaults). Expanded objects are always rendered.
+    """
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = None if fields is None else frozenset(fields)
+        self.expand = None if expand is None else frozenset(expand)
+
+    @classmethod
+    def from_request(cls, request, serializer_class):
+        """Parse ?fields= and ?expand=, checking the names against `serializer_class`"""
+        fields, expand = parse_names(request, 'fields'), parse_names(request, 'expand')
+        if fields is None and expand is None:
+            return None
+        available = serializer_class.available_fields()
+        unknown = sorted(set(fields or ()) - set(available))
+        if unknown:
+            raise ParseError({"error": f"unknown fields: {', '.join(unknown)}"})
+        unknown = sorted(set(expand or ()) - set(serializer_class.expandable_fields))
+        if unknown:
+            raise ParseError({"error": f"cannot expand: {', '.join(unknown)}"})
+        return cls(fields, expand)
+
+    def __str__(self):
+        """Canonical form, used in cache keys"""
+        parts = []
+        if self.fields is not None:
+            parts.append('fields=' + ','.join(sorted(self.fields)))
+        if self.expand is not None:
+            parts.append('expand=' + ','.join(sorted(self.expand)))
+        return '&'.join(parts)
+
+    def includes(self, name):
+        return self.fields is None or name in self.fields or self.expands(name)
+
+    def model_fields(self, model):
+        """Concrete fields of `model` to load with only(), or None for all of them"""
+        if self.fields is None:
+            return None
+        pk = model._meta.pk.name
+        return [field.name for field in model._meta.concrete_fields
+                if field.name == pk or self.includes(field.name)]
+
+    def expands(self, name, default=False):
+        if self.expand is None:
+            return default and (self.fields is None or name in self.fields)
+        return name in self.expand
+
+
+class SparseFieldsMixin:
+    """
+    Lets a ModelSerializer render only a Fieldset (see Fieldset.from_request).
+    Without one it renders as before. Nested serializers in
+    `expandable_fields` are dropped unless expanded; other expandable fields
+    fall back to their plain (primary key) representation.
+    """
+    # Fields ?expand= may name, and those embedded when it is absent
+    expandable_fields = ()
+    expanded_by_default = ()
+
+    def __init__(self, *args, fieldset=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fieldset = fieldset
+
+    @classmethod
+    def available_fields(cls):
+        return list(cls.Meta.fields)
+
+    @classmethod
+    def fieldset_expands(cls, fieldset, name):
+        default = name in cls.expanded_by_default
+        if fieldset is None:
+            return default
+        return fieldset.expands(name, default)
+
+    def expands(self, name):
+        return self.fieldset_expands(self.fieldset, name)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name, field in list(fields.items()):
+            if self.fieldset is not None and not self.fieldset.includes(name):
+                del fields[name]
+            elif (name in self.expandable_fields and isinstance(field, BaseSerializer)
+                  and not self.expands(name)):
+                del fields[name]
+        return fields
+
+
+class FieldsetViewMixin:
+    """
+    Parses ?fields= and ?expand= on read requests and hands the Fieldset to
+    the serializer. get_queryset() implementations use get_fieldset() to
+    skip the columns, joins and prefetches nobody asked for.
+    """
+
+    def get_fieldset_serializer_class(self):
+        """The serializer whose fields ?fields= and ?expand= may name"""
+        return self.get_serializer_class()
+
+    def get_fieldset(self):
+        if not hasattr(self, '_fieldset'):
+            self._fieldset = None
+            if self.request.method in ('GET', 'HEAD'):
+                self._fieldset = Fieldset.from_request(
+                    self.request, self.get_fieldset_serializer_class()
+                )
+        return self._fieldset
+
+    def fieldset_cache_id(self, object_id):
+        """Cache id of a payload of this object narrowed to the request's Fieldset"""
+        fieldset = self.get_fieldset()
+        return object_id if fieldset is None else f'{object_id}?{fieldset}'
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fieldset', self.get_fieldset())
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,147 @@
+import re
+from datetime import date
+
+from django.db.models import Exists, OuterRef, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import TaskDependency
+from .search import search
+
+
+# ASCII only: str.isdigit() also accepts digits such as '²' that int() rejects
+INTEGER = re.compile(r'-?[0-9]+')
+ID = re.compile(r'[0-9]+')
+
+
+def is_id(value):
+    """Whether `value` is an id as written in a URL or query string"""
+    return ID.fullmatch(value) is not None
+
+
+class FilterError(ValueError):
+    """A filter parameter with a value it cannot parse"""
+
+
+def parse_int(value):
+    value = value.strip()
+    if not INTEGER.fullmatch(value):
+        raise FilterError("must be an integer")
+    return int(value)
+
+
+def parse_ids(value):
+    ids = [part.strip() for part in value.split(',')]
+    if not all(ID.fullmatch(part) for part in ids):
+        raise FilterError("must be a comma-separated list of ids")
+    return [int(part) for part in ids]
+
+
+def parse_bool(value):
+    value = value.strip().lower()
+    if value not in ('1', '0', 'true', 'false'):
+        raise FilterError("must be true or false")
+    return value in ('1', 'true')
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        raise FilterError("must be an ISO 8601 date")
+
+
+def lookup(name, parse):
+    """A filter matching `name` (a field lookup) against the parsed value"""
+    return lambda value: Q(**{name: parse(value)})
+
+
+def assigned_to(value):
+    """Tasks assigned to any of the listed user ids, or to no one for `none`"""
+    ids = [part.strip() for part in value.split(',')]
+    condition = Q()
+    if 'none' in ids:
+        ids = [part for part in ids if part != 'none']
+        condition = Q(assigned_user__isnull=True)
+    if ids:
+        condition |= Q(assigned_user_id__in=parse_ids(','.join(ids)))
+    return condition
+
+
+def blocked(value):
+    """Tasks that do (or, for false, do not) depend on an open task"""
+    unresolved = Exists(TaskDependency.objects.filter(
+        task=OuterRef('pk'), dependent_on_task__is_completed=False
+    ))
+    return Q(unresolved) if parse_bool(value) else ~Q(unresolved)
+
+
+class DeclarativeFilter(BaseFilterBackend):
+    """
+    Query parameter filters declared in `filters`, a mapping of parameter
+    to a function from its value to a Q. Every parameter given is ANDed
+    into one WHERE clause; a value that does not parse is a 400.
+    """
+    filters = {}
+
+    def get_conditions(self, params):
+        conditions = []
+        for param, condition in self.filters.items():
+            value = params.get(param)
+            if value is None or not value.strip():
+                continue
+            try:
+                conditions.append(condition(value))
+            except FilterError as exc:
+                raise FilterError(f"{param} {exc}")
+        return conditions
+
+    def filter_params(self, queryset, params):
+        """`queryset` narrowed by the filters in `params`; raises FilterError"""
+        return queryset.filter(*self.get_conditions(params))
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) != 'list':
+            return queryset
+        try:
+            return self.filter_params(queryset, request.query_params)
+        except FilterError as exc:
+            raise ValidationError({"error": str(exc)})
+
+
+class TaskFilter(DeclarativeFilter):
+    """
+    The task list's filters. Each one maps onto a Task index: the project
+    and assignee open-task indexes, priority, and the start_date and
+    end_date indexes; `blocked` probes the dependency unique index.
+    """
+    filters = {
+        'project': lookup('project_id__in', parse_ids),
+        'assigned_user': assigned_to,
+        'priority': lookup('priority__in', parse_ids),
+        'priority_min': lookup('priority__gte', parse_int),
+        'priority_max': lookup('priority__lte', parse_int),
+        'is_completed': lookup('is_completed', parse_bool),
+        'start_date_after': lookup('start_date__gte', parse_date),
+        'start_date_before': lookup('start_date__lte', parse_date),
+        'end_date_after': lookup('end_date__gte', parse_date),
+        'end_date_before': lookup('end_date__lte', parse_date),
+        'blocked': blocked,
+    }
+
+
+class IndexedSearchFilter(BaseFilterBackend):
+    """
+    `?search=` over names and descriptions through the full-text index
+    (see api.search), ranked best match first, rather than the ILIKE
+    scans of DRF's SearchFilter. Only list actions are searched, so a
+    detail lookup is never narrowed by it. Cursor pagination keeps its own
+    ordering.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query or getattr(view, 'action', None) != 'list':
+            return queryset
+        return search(queryset, query)
@@ -0,0 +1,212 @@
+from .memo import ProjectMemo
+from .models import TaskDependency
+
+
+class DependencyGraph:
+    """
+    Adjacency lists of a project's TaskDependency edges, keyed by task id.
+    `depends_on[a]` lists the tasks `a` depends on; `foreign` maps the
+    targets of cross-project edges to the project they belong to.
+    """
+
+    def __init__(self, project_id, edges):
+        self.project_id = project_id
+        self.depends_on = {}
+        self.foreign = {}
+        for task_id, dependent_on_id, dependent_on_project_id in edges:
+            self.depends_on.setdefault(task_id, []).append(dependent_on_id)
+            if dependent_on_project_id != project_id:
+                self.foreign[dependent_on_id] = dependent_on_project_id
+
+    @classmethod
+    def load(cls, project_id):
+        """Build the graph from a single query over the project's edges"""
+        edges = TaskDependency.objects.filter(task__project_id=project_id).values_list(
+            'task_id', 'dependent_on_task_id', 'dependent_on_task__project_id'
+        )
+        return cls(project_id, edges.iterator(chunk_size=5000))
+
+
+_graphs = ProjectMemo('dependency-graph', DependencyGraph.load)
+
+
+def get_project_graph(project_id):
+    """Return the project's cached graph, reloading it if it was invalidated"""
+    return _graphs.get(project_id)
+
+
+def invalidate_project_graph(project_id):
+    """Mark the cached graph of a project stale, in this and every other process"""
+    _graphs.invalidate(project_id)
+
+
+class GraphLoader(dict):
+    """
+    Project graphs fetched once per traversal instead of once per node.
+    Projects in `fresh` are read from the database rather than the memo,
+    for checks made under a lock that a memoized graph could predate.
+    """
+
+    def __init__(self, fresh=()):
+        super().__init__()
+        self.fresh = fresh
+
+    def __missing__(self, project_id):
+        if project_id in self.fresh:
+            graph = DependencyGraph.load(project_id)
+        else:
+            graph = get_project_graph(project_id)
+        self[project_id] = graph
+        return graph
+
+
+def find_path(start, start_project_id, goal, fresh=()):
+    """
+    Iterative DFS along "depends on" edges from `start` to `goal`.
+    Returns the list of task ids on the path, or None if `goal` is
+    unreachable. Graphs of other projects are loaded as edges cross into them.
+    """
+    project_of = {start: start_project_id}
+    graphs = GraphLoader(fresh)
+    parent = {start: None}
+    stack = [start]
+    while stack:
+        node = stack.pop()
+        if node == goal:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = parent[node]
+            return path[::-1]
+        graph = graphs[project_of[node]]
+        for target in graph.depends_on.get(node, ()):
+            if target not in parent:
+                parent[target] = node
+                project_of[target] = graph.foreign.get(target, graph.project_id)
+                stack.append(target)
+    return None
+
+
+def find_cycle(task, dependent_on_task, fresh=()):
+    """
+    Return the cycle that `task` depending on `dependent_on_task` would
+    create, as task ids starting and ending with `task`, or None. The
+    graphs of the `fresh` projects are read from the database.
+    """
+    path = find_path(dependent_on_task.pk, dependent_on_task.project_id, task.pk, fresh)
+    if path is None:
+        return None
+    return [task.pk] + path
+
+
+def find_cycle_in_batch(added, removed, project_of, fresh=()):
+    """
+    Check a batch of edge changes at once. `added` and `removed` are sets of
+    (task_id, dependent_on_task_id) pairs and `project_of` maps every task
+    id they mention to its project. Runs one iterative three-colour DFS from
+    the new edges over the cached graphs with the batch applied, and returns
+    the first cycle found as a list of task ids, or None. The graphs of
+    the `fresh` projects are read from the database.
+    """
+    extra = {}
+    for task_id, dependent_on_id in added:
+        extra.setdefault(task_id, []).append(dependent_on_id)
+    project_of = dict(project_of)
+    graphs = GraphLoader(fresh)
+
+    def successors(node):
+        graph = graphs[project_of[node]]
+        for target in graph.depends_on.get(node, ()):
+            if (node, target) not in removed:
+                project_of.setdefault(target, graph.foreign.get(target, graph.project_id))
+                yield target
+        yield from extra.get(node, ())
+
+    ON_PATH, DONE = 1, 2
+    state = {}
+    for root in extra:
+        if root in state:
+            continue
+        state[root] = ON_PATH
+        path = [root]
+        stack = [successors(root)]
+        while stack:
+            for target in stack[-1]:
+                if state.get(target) == ON_PATH:
+                    return path[path.index(target):] + [target]
+                if target not in state:
+                    state[target] = ON_PATH
+                    path.append(target)
+                    stack.append(successors(target))
+                    break
+            else:
+                state[path.pop()] = DONE
+                stack.pop()
+    return None
+
+
+def find_closing_edges(added, project_of):
+    """
+    Return the pairs of `added` to leave out so that the cached graphs plus
+    the rest of `added` have no cycle, found in one three-colour DFS.
+    `added` is an ordered collection of (task_id, dependent_on_task_id)
+    pairs; when a cycle is met, the edge of `added` closest to its end is
+    dropped, which for edges explored in input order is usually the later
+    one. A cycle made only of stored edges is left alone.
+    """
+    extra = {}
+    for task_id, dependent_on_id in added:
+        extra.setdefault(task_id, []).append(dependent_on_id)
+    project_of = dict(project_of)
+    graphs = GraphLoader()
+    closing = set()
+
+    def successors(node):
+        """(target, whether the edge is one of `added`) pairs"""
+        graph = graphs[project_of[node]]
+        stored = graph.depends_on.get(node, ())
+        for target in stored:
+            project_of.setdefault(target, graph.foreign.get(target, graph.project_id))
+            yield target, False
+        for target in extra.get(node, ()):
+            if target not in stored and (node, target) not in closing:
+                yield target, True
+
+    done = set()
+    for root in extra:
+        if root in done:
+            continue
+        # Position of each node on the path, and whether it was reached over an added edge
+        on_path = {root: 0}
+        path, reached_by_added = [root], [False]
+        stack = [successors(root)]
+        while stack:
+            for target, is_added in stack[-1]:
+                if target in on_path:
+                    if is_added:
+                        closing.add((path[-1], target))
+                        continue
+                    for depth in range(len(path) - 1, on_path[target], -1):
+                        if reached_by_added[depth]:
+                            break
+                    else:
+                        continue
+                    # Drop that edge and resume the DFS from its source
+                    closing.add((path[depth - 1], path[depth]))
+                    for node in path[depth:]:
+                        del on_path[node]
+                    del path[depth:], reached_by_added[depth:], stack[depth:]
+                    break
+                if target not in done:
+                    on_path[target] = len(path)
+                    path.append(target)
+                    reached_by_added.append(is_added)
+                    stack.append(successors(target))
+                    break
+            else:
+                node = path.pop()
+                del on_path[node]
+                done.add(node)
+                reached_by_added.pop()
+                stack.pop()
+    return closing
@@ -0,0 +1,317 @@
+import csv
+import json
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .counters import project_counters
+from .events import hub, project_event
+from .filters import is_id
+from .graph import find_closing_edges
+from .models import Project, Task, TaskDependency
+from .search import index_objects
+from .signals import invalidate_project_caches, invalidate_task_payloads
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+RECORD_TYPES = ('project', 'task', 'dependency')
+# Per-row errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class RowError(Exception):
+    """A record that cannot be imported; reported with its line number"""
+
+
+def iter_records(stream, file_format='ndjson', record_type='task'):
+    """
+    Yield (line number, record dict) pairs from a text stream without
+    reading it all. NDJSON lines carry their own "type"; CSV rows all have
+    `record_type`.
+    """
+    if file_format == 'csv':
+        for line, row in enumerate(csv.DictReader(stream), start=2):
+            row.setdefault('type', record_type)
+            yield line, row
+        return
+    for line, text in enumerate(stream, start=1):
+        text = text.strip()
+        if not text:
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            record = {'type': None, 'invalid': 'Line is not a JSON object'}
+        yield line, record
+
+
+def parse_date(value, field, required=False):
+    if value in (None, ''):
+        if required:
+            raise RowError(f"{field} is required")
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise RowError(f"{field} must be an ISO 8601 date")
+
+
+def parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def parse_name(value):
+    name = (value or '').strip() if isinstance(value, str) else ''
+    if not name:
+        raise RowError("name is required")
+    if len(name) > 255:
+        raise RowError("name must be at most 255 characters")
+    return name
+
+
+class TaskImporter:
+    """
+    Streams project, task and dependency records into the database.
+
+    Records are buffered and written with bulk_create, one transaction per
+    chunk. Ids in the input are source ids: they are mapped to the rows
+    created by this import, falling back to existing rows with that id.
+    Users may be referenced by id or username. Projects and users are
+    resolved with one lookup per chunk. Dependency records are reduced to id
+    pairs a chunk at a time and checked for cycles together at the end.
+    """
+
+    def __init__(self, chunk_size=1000):
+        self.chunk_size = chunk_size
+        self.project_ids = {}  # source project id -> new project id
+        self.task_ids = {}  # source task id -> (new task id, project id)
+        self.pending = {record_type: [] for record_type in RECORD_TYPES}
+        # Dependencies as (task id, dependent on id) -> line, with their task's project
+        self.edges = {}
+        self.project_of = {}
+        # (line, task reference, dependent on reference) left for the final pass
+        self.deferred = []
+        self.counts = {'projects': 0, 'tasks': 0, 'dependencies': 0}
+        self.errors = []
+        self.error_count = 0
+        self.touched_projects = set()
+
+    def error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def run(self, records):
+        started = time.monotonic()
+        rows = 0
+        for line, record in records:
+            rows += 1
+            record_type = record.get('type')
+            if record_type not in RECORD_TYPES:
+                self.error(line, record.get('invalid') or f"Unknown record type: {record_type}")
+                continue
+            self.pending[record_type].append((line, record))
+            if record_type == 'task' and len(self.pending['task']) >= self.chunk_size:
+                self.flush_tasks()
+            elif record_type == 'dependency' and len(self.pending['dependency']) >= self.chunk_size:
+                self.flush_tasks()
+                self.resolve_dependencies()
+        self.flush_tasks()
+        # Dependencies may point at tasks later in the input, so they go last
+        self.resolve_dependencies(final=True)
+        self.flush_dependencies()
+
+        for project_id in self.touched_projects:
+            invalidate_project_caches(project_id)
+        # One event per project rather than one per imported row
+        hub.publish(project_event(project_id, 'changed') for project_id in self.touched_projects)
+        seconds = time.monotonic() - started
+        return {
+            **self.counts,
+            "rows": rows,
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(rows / seconds) if seconds else rows,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
+
+    def flush_projects(self):
+        created = []
+        for line, record in self.pending['project']:
+            try:
+                project = Project(
+                    name=parse_name(record.get('name')),
+                    description=record.get('description') or '',
+                    start_date=parse_date(record.get('start_date'), 'start_date', required=True),
+                    end_date=parse_date(record.get('end_date'), 'end_date'),
+                    is_completed=parse_bool(record.get('is_completed')),
+                )
+            except RowError as exc:
+                self.error(line, str(exc))
+                continue
+            created.append((record.get('id'), project))
+        self.pending['project'] = []
+        if not created:
+            return
+        with transaction.atomic():
+            Project.objects.bulk_create([project for _, project in created],
+                                        batch_size=self.chunk_size)
+            index_objects(project for _, project in created)
+        for source_id, project in created:
+            if source_id is not None:
+                self.project_ids[str(source_id)] = project.pk
+            self.touched_projects.add(project.pk)
+        self.counts['projects'] += len(created)
+
+    def resolve_projects(self, records):
+        """Map each project reference to a project id, with one query for unknown ones"""
+        unknown = set()
+        for _, record in records:
+            reference = str(record.get('project', ''))
+            if reference not in self.project_ids and is_id(reference):
+                unknown.add(int(reference))
+        existing = set(Project.objects.filter(pk__in=unknown).values_list('id', flat=True))
+        return {**{str(pk): pk for pk in existing}, **self.project_ids}
+
+    def resolve_users(self, records):
+        """Map user ids and usernames to user ids, with one query"""
+        ids, usernames = set(), set()
+        for _, record in records:
+            reference = record.get('assigned_user')
+            if reference in (None, ''):
+                continue
+            if isinstance(reference, int) or is_id(str(reference)):
+                ids.add(int(reference))
+            else:
+                usernames.add(str(reference))
+        users = User.objects.filter(pk__in=ids) | User.objects.filter(username__in=usernames)
+        resolved = {}
+        for pk, username in users.values_list('id', 'username'):
+            resolved[str(pk)] = pk
+            resolved[username] = pk
+        return resolved
+
+    def flush_tasks(self):
+        self.flush_projects()
+        records = self.pending['task']
+        self.pending['task'] = []
+        if not records:
+            return
+        projects = self.resolve_projects(records)
+        users = self.resolve_users(records)
+
+        created = []
+        for line, record in records:
+            try:
+                project_id = projects.get(str(record.get('project', '')))
+                if project_id is None:
+                    raise RowError("project not found")
+                user_reference = record.get('assigned_user')
+                user_id = None
+                if user_reference not in (None, ''):
+                    user_id = users.get(str(user_reference))
+                    if user_id is None:
+                        raise RowError("assigned_user not found")
+                priority = record.get('priority') or 2
+                if str(priority) not in ('1', '2', '3'):
+                    raise RowError("priority must be 1, 2 or 3")
+                task = Task(
+                    name=parse_name(record.get('name')),
+                    description=record.get('description') or '',
+                    start_date=parse_date(record.get('start_date'), 'start_date', required=True),
+                    end_date=parse_date(record.get('end_date'), 'end_date'),
+                    priority=int(priority),
+                    project_id=project_id,
+                    assigned_user_id=user_id,
+                    is_completed=parse_bool(record.get('is_completed')),
+                )
+            except RowError as exc:
+                self.error(line, str(exc))
+                continue
+            created.append((record.get('id'), task))
+        if not created:
+            return
+
+        with transaction.atomic(), project_counters() as counters:
+            Task.objects.bulk_create([task for _, task in created], batch_size=self.chunk_size)
+            for _, task in created:
+                counters.save(task)
+            index_objects(task for _, task in created)
+        for source_id, task in created:
+            if source_id is not None:
+                self.task_ids[str(source_id)] = (task.pk, task.project_id)
+            self.touched_projects.add(task.project_id)
+        self.counts['tasks'] += len(created)
+
+    def resolve_tasks(self, references):
+        """Map task references to (task id, project id): source ids first, then existing ids"""
+        unknown = {int(reference) for reference in references
+                   if reference not in self.task_ids and is_id(reference)}
+        existing = Task.objects.filter(pk__in=unknown).values_list('id', 'project_id')
+        return {str(pk): (pk, project_id) for pk, project_id in existing}
+
+    def resolve_dependencies(self, final=False):
+        """
+        Turn the pending dependency records into edges. Before the final pass
+        only references to tasks this import has created are resolved; the
+        rest may name a task later in the input and are kept for the end.
+        """
+        references = [
+            (line, str(record.get('task', '')), str(record.get('dependent_on_task', '')))
+            for line, record in self.pending['dependency']
+        ]
+        self.pending['dependency'] = []
+        if not final:
+            for line, task, dependent_on in references:
+                if task in self.task_ids and dependent_on in self.task_ids:
+                    self.add_edge(line, self.task_ids[task], self.task_ids[dependent_on])
+                else:
+                    self.deferred.append((line, task, dependent_on))
+            return
+        references, self.deferred = self.deferred + references, []
+        for start in range(0, len(references), self.chunk_size):
+            chunk = references[start:start + self.chunk_size]
+            tasks = self.resolve_tasks({reference for _, *pair in chunk for reference in pair})
+            for line, task, dependent_on in chunk:
+                self.add_edge(line, self.resolve_task(task, tasks),
+                              self.resolve_task(dependent_on, tasks))
+
+    def add_edge(self, line, task, dependent_on):
+        if task is None or dependent_on is None:
+            self.error(line, "task not found")
+        elif task[0] == dependent_on[0]:
+            self.error(line, "A task cannot depend on itself")
+        else:
+            self.edges.setdefault((task[0], dependent_on[0]), line)
+            self.project_of[task[0]] = task[1]
+            self.project_of[dependent_on[0]] = dependent_on[1]
+
+    def flush_dependencies(self):
+        edges, project_of = self.edges, self.project_of
+        self.edges, self.project_of = {}, {}
+        if not edges:
+            return
+
+        # One traversal for the whole import finds every edge that closes a cycle
+        closing = find_closing_edges(list(edges), project_of)
+        for line in sorted(edges.pop(pair) for pair in closing):
+            self.error(line, "Dependency would create a circular dependency")
+
+        pairs = list(edges)
+        for start in range(0, len(pairs), self.chunk_size):
+            with transaction.atomic():
+                TaskDependency.objects.bulk_create([
+                    TaskDependency(task_id=task_id, dependent_on_task_id=dependent_on_id)
+                    for task_id, dependent_on_id in pairs[start:start + self.chunk_size]
+                ], ignore_conflicts=True)
+        self.touched_projects |= {project_of[task_id] for task_id, _ in pairs}
+        invalidate_task_payloads({task_id for task_id, _ in pairs}, dependencies=True)
+        self.counts['dependencies'] += len(pairs)
+
+    def resolve_task(self, reference, existing):
+        return self.task_ids.get(reference) or existing.get(reference)
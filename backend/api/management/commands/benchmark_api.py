@@ -0,0 +1,74 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import SCENARIOS, BenchmarkRunner, benchmark_database, compare
+
+
+class Command(BaseCommand):
+    help = ("Benchmark the API through the Django test client on a throwaway database "
+            "filled by generate_data. Run with --settings=agileflow_backend.settings_benchmark "
+            "for the reference SQLite setup.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=20)
+        parser.add_argument('--tasks', type=int, default=200, help="Tasks per project")
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--dependencies', type=float, default=1.5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=200, help="Timed requests per scenario")
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--cold-cache', action='store_true',
+                            help="Clear the payload cache before every request")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            choices=[scenario.name for scenario in SCENARIOS],
+                            help="Only run this scenario (repeatable)")
+        parser.add_argument('--existing-db', action='store_true',
+                            help="Benchmark the configured database as it is instead of generating one")
+        parser.add_argument('--output', help="Write the JSON results to this file")
+        parser.add_argument('--compare', help="Previous JSON results to report changes against")
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['warmup'] < 0:
+            raise CommandError("--requests must be positive and --warmup not negative")
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as stream:
+                    baseline = json.load(stream)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read {options['compare']}: {exc}")
+
+        with benchmark_database(
+            existing=options['existing_db'], stdout=self.stderr, projects=options['projects'],
+            tasks=options['tasks'], users=options['users'],
+            dependencies=options['dependencies'], seed=options['seed'],
+        ):
+            runner = BenchmarkRunner(
+                requests=options['requests'], warmup=options['warmup'], seed=options['seed'],
+                cold_cache=options['cold_cache'], scenarios=options['scenarios'],
+            )
+            try:
+                report = runner.run()
+            except (ValueError, RuntimeError) as exc:
+                raise CommandError(str(exc))
+
+        if baseline is not None:
+            report['changes'] = compare(report, baseline)
+        self.write_table(report)
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(report, stream, indent=2)
+
+    def write_table(self, report):
+        changes = report.get('changes', {})
+        self.stdout.write(f"{'scenario':<22}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'queries':>9}")
+        for name, result in report['results'].items():
+            line = (f"{name:<22}{result['requests_per_second']:>10}{result['p50_ms']:>10}"
+                    f"{result['p99_ms']:>10}{result['queries_per_request']:>9}")
+            if name in changes:
+                line += '   ' + ' '.join(
+                    f"{metric.split('_')[0]} {change:+}%"
+                    for metric, change in changes[name].items() if change is not None
+                )
+            self.stdout.write(line)
@@ -0,0 +1,61 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import CONCURRENT_SCENARIOS, ConcurrencyBenchmark, benchmark_database
+
+
+class Command(BaseCommand):
+    help = ("Compare the hot read endpoints served by the WSGI application (sync DRF views "
+            "on a worker thread pool) and the ASGI application (async views) under "
+            "concurrent clients, on a throwaway database filled by generate_data. Run with "
+            "--settings=agileflow_backend.settings_benchmark for the reference SQLite setup.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=20)
+        parser.add_argument('--tasks', type=int, default=200, help="Tasks per project")
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--dependencies', type=float, default=1.5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=400,
+                            help="Requests per server and concurrency level")
+        parser.add_argument('--concurrency', type=int, action='append',
+                            help="Concurrent clients (repeatable, default 1, 16 and 64)")
+        parser.add_argument('--wsgi-threads', type=int, default=8,
+                            help="Worker threads of the simulated WSGI server")
+        parser.add_argument('--db-latency-ms', type=float, default=0.0,
+                            help="Simulated database round trip added to every query")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            choices=CONCURRENT_SCENARIOS, help="Only request this scenario (repeatable)")
+        parser.add_argument('--existing-db', action='store_true',
+                            help="Benchmark the configured database as it is instead of generating one")
+        parser.add_argument('--output', help="Write the JSON results to this file")
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency'] or [1, 16, 64]
+        if options['requests'] < 1 or options['wsgi_threads'] < 1 or min(concurrency) < 1:
+            raise CommandError("--requests, --wsgi-threads and --concurrency must be positive")
+        if options['db_latency_ms'] < 0:
+            raise CommandError("--db-latency-ms must not be negative")
+        with benchmark_database(
+            existing=options['existing_db'], stdout=self.stderr, projects=options['projects'],
+            tasks=options['tasks'], users=options['users'],
+            dependencies=options['dependencies'], seed=options['seed'],
+        ):
+            benchmark = ConcurrencyBenchmark(
+                requests=options['requests'], concurrency=concurrency,
+                wsgi_threads=options['wsgi_threads'], seed=options['seed'],
+                scenarios=options['scenarios'], db_latency=options['db_latency_ms'] / 1000,
+            )
+            try:
+                report = benchmark.run()
+            except (ValueError, RuntimeError) as exc:
+                raise CommandError(str(exc))
+
+        self.stdout.write(f"{'server':<14}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, result in report['results'].items():
+            self.stdout.write(f"{name:<14}{result['requests_per_second']:>10}"
+                              f"{result['p50_ms']:>10}{result['p99_ms']:>10}")
+        if options['output']:
+            with open(options['output'], 'w') as stream:
+                json.dump(report, stream, indent=2)
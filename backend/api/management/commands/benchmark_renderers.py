@@ -0,0 +1,94 @@
+import json
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Project, Task
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import TaskSerializer, TaskValuesSerializer
+
+
+def build_tasks(count):
+    """Unsaved tasks with assigned users, so the benchmark never touches the database"""
+    now = timezone.now()
+    users = [User(id=i, username=f'user{i}', email=f'user{i}@example.com',
+                  first_name='First', last_name='Last') for i in range(1, 51)]
+    project = Project(id=1, name='Benchmark', start_date=date(2024, 1, 1))
+    tasks = []
+    for i in range(1, count + 1):
+        task = Task(id=i, name=f'Task {i}', description='Lorem ipsum dolor sit amet ' * 4,
+                    start_date=date(2024, 1, 1) + timedelta(days=i % 365),
+                    end_date=date(2024, 1, 10) + timedelta(days=i % 365),
+                    priority=i % 3 + 1, project=project, is_completed=i % 4 == 0,
+                    created_at=now, updated_at=now)
+        if i % 5:
+            task.assigned_user = users[i % len(users)]
+        tasks.append(task)
+    return tasks
+
+
+def as_rows(tasks):
+    """The rows TaskValuesSerializer.values() would fetch for `tasks`"""
+    rows = []
+    for task in tasks:
+        user = task.assigned_user
+        rows.append({
+            'id': task.id, 'name': task.name, 'description': task.description,
+            'start_date': task.start_date, 'end_date': task.end_date, 'priority': task.priority,
+            'project_id': task.project_id, 'assigned_user_id': task.assigned_user_id,
+            'is_completed': task.is_completed, 'created_at': task.created_at,
+            'updated_at': task.updated_at,
+            'assigned_user__username': user and user.username,
+            'assigned_user__email': user and user.email,
+            'assigned_user__first_name': user and user.first_name,
+            'assigned_user__last_name': user and user.last_name,
+        })
+    return rows
+
+
+class Command(BaseCommand):
+    help = ("Time serializing and rendering a task list: model serializer with the stock "
+            "and fast JSON renderers, and values() rows with the fast renderer")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Runs per renderer; the best run is reported")
+
+    def handle(self, *args, **options):
+        if options['tasks'] < 1 or options['repeat'] < 1:
+            raise CommandError("--tasks and --repeat must be positive")
+        tasks = build_tasks(options['tasks'])
+        rows = as_rows(tasks)
+        runs = (
+            ('stock', lambda: TaskSerializer(tasks, many=True).data, JSONRenderer()),
+            ('fast', lambda: TaskSerializer(tasks, many=True).data, FastJSONRenderer()),
+            ('values', lambda: TaskValuesSerializer(rows).data, FastJSONRenderer()),
+        )
+
+        results = {'tasks': options['tasks'], 'orjson': orjson is not None}
+        for name, serialize, renderer in runs:
+            serialize_times, render_times = [], []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                data = serialize()
+                serialized = time.perf_counter()
+                body = renderer.render(data)
+                rendered = time.perf_counter()
+                serialize_times.append(serialized - started)
+                render_times.append(rendered - serialized)
+            results[name] = {
+                'serialize_ms': round(min(serialize_times) * 1000, 2),
+                'render_ms': round(min(render_times) * 1000, 2),
+                'total_ms': round((min(serialize_times) + min(render_times)) * 1000, 2),
+                'bytes': len(body),
+            }
+        results['render_speedup'] = round(
+            results['stock']['render_ms'] / max(results['fast']['render_ms'], 0.001), 2)
+        results['serialize_speedup'] = round(
+            results['stock']['serialize_ms'] / max(results['values']['serialize_ms'], 0.001), 2)
+        self.stdout.write(json.dumps(results, indent=2))
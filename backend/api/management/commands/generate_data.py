@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.synthetic import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = "Generate a reproducible synthetic dataset of users, projects, tasks and dependencies"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=10)
+        parser.add_argument('--tasks', type=int, default=100, help="Tasks per project")
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--dependencies', type=float, default=1.5,
+                            help="Mean dependency edges per task")
+        parser.add_argument('--zipf', type=float, default=1.2,
+                            help="Exponent of the power-law spread of assignees")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if min(options['projects'], options['tasks'], options['users']) < 0 or options['dependencies'] < 0:
+            raise CommandError("Counts must not be negative")
+        generator = DatasetGenerator(
+            projects=options['projects'], tasks_per_project=options['tasks'],
+            users=options['users'], dependencies_per_task=options['dependencies'],
+            zipf_exponent=options['zipf'], seed=options['seed'],
+        )
+        self.stdout.write(json.dumps(generator.run()))
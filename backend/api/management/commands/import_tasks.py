@@ -0,0 +1,42 @@
+import io
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import IMPORT_FORMATS, RECORD_TYPES, TaskImporter, iter_records
+
+
+class Command(BaseCommand):
+    help = "Stream projects, tasks and dependencies from an NDJSON or CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or - for stdin")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, default=None,
+                            help="Input format (default: from the file extension, else ndjson)")
+        parser.add_argument('--type', choices=RECORD_TYPES, default='task',
+                            help="Record type of every CSV row (default: task)")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+        else:
+            try:
+                stream = open(path, encoding='utf-8', newline='')
+            except OSError as exc:
+                raise CommandError(str(exc))
+
+        with stream:
+            importer = TaskImporter(chunk_size=options['chunk_size'])
+            report = importer.run(iter_records(stream, file_format, options['type']))
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        summary = {key: value for key, value in report.items() if key != 'errors'}
+        self.stdout.write(json.dumps(summary))
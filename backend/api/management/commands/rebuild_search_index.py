@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.search import rebuild_index, uses_search_vector
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of projects and tasks from their text"
+
+    def handle(self, *args, **options):
+        if uses_search_vector():
+            self.stdout.write("PostgreSQL maintains the search_vector columns itself; nothing to do")
+            return
+        self.stdout.write(f"{rebuild_index()} row(s) indexed")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.counters import recount_projects
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized per-project task counters from the tasks table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_ids', nargs='*', type=int,
+                            help="Only these projects (default: all)")
+
+    def handle(self, *args, **options):
+        repaired = recount_projects(options['project_ids'] or None)
+        self.stdout.write(f"{repaired} project(s) repaired")
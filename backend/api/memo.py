@@ -0,0 +1,56 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+class ProjectMemo:
+    """
+    In-process LRU of values computed per project by `build(project_id)`.
+    Entries are validated against a per-project token kept in Django's
+    cache, so `invalidate` in one process is seen by every other one.
+    """
+
+    def __init__(self, name, build, size=64):
+        self.name = name
+        self.build = build
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _token_key(self, project_id):
+        return f'{self.name}:{project_id}'
+
+    def get(self, project_id):
+        key = self._token_key(project_id)
+        token = cache.get(key)
+        if token is None:
+            cache.add(key, uuid.uuid4().hex, None)
+            token = cache.get(key)
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is not None and entry[0] == token:
+                self._entries.move_to_end(project_id)
+                return entry[1]
+
+        value = self.build(project_id)
+        with self._lock:
+            self._entries[project_id] = (token, value)
+            self._entries.move_to_end(project_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, project_id):
+        if project_id is None:
+            return
+        self._drop(project_id)
+        # Again after commit, in case a concurrent reader cached pre-commit data
+        transaction.on_commit(lambda: self._drop(project_id))
+
+    def _drop(self, project_id):
+        cache.set(self._token_key(project_id), uuid.uuid4().hex, None)
+        with self._lock:
+            self._entries.pop(project_id, None)
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:29
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def count_existing_tasks(apps, schema_editor):
+    """Backfill the counters in one GROUP BY (api.counters.recount_projects, frozen)"""
+    Project = apps.get_model('api', 'Project')
+    Task = apps.get_model('api', 'Task')
+    fields = ['task_count', 'completed_task_count', 'low_priority_count',
+              'medium_priority_count', 'high_priority_count', 'tasks_updated_at']
+    rows = Task.objects.order_by().values('project_id').annotate(
+        task_count=Count('id'),
+        completed_task_count=Count('id', filter=Q(is_completed=True)),
+        low_priority_count=Count('id', filter=Q(priority=1)),
+        medium_priority_count=Count('id', filter=Q(priority=2)),
+        high_priority_count=Count('id', filter=Q(priority=3)),
+        tasks_updated_at=Max('updated_at'),
+    )
+    projects = []
+    for row in rows:
+        project = Project(pk=row.pop('project_id'))
+        for field, value in row.items():
+            setattr(project, field, value)
+        projects.append(project)
+    Project.objects.bulk_update(projects, fields, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='high_priority_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='low_priority_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='medium_priority_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='tasks_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(count_existing_tasks, migrations.RunPython.noop),
+    ]
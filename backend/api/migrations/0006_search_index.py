@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:46
+
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+SEARCH_TABLES = {'project': 'api_project', 'task': 'api_task'}
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its of on or that the this '
+    'to was were will with'.split()
+)
+WORD = re.compile(r'\w+')
+
+
+def term_weights(name, description):
+    """Weighted occurrences of each term (api.search.term_weights, frozen)"""
+    weights = Counter()
+    for text, weight in ((name, 1.0), (description, 0.4)):
+        for word in WORD.findall((text or '').lower()):
+            if word not in STOP_WORDS:
+                weights[word[:64]] += weight
+    return weights
+
+
+def add_search_vectors(apps, schema_editor):
+    """A weighted tsvector the database keeps up to date, and its GIN index"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model, table in SEARCH_TABLES.items():
+        schema_editor.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            f"setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {model}_search_idx ON {table} USING GIN (search_vector)"
+        )
+
+
+def remove_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model, table in SEARCH_TABLES.items():
+        schema_editor.execute(f"DROP INDEX IF EXISTS {model}_search_idx")
+        schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+
+
+def index_existing_rows(apps, schema_editor):
+    """Backfill the inverted index where there is no search_vector (api.search.index_objects)"""
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    SearchTerm = apps.get_model('api', 'SearchTerm')
+    for model in SEARCH_TABLES:
+        queryset = apps.get_model('api', model).objects.only('id', 'name', 'description')
+        SearchTerm.objects.bulk_create((
+            SearchTerm(model=model, object_id=obj.pk, term=term, weight=weight)
+            for obj in queryset.iterator(chunk_size=1000)
+            for term, weight in term_weights(obj.name, obj.description).items()
+        ), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_project_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('project', 'Project'), ('task', 'Task')], max_length=32)),
+                ('object_id', models.BigIntegerField()),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.FloatField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'term', 'object_id', 'weight'], name='searchterm_lookup_idx')],
+                'unique_together': {('model', 'object_id', 'term')},
+            },
+        ),
+        migrations.RunPython(add_search_vectors, remove_search_vectors),
+        migrations.RunPython(index_existing_rows, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 class Project(models.Model):
@@ -9,9 +9,36 @@ class Project(models.Model):
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from the project's tasks, maintained by api.counters
+    task_count = models.IntegerField(default=0, editable=False)
+    completed_task_count = models.IntegerField(default=0, editable=False)
+    low_priority_count = models.IntegerField(default=0, editable=False)
+    medium_priority_count = models.IntegerField(default=0, editable=False)
+    high_priority_count = models.IntegerField(default=0, editable=False)
+    tasks_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    COUNTER_FIELDS = ('task_count', 'completed_task_count', 'low_priority_count',
+                      'medium_priority_count', 'high_priority_count', 'tasks_updated_at')
+    
+    class Meta:
+        indexes = [
+            # Keyset pagination ordering (see api.pagination)
+            models.Index(fields=['updated_at', 'id'], name='project_updated_id_idx'),
+            # Admin list_filter / date hierarchy
+            models.Index(fields=['start_date'], name='project_start_date_idx'),
+        ]
     
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        # Counters only change through UPDATE ... SET x = x + delta; writing
+        # back the values loaded with the project would undo concurrent ones
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
 class Task(models.Model):
     PRIORITY_CHOICES = [
@@ -31,8 +58,40 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            # Keyset pagination orderings (see api.pagination)
+            models.Index(fields=['updated_at', 'id'], name='task_updated_id_idx'),
+            models.Index(fields=['project', 'id'], name='task_project_id_idx'),
+            # Open tasks of a project or an assignee. Partial, so the condition
+            # matches the `NOT is_completed` Django generates for is_completed=False
+            models.Index(fields=['project'], name='task_project_open_idx',
+                         condition=models.Q(is_completed=False)),
+            models.Index(fields=['assigned_user', 'priority'], name='task_assignee_open_idx',
+                         condition=models.Q(is_completed=False)),
+            models.Index(fields=['priority'], name='task_priority_idx'),
+            # Date windows; tasks without an end date never match an end_date range
+            models.Index(fields=['start_date'], name='task_start_date_idx'),
+            models.Index(fields=['end_date'], name='task_end_date_idx',
+                         condition=models.Q(end_date__isnull=False)),
+        ]
+    
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        # api.signals reads the row's counted state under a lock before the
+        # write and updates the project counters after it, in one transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the Project counters count this task as, to apply deltas on save
+        if {'project_id', 'is_completed', 'priority'} <= set(field_names):
+            instance._counted_as = (instance.project_id, instance.is_completed, instance.priority)
+        return instance
 
 class TaskDependency(models.Model):
     task = models.ForeignKey(Task, related_name='dependencies', on_delete=models.CASCADE)
@@ -41,6 +100,58 @@ class TaskDependency(models.Model):
     
     class Meta:
         unique_together = ('task', 'dependent_on_task')
+        indexes = [
+            # "What depends on this task", answered from the index alone
+            models.Index(fields=['dependent_on_task', 'task'], name='taskdep_reverse_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=~models.Q(task=models.F('dependent_on_task')),
+                                   name='taskdep_not_self'),
+        ]
         
     def __str__(self):
         return f"{self.task.name} depends on {self.dependent_on_task.name}"
+
+class DeletionLog(models.Model):
+    """Tombstone for a deleted Project, Task or TaskDependency, used by delta sync"""
+    MODEL_CHOICES = [
+        ('project', 'Project'),
+        ('task', 'Task'),
+        ('taskdependency', 'Task dependency'),
+    ]
+    
+    model = models.CharField(max_length=32, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        indexes = [
+            # latest_deletion(): newest tombstone of some models
+            models.Index(fields=['model', 'deleted_at'], name='deletionlog_model_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted"
+
+class SearchTerm(models.Model):
+    """Inverted index entry for full-text search where the database has none (see api.search)"""
+    MODEL_CHOICES = [
+        ('project', 'Project'),
+        ('task', 'Task'),
+    ]
+    
+    model = models.CharField(max_length=32, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    term = models.CharField(max_length=64)
+    # Occurrences weighted by field, like the weights of a Postgres tsvector
+    weight = models.FloatField()
+    
+    class Meta:
+        unique_together = ('model', 'object_id', 'term')
+        indexes = [
+            # Postings of a term, with the weight needed to rank them
+            models.Index(fields=['model', 'term', 'object_id', 'weight'], name='searchterm_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.term} in {self.model} {self.object_id}"
@@ -0,0 +1,37 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination without OFFSET or COUNT(*), opted into with
+    `?pagination=cursor`. Each subclass' ordering must match an index.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
+
+
+class UpdatedAtCursorPagination(KeysetPagination):
+    """Most recently updated first, keyed on (updated_at, id)"""
+    ordering = ('-updated_at', '-id')
+
+
+class ProjectTaskCursorPagination(KeysetPagination):
+    """Tasks of a single project, keyed on (project_id, id)"""
+    ordering = ('id',)
+
+
+class OptInCursorPaginationMixin:
+    """
+    Switch a viewset from the default page-number pagination to
+    `cursor_pagination_class` when the client asks for `?pagination=cursor`.
+    """
+    cursor_pagination_class = UpdatedAtCursorPagination
+
+    def use_cursor_pagination(self):
+        return self.request.query_params.get('pagination') == 'cursor'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator') and self.use_cursor_pagination():
+            self._paginator = self.cursor_pagination_class()
+        return super().paginator
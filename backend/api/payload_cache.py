@@ -0,0 +1,121 @@
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+class CacheStats:
+    """Hit/miss counters for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0,
+        }
+
+
+stats = CacheStats()
+
+
+def project_version(project_id):
+    return f'project:{project_id}'
+
+
+def task_version(task_id):
+    return f'task:{task_id}'
+
+
+DEPENDENCIES_VERSION = 'dependencies'
+USERS_VERSION = 'users'
+
+
+def _version_key(name):
+    return f'payload-version:{name}'
+
+
+def _bump(names):
+    cache.set_many({_version_key(name): uuid.uuid4().hex for name in names}, None)
+
+
+def bump_versions(*names):
+    """Invalidate every payload cached under any of these version names"""
+    if names:
+        _bump(names)
+        # Again after commit, in case a concurrent reader cached pre-commit data
+        transaction.on_commit(lambda: _bump(names))
+
+
+def _current_versions(names):
+    keys = [_version_key(name) for name in names]
+    tokens = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in tokens}
+    if missing:
+        # add() so concurrent requests agree on the first token
+        for key, token in missing.items():
+            cache.add(key, token, None)
+        tokens.update(cache.get_many(list(missing)))
+    return [tokens.get(key, '') for key in keys]
+
+
+def version_tokens(*names):
+    """Current tokens of these version names, for validators that must change with them"""
+    return _current_versions(names)
+
+
+async def _acurrent_versions(names):
+    keys = [_version_key(name) for name in names]
+    tokens = await cache.aget_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in tokens}
+    if missing:
+        for key, token in missing.items():
+            await cache.aadd(key, token, None)
+        tokens.update(await cache.aget_many(list(missing)))
+    return [tokens.get(key, '') for key in keys]
+
+
+def _payload_key(kind, object_id, tokens):
+    return ':'.join(['payload', kind, str(object_id)] + tokens)
+
+
+def cached_payload(kind, object_id, versions, build, timeout=None):
+    """
+    Return the payload `build()` produced for this object, as long as none
+    of the `versions` it depends on were bumped since it was cached, nor
+    `timeout` seconds (API_CACHE_TIMEOUT by default) went by.
+    """
+    key = _payload_key(kind, object_id, _current_versions(versions))
+    payload = cache.get(key)
+    stats.record(payload is not None)
+    if payload is None:
+        payload = build()
+        if timeout is None:
+            timeout = getattr(settings, 'API_CACHE_TIMEOUT', 300)
+        cache.set(key, payload, timeout)
+    return payload
+
+
+async def acached_payload(kind, object_id, versions, build):
+    """cached_payload() for async views; `build` is a coroutine function"""
+    key = _payload_key(kind, object_id, await _acurrent_versions(versions))
+    payload = await cache.aget(key)
+    stats.record(payload is not None)
+    if payload is None:
+        payload = await build()
+        await cache.aset(key, payload, getattr(settings, 'API_CACHE_TIMEOUT', 300))
+    return payload
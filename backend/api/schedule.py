@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from .graph import get_project_graph
+from .memo import ProjectMemo
+from .models import Project, Task
+
+
+class DependencyCycle(Exception):
+    """The project's dependencies contain a cycle, so it cannot be scheduled"""
+
+    def __init__(self, task_ids):
+        super().__init__(task_ids)
+        self.task_ids = task_ids
+
+
+def task_duration(start_date, end_date):
+    """Inclusive length of a task in days; open-ended tasks count as one day"""
+    if end_date is None or end_date < start_date:
+        return 1
+    return (end_date - start_date).days + 1
+
+
+def compute_schedule(project_id):
+    """
+    Critical path method over the project's dependency DAG: a forward pass
+    in topological order for earliest start/finish and a backward pass for
+    latest start/finish, both linear in tasks plus edges. Offsets are in
+    days from the project start; finish dates, like Task.end_date, are the
+    last day of work, so a one-day task finishes on the day it starts.
+    Dependencies on tasks of other projects are ignored.
+    """
+    project_start = Project.objects.values_list('start_date', flat=True).get(pk=project_id)
+    durations = {
+        task_id: task_duration(start_date, end_date)
+        for task_id, start_date, end_date in Task.objects.filter(
+            project_id=project_id
+        ).values_list('id', 'start_date', 'end_date').iterator(chunk_size=5000)
+    }
+    graph = get_project_graph(project_id)
+
+    # depends_on edges restricted to this project, plus their reverse
+    depends_on = {task_id: [] for task_id in durations}
+    dependents = {task_id: [] for task_id in durations}
+    for task_id, targets in graph.depends_on.items():
+        for target in targets:
+            if task_id in durations and target in durations:
+                depends_on[task_id].append(target)
+                dependents[target].append(task_id)
+
+    # Kahn's algorithm: a task is ready once everything it depends on is placed
+    waiting = {task_id: len(targets) for task_id, targets in depends_on.items()}
+    order = [task_id for task_id, count in waiting.items() if count == 0]
+    for task_id in order:
+        for dependent in dependents[task_id]:
+            waiting[dependent] -= 1
+            if waiting[dependent] == 0:
+                order.append(dependent)
+    if len(order) < len(durations):
+        raise DependencyCycle(sorted(t for t, count in waiting.items() if count > 0))
+
+    earliest_start = {}
+    for task_id in order:
+        earliest_start[task_id] = max(
+            (earliest_start[t] + durations[t] for t in depends_on[task_id]), default=0
+        )
+    finish = max((earliest_start[t] + durations[t] for t in order), default=0)
+
+    latest_finish = {}
+    for task_id in reversed(order):
+        latest_finish[task_id] = min(
+            (latest_finish[t] - durations[t] for t in dependents[task_id]), default=finish
+        )
+
+    def last_day(offset):
+        """Date of the last day before offset `offset`; empty projects end on their start"""
+        return project_start + timedelta(days=max(offset - 1, 0))
+
+    tasks = []
+    for task_id in order:
+        es = earliest_start[task_id]
+        ls = latest_finish[task_id] - durations[task_id]
+        tasks.append({
+            'id': task_id,
+            'duration': durations[task_id],
+            'earliest_start': project_start + timedelta(days=es),
+            'earliest_finish': last_day(es + durations[task_id]),
+            'latest_start': project_start + timedelta(days=ls),
+            'latest_finish': last_day(latest_finish[task_id]),
+            'slack': ls - es,
+            'is_critical': ls == es,
+        })
+
+    # Follow zero-slack tasks from a critical task with no predecessors
+    critical_path = []
+    current = next(
+        (t['id'] for t in tasks if t['is_critical'] and earliest_start[t['id']] == 0), None
+    )
+    while current is not None:
+        critical_path.append(current)
+        end = earliest_start[current] + durations[current]
+        current = next(
+            (t for t in dependents[current]
+             if earliest_start[t] == end and latest_finish[t] - durations[t] == end),
+            None,
+        )
+
+    return {
+        'project': project_id,
+        'start_date': project_start,
+        'end_date': last_day(finish),
+        'duration': finish,
+        'critical_path': critical_path,
+        'tasks': tasks,
+    }
+
+
+_schedules = ProjectMemo('project-schedule', compute_schedule)
+
+
+def get_project_schedule(project_id):
+    """Return the project's memoized schedule, recomputing it after changes"""
+    return _schedules.get(project_id)
+
+
+def invalidate_project_schedule(project_id):
+    _schedules.invalidate(project_id)
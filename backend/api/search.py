@@ -0,0 +1,123 @@
+"""
+Full-text search over project and task names and descriptions, behind the
+?search= filter (api.filters.IndexedSearchFilter) and the admin search box.
+
+On PostgreSQL, migration 0006 gives both tables a generated search_vector
+column, with names weighted above descriptions, and a GIN index on it.
+Queries use websearch_to_tsquery and rank with ts_rank. Other databases use
+the SearchTerm inverted index, which the signals and the bulk write paths
+keep in sync. There a query reads the postings of its terms, so it costs
+as much as the number of matches, not the size of the table. That index
+matches whole words without stemming, and a row must contain every term.
+"""
+import re
+from collections import Counter
+
+from django.db import connections
+from django.db.models import BooleanField, Count, FloatField, OuterRef, Subquery, Sum
+from django.db.models.expressions import RawSQL
+
+from .models import Project, SearchTerm, Task
+
+# Text search configuration of the search_vector columns (see migration 0006)
+SEARCH_CONFIG = 'english'
+# ts_rank's default weights for the A (name) and B (description) labels
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+MAX_TERM_LENGTH = SearchTerm._meta.get_field('term').max_length
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its of on or that the this '
+    'to was were will with'.split()
+)
+WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lowercased words of `text`, without stop words"""
+    return [
+        word[:MAX_TERM_LENGTH] for word in WORD.findall((text or '').lower())
+        if word not in STOP_WORDS
+    ]
+
+
+def term_weights(name, description):
+    """Weighted occurrences of each term in a name and a description"""
+    weights = Counter()
+    for term in tokenize(name):
+        weights[term] += NAME_WEIGHT
+    for term in tokenize(description):
+        weights[term] += DESCRIPTION_WEIGHT
+    return weights
+
+
+def uses_search_vector(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def index_objects(objects):
+    """(Re)index saved projects or tasks of one model; the database does it on PostgreSQL"""
+    # A row listed twice is indexed once, as its last instance
+    objects = {obj.pk: obj for obj in objects}
+    if not objects or uses_search_vector():
+        return
+    model = next(iter(objects.values()))._meta.model_name
+    SearchTerm.objects.filter(model=model, object_id__in=list(objects)).delete()
+    SearchTerm.objects.bulk_create([
+        SearchTerm(model=model, object_id=obj.pk, term=term, weight=weight)
+        for obj in objects.values()
+        for term, weight in term_weights(obj.name, obj.description).items()
+    ], batch_size=1000)
+
+
+def reindex(model, ids):
+    """Reindex rows whose text was changed by a queryset update()"""
+    if not uses_search_vector():
+        index_objects(model.objects.filter(pk__in=ids).only('id', 'name', 'description'))
+
+
+def unindex(model, ids):
+    if not uses_search_vector():
+        SearchTerm.objects.filter(model=model._meta.model_name, object_id__in=ids).delete()
+
+
+def rebuild_index():
+    """Index every project and task from scratch; returns how many rows were indexed"""
+    if uses_search_vector():
+        return 0
+    SearchTerm.objects.all().delete()
+    indexed = 0
+    for model in (Project, Task):
+        queryset = model.objects.only('id', 'name', 'description').order_by('id')
+        batch = []
+        for obj in queryset.iterator(chunk_size=1000):
+            batch.append(obj)
+            if len(batch) == 1000:
+                index_objects(batch)
+                indexed, batch = indexed + len(batch), []
+        index_objects(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def search(queryset, query):
+    """`queryset` narrowed to the rows matching `query`, best match first"""
+    if uses_search_vector(queryset.db):
+        connection = connections[queryset.db]
+        column = f'{connection.ops.quote_name(queryset.model._meta.db_table)}.search_vector'
+        tsquery = 'websearch_to_tsquery(%s::regconfig, %s)'
+        params = [SEARCH_CONFIG, query]
+        match = RawSQL(f'{column} @@ {tsquery}', params, output_field=BooleanField())
+        rank = RawSQL(f'ts_rank({column}, {tsquery})', params, output_field=FloatField())
+        return queryset.filter(match).order_by(rank.desc(), 'id')
+
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return queryset.none()
+    # Rows holding every term, with the sum of the terms' weights as rank
+    matches = SearchTerm.objects.filter(
+        model=queryset.model._meta.model_name, term__in=terms
+    ).values('object_id').annotate(matched=Count('term'), rank=Sum('weight')).filter(
+        matched=len(terms)
+    )
+    rank = Subquery(matches.filter(object_id=OuterRef('pk')).values('rank'))
+    return queryset.filter(pk__in=matches.values('object_id')).order_by(rank.desc(), 'id')
@@ -1,6 +1,13 @@
-from rest_framework import serializers
+from operator import itemgetter
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
 from django.contrib.auth.models import User
+from django.utils import timezone
+from .counters import project_counters, task_state
+from .events import hub, task_event
+from .fieldsets import SparseFieldsMixin
 from .models import Project, Task, TaskDependency
+from .search import index_objects
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,15 +19,93 @@ class TaskDependencySerializer(serializers.ModelSerializer):
         model = TaskDependency
         fields = ['id', 'task', 'dependent_on_task', 'created_at']
 
-class TaskSerializer(serializers.ModelSerializer):
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves pks from objects a list serializer looked up in one query"""
+    
+    def to_internal_value(self, data):
+        related = self.context.get('related_objects', {}).get(self.field_name)
+        if related and not isinstance(data, bool):
+            try:
+                return related[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+class TaskListSerializer(serializers.ListSerializer):
+    """Validates and writes many tasks with a fixed number of queries"""
+    related_models = {'project': Project, 'assigned_user': User}
+    
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.context['related_objects'] = self.lookup_related_objects(data)
+        return super().to_internal_value(data)
+    
+    def lookup_related_objects(self, data):
+        related = {}
+        for name, model in self.related_models.items():
+            ids = set()
+            for item in data:
+                value = item.get(name) if isinstance(item, dict) else None
+                if isinstance(value, int) and not isinstance(value, bool):
+                    ids.add(value)
+                elif isinstance(value, str) and value.isdigit():
+                    ids.add(int(value))
+            related[name] = model.objects.in_bulk(ids) if ids else {}
+        return related
+    
+    def create(self, validated_data):
+        tasks = [Task(**attrs) for attrs in validated_data]
+        tasks = Task.objects.bulk_create(tasks, batch_size=1000)
+        hub.publish(task_event(task.pk, task.project_id, 'created') for task in tasks)
+        index_objects(tasks)
+        with project_counters() as counters:
+            for task in tasks:
+                counters.save(task)
+        return tasks
+    
+    def update(self, instances, validated_data):
+        # Count from the rows as they are now, locked until the transaction
+        # ends, rather than from the instances the caller loaded
+        current = Task.objects.select_for_update().filter(
+            pk__in=[task.pk for task in instances]
+        ).values_list('id', 'project_id', 'is_completed', 'priority')
+        states = {task_id: state for task_id, *state in current}
+        for task in instances:
+            task._counted_as = tuple(states.get(task.pk, task_state(task)))
+        # bulk_update bypasses save(), so auto_now has to be applied by hand
+        now = timezone.now()
+        fields = {'updated_at'}
+        for task, attrs in zip(instances, validated_data):
+            for attr, value in attrs.items():
+                setattr(task, attr, value)
+                fields.add(attr)
+            task.updated_at = now
+        Task.objects.bulk_update(instances, fields, batch_size=1000)
+        hub.publish(
+            task_event(task.pk, task.project_id, 'updated', task._counted_as[0])
+            for task in instances
+        )
+        with project_counters() as counters:
+            for task in instances:
+                counters.save(task)
+        if {'name', 'description'} & fields:
+            index_objects(instances)
+        return instances
+
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    serializer_related_field = BatchedPrimaryKeyRelatedField
+    expandable_fields = ('assigned_user',)
+    expanded_by_default = ('assigned_user',)
+    
     class Meta:
         model = Task
         fields = ['id', 'name', 'description', 'start_date', 'end_date', 'priority', 
                   'project', 'assigned_user', 'is_completed', 'created_at', 'updated_at']
+        list_serializer_class = TaskListSerializer
     
     def to_representation(self, instance):
         representation = super().to_representation(instance)
-        if instance.assigned_user:
+        if 'assigned_user' in representation and self.expands('assigned_user') and instance.assigned_user:
             representation['assigned_user'] = {
                 'id': instance.assigned_user.id,
                 'username': instance.assigned_user.username,
@@ -30,6 +115,120 @@ class TaskSerializer(serializers.ModelSerializer):
             }
         return representation
 
+def datetime_representation():
+    """
+    DateTimeField.to_representation with the current timezone resolved once,
+    rather than once per value, for serializing many rows
+    """
+    field = serializers.DateTimeField()
+    field_timezone = field.default_timezone()
+    if field_timezone is None or (api_settings.DATETIME_FORMAT or '').lower() != ISO_8601:
+        return field.to_representation
+    
+    def to_representation(value):
+        if not value:
+            return None
+        if timezone.is_aware(value):
+            value = value.astimezone(field_timezone)
+        else:
+            value = timezone.make_aware(value, field_timezone)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    
+    return to_representation
+
+def format_date(value):
+    return value.isoformat() if value else None
+
+def assigned_user_representation(row):
+    if not row['assigned_user_id']:
+        return None
+    return {
+        'id': row['assigned_user_id'],
+        'username': row['assigned_user__username'],
+        'email': row['assigned_user__email'],
+        'first_name': row['assigned_user__first_name'],
+        'last_name': row['assigned_user__last_name'],
+    }
+
+class TaskValuesSerializer:
+    """
+    Read-only equivalent of TaskSerializer(many=True) for list endpoints.
+    Works on `values()` rows with the assigned user joined in, so no model
+    instances or field objects are built per row; the JSON is identical.
+    A Fieldset narrows both the SELECT list and the output.
+    """
+    # Output field -> the values() columns it is built from
+    columns = {
+        'id': ['id'],
+        'name': ['name'],
+        'description': ['description'],
+        'start_date': ['start_date'],
+        'end_date': ['end_date'],
+        'priority': ['priority'],
+        'project': ['project_id'],
+        'assigned_user': ['assigned_user_id'],
+        'is_completed': ['is_completed'],
+        'created_at': ['created_at'],
+        'updated_at': ['updated_at'],
+    }
+    user_columns = ['assigned_user__username', 'assigned_user__email',
+                    'assigned_user__first_name', 'assigned_user__last_name']
+    # Cursor pagination reads its ordering columns from every row
+    always_selected = ['id', 'updated_at']
+    expandable_fields = TaskSerializer.expandable_fields
+    
+    def __init__(self, rows, fieldset=None):
+        self.rows = rows
+        self.fieldset = fieldset
+    
+    @classmethod
+    def available_fields(cls):
+        return list(cls.columns)
+    
+    @classmethod
+    def included_fields(cls, fieldset):
+        if fieldset is None:
+            return list(cls.columns)
+        return [name for name in cls.columns if fieldset.includes(name)]
+    
+    @classmethod
+    def expands_user(cls, fieldset):
+        return TaskSerializer.fieldset_expands(fieldset, 'assigned_user')
+    
+    @classmethod
+    def values(cls, queryset, fieldset=None):
+        """Rows for `queryset`; a queryset still, so it can be paginated"""
+        columns = list(cls.always_selected)
+        for name in cls.included_fields(fieldset):
+            columns += [column for column in cls.columns[name] if column not in columns]
+        if cls.expands_user(fieldset):
+            columns += cls.user_columns
+        return queryset.values(*columns)
+    
+    def get_formatters(self):
+        format_datetime = datetime_representation()
+        formatters = {
+            'start_date': lambda row: format_date(row['start_date']),
+            'end_date': lambda row: format_date(row['end_date']),
+            'is_completed': lambda row: bool(row['is_completed']),
+            'created_at': lambda row: format_datetime(row['created_at']),
+            'updated_at': lambda row: format_datetime(row['updated_at']),
+        }
+        if self.expands_user(self.fieldset):
+            formatters['assigned_user'] = assigned_user_representation
+        return [
+            (name, formatters.get(name) or itemgetter(self.columns[name][0]))
+            for name in self.included_fields(self.fieldset)
+        ]
+    
+    @property
+    def data(self):
+        formatters = self.get_formatters()
+        return [{name: format(row) for name, format in formatters} for row in self.rows]
+
 class TaskDetailSerializer(TaskSerializer):
     dependencies = serializers.SerializerMethodField()
     
@@ -37,24 +236,53 @@ class TaskDetailSerializer(TaskSerializer):
         fields = TaskSerializer.Meta.fields + ['dependencies']
     
     def get_dependencies(self, obj):
-        dependencies = TaskDependency.objects.filter(task=obj)
-        return [dep.dependent_on_task.id for dep in dependencies]
+        # Uses the prefetched `dependencies` relation when the view provides it
+        return [dep.dependent_on_task_id for dep in obj.dependencies.all()]
 
-class ProjectSerializer(serializers.ModelSerializer):
+class TaskDependencyValuesSerializer:
+    """Read-only equivalent of TaskDependencySerializer(many=True) over `values_list()` rows"""
+    columns = ['id', 'task_id', 'dependent_on_task_id', 'created_at']
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    @classmethod
+    def values(cls, queryset):
+        return queryset.values_list(*cls.columns)
+    
+    @property
+    def data(self):
+        format_datetime = datetime_representation()
+        return [
+            {'id': pk, 'task': task_id, 'dependent_on_task': dependent_on_task_id,
+             'created_at': format_datetime(created_at)}
+            for pk, task_id, dependent_on_task_id, created_at in self.rows
+        ]
+
+class ProjectSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     tasks = TaskSerializer(many=True, read_only=True)
+    expandable_fields = ('tasks',)
+    expanded_by_default = ('tasks',)
     
     class Meta:
         model = Project
         fields = ['id', 'name', 'description', 'start_date', 'end_date', 
                   'is_completed', 'tasks', 'created_at', 'updated_at']
 
-class ProjectListSerializer(serializers.ModelSerializer):
-    task_count = serializers.SerializerMethodField()
-    
+class ProjectSummarySerializer(serializers.ModelSerializer):
     class Meta:
         model = Project
         fields = ['id', 'name', 'description', 'start_date', 'end_date', 
-                  'is_completed', 'task_count', 'created_at', 'updated_at']
+                  'is_completed', 'created_at', 'updated_at']
+
+class ProjectListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Only embedded with ?expand=tasks
+    tasks = TaskSerializer(many=True, read_only=True)
+    expandable_fields = ('tasks',)
     
-    def get_task_count(self, obj):
-        return obj.tasks.count()
+    class Meta:
+        model = Project
+        # task_count and completed_task_count are maintained counters (see api.counters)
+        fields = ['id', 'name', 'description', 'start_date', 'end_date', 
+                  'is_completed', 'task_count', 'completed_task_count', 'tasks', 
+                  'created_at', 'updated_at']
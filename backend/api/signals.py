@@ -0,0 +1,272 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .counters import project_counters
+from .events import dependency_event, hub, project_event, task_event
+from .graph import invalidate_project_graph
+from .models import DeletionLog, Project, Task, TaskDependency
+from .payload_cache import (
+    DEPENDENCIES_VERSION,
+    USERS_VERSION,
+    bump_versions,
+    project_version,
+    task_version,
+)
+from .schedule import invalidate_project_schedule
+from .search import index_objects, unindex
+
+
+def invalidate_project_caches(project_id):
+    """Drop everything memoized or cached from a project's tasks and dependencies"""
+    if project_id is None:
+        return
+    invalidate_project_graph(project_id)
+    invalidate_project_schedule(project_id)
+    bump_versions(project_version(project_id))
+
+
+def invalidate_task_payloads(task_ids, dependencies=False):
+    """For writes that bypass save(): drop cached task payloads in one round trip"""
+    names = [task_version(task_id) for task_id in task_ids]
+    if dependencies:
+        names.append(DEPENDENCIES_VERSION)
+    bump_versions(*names)
+
+
+class DeletionBatch:
+    """
+    What the post_delete receivers owe for deleted rows, applied with
+    apply(): one DeletionLog insert, one unindex per model, one round trip
+    of version bumps and one publish, however many rows were deleted.
+    """
+
+    def __init__(self):
+        self.tombstones = []
+        self.unindexed = defaultdict(list)
+        self.projects = set()
+        self.versions = set()
+        self.events = []
+        # Deleted tasks' projects, for edges whose task went with them
+        self.task_projects = {}
+        # (dependency, project id or None while unknown)
+        self.edges = []
+
+    def record(self, model, object_id):
+        self.tombstones.append(DeletionLog(model=model._meta.model_name, object_id=object_id))
+
+    def unindex(self, model, object_id):
+        self.unindexed[model].append(object_id)
+
+    def delete_task(self, task):
+        self.task_projects[task.pk] = task.project_id
+        self.projects.add(task.project_id)
+        self.versions.add(task_version(task.pk))
+        self.events.append(task_event(task.pk, task.project_id, 'deleted'))
+
+    def delete_dependency(self, dependency):
+        project_id = None
+        if TaskDependency.task.is_cached(dependency):
+            project_id = dependency.task.project_id
+        self.edges.append((dependency, project_id))
+
+    def delete_project(self, project):
+        self.projects.add(project.pk)
+        self.events.append(project_event(project.pk, 'deleted'))
+
+    def resolve_edges(self):
+        """Find the projects of edges whose task was not loaded, in one query"""
+        unknown = {
+            dependency.task_id for dependency, project_id in self.edges
+            if project_id is None and dependency.task_id not in self.task_projects
+        }
+        projects = dict(self.task_projects)
+        if unknown:
+            projects.update(Task.objects.filter(pk__in=unknown).values_list('id', 'project_id'))
+        for dependency, project_id in self.edges:
+            if project_id is None:
+                project_id = projects.get(dependency.task_id)
+            self.projects.add(project_id)
+            self.versions.update((task_version(dependency.task_id), DEPENDENCIES_VERSION))
+            self.events.append(dependency_event(
+                dependency.pk, dependency.task_id, dependency.dependent_on_task_id,
+                project_id, 'deleted',
+            ))
+
+    def apply(self):
+        DeletionLog.objects.bulk_create(self.tombstones, batch_size=1000)
+        for model, ids in self.unindexed.items():
+            unindex(model, ids)
+        self.resolve_edges()
+        for project_id in self.projects - {None}:
+            invalidate_project_graph(project_id)
+            invalidate_project_schedule(project_id)
+            self.versions.add(project_version(project_id))
+        bump_versions(*self.versions)
+        hub.publish(self.events)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def deletion_batch():
+    """
+    Collect the side effects of deletes and apply them when the block exits
+    without an error; like project_counters(), nested blocks, such as the
+    post_delete receivers of every row a queryset delete() removes, join
+    the outermost batch.
+    """
+    batch = getattr(_local, 'deletions', None)
+    if batch is not None:
+        yield batch
+        return
+    batch = _local.deletions = DeletionBatch()
+    try:
+        yield batch
+    finally:
+        _local.deletions = None
+    batch.apply()
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=TaskDependency)
+def record_deletion(sender, instance, **kwargs):
+    """Write a tombstone so delta-sync clients learn about the deletion"""
+    with deletion_batch() as batch:
+        batch.record(sender, instance.pk)
+
+
+@receiver(post_save, sender=TaskDependency)
+def invalidate_dependency_caches(sender, instance, **kwargs):
+    """Edges live in the graph of the depending task's project"""
+    if TaskDependency.task.is_cached(instance):
+        project_id = instance.task.project_id
+    else:
+        project_id = Task.objects.filter(pk=instance.task_id).values_list(
+            'project_id', flat=True
+        ).first()
+    invalidate_project_graph(project_id)
+    invalidate_project_schedule(project_id)
+    bump_versions(task_version(instance.task_id), DEPENDENCIES_VERSION)
+    hub.publish([dependency_event(
+        instance.pk, instance.task_id, instance.dependent_on_task_id, project_id, 'created'
+    )])
+
+
+@receiver(post_delete, sender=TaskDependency)
+def invalidate_deleted_dependency(sender, instance, **kwargs):
+    with deletion_batch() as batch:
+        batch.delete_dependency(instance)
+
+
+@receiver(post_save, sender=Task)
+def invalidate_task_schedule(sender, instance, **kwargs):
+    # Runs before count_saved_task, so _counted_as still holds the loaded project
+    previous = getattr(instance, '_counted_as', None)
+    if previous is not None and previous[0] != instance.project_id:
+        # A moved task takes its edges out of the old project's graph
+        invalidate_project_caches(previous[0])
+        invalidate_project_caches(instance.project_id)
+    else:
+        invalidate_project_schedule(instance.project_id)
+        bump_versions(project_version(instance.project_id))
+    bump_versions(task_version(instance.pk))
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_task_caches(sender, instance, **kwargs):
+    # Also publishes the task's deleted event
+    with deletion_batch() as batch:
+        batch.delete_task(instance)
+
+
+@receiver(pre_save, sender=Task)
+def remember_counted_state(sender, instance, **kwargs):
+    """
+    Count from the row as it is now, not as it was when the instance was
+    loaded: a stale copy would apply its delta twice. Task.save() holds
+    the row lock until the counters are updated.
+    """
+    if instance._state.adding:
+        return
+    state = Task.objects.select_for_update().filter(pk=instance.pk).values_list(
+        'project_id', 'is_completed', 'priority'
+    ).first()
+    if state is not None:
+        instance._counted_as = state
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_task(sender, instance, created, **kwargs):
+    # Before count_saved_task, which records the task's new state
+    previous = getattr(instance, '_counted_as', None)
+    hub.publish([task_event(
+        instance.pk, instance.project_id, 'created' if created else 'updated',
+        previous[0] if previous else None,
+    )])
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, update_fields=None, **kwargs):
+    with project_counters() as counters:
+        counters.save(instance, update_fields)
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, origin=None, **kwargs):
+    # Tasks cascading from a deleted project have no counters left to update
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is Project:
+        return
+    with project_counters() as counters:
+        counters.delete(instance)
+
+
+@receiver(post_save, sender=Project)
+def invalidate_project_payloads(sender, instance, **kwargs):
+    invalidate_project_schedule(instance.pk)
+    bump_versions(project_version(instance.pk))
+
+
+@receiver(post_save, sender=Project)
+def publish_saved_project(sender, instance, created, **kwargs):
+    hub.publish([project_event(instance.pk, 'created' if created else 'updated')])
+
+
+@receiver(post_delete, sender=Project)
+def invalidate_deleted_project(sender, instance, **kwargs):
+    # Also publishes the project's deleted event
+    with deletion_batch() as batch:
+        batch.delete_project(instance)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Task)
+def index_saved_text(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'name', 'description'} & set(update_fields):
+        return
+    index_objects([instance])
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Task)
+def unindex_deleted_text(sender, instance, **kwargs):
+    with deletion_batch() as batch:
+        batch.unindex(sender, instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_payloads(sender, instance, update_fields=None, **kwargs):
+    """Task payloads embed their assigned user"""
+    # Logging in only touches last_login, which no payload includes
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    bump_versions(USERS_VERSION)
@@ -0,0 +1,105 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import DeletionLog, Project, Task, TaskDependency
+from .serializers import (
+    ProjectSummarySerializer,
+    TaskDependencyValuesSerializer,
+    TaskValuesSerializer,
+)
+
+# Sections paged through in order, each keyed on id
+PAGED_SECTIONS = ('tasks', 'dependencies')
+
+
+def encode_cursor(since, watermark, section, after):
+    state = [since.isoformat() if since else None, watermark.isoformat(), section, after]
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(since, watermark, section, after) from a `next` cursor; raises ValueError"""
+    try:
+        since, watermark, section, after = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        since = parse_datetime(since) if since is not None else None
+        watermark = parse_datetime(watermark)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if watermark is None or section not in PAGED_SECTIONS or not isinstance(after, int):
+        raise ValueError("Invalid cursor")
+    return since, watermark, section, after
+
+
+def get_changes(since=None, cursor=None):
+    """
+    Return the projects, tasks and dependencies created or updated after
+    `since`, tombstones for rows deleted after it, and the watermark the
+    client should send next time. Without `since` everything is returned.
+
+    Tasks, then dependencies, come SYNC_PAGE_SIZE rows at a time in id
+    order; while `next` is set, the client fetches it with ?cursor= and
+    gets the rest of the same sync. The watermark trails the clock by
+    SYNC_WATERMARK_LAG seconds, so rows committed by transactions still
+    open when the sync ran are sent next time; the price is that recent
+    rows and tombstones may be sent twice, which clients apply as upserts.
+    """
+    page_size = getattr(settings, 'SYNC_PAGE_SIZE', 1000)
+    if cursor is None:
+        lag = getattr(settings, 'SYNC_WATERMARK_LAG', 60)
+        watermark = timezone.now() - timedelta(seconds=lag)
+        section, after = PAGED_SECTIONS[0], 0
+    else:
+        since, watermark, section, after = decode_cursor(cursor)
+
+    projects = Project.objects.all()
+    tasks = Task.objects.all()
+    dependencies = TaskDependency.objects.all()
+    deletions = DeletionLog.objects.none()
+    if since is not None:
+        projects = projects.filter(updated_at__gt=since)
+        tasks = tasks.filter(updated_at__gt=since)
+        dependencies = dependencies.filter(created_at__gt=since)
+        deletions = DeletionLog.objects.filter(deleted_at__gt=since)
+    if cursor is not None:
+        # Sent with the first page
+        projects, deletions = projects.none(), deletions.none()
+
+    deleted = {model: [] for model, _ in DeletionLog.MODEL_CHOICES}
+    for model, object_id in deletions.values_list('model', 'object_id'):
+        deleted[model].append(object_id)
+
+    rows = {
+        'tasks': (TaskValuesSerializer.values(tasks), lambda row: row['id']),
+        'dependencies': (TaskDependencyValuesSerializer.values(dependencies), lambda row: row[0]),
+    }
+    pages = {name: [] for name in PAGED_SECTIONS}
+    next_cursor = None
+    room = page_size
+    for name in PAGED_SECTIONS[PAGED_SECTIONS.index(section):]:
+        queryset, row_id = rows[name]
+        page = list(queryset.filter(pk__gt=after).order_by('id')[:room + 1])
+        pages[name] = page[:room]
+        if len(page) > room:
+            last = row_id(pages[name][-1]) if pages[name] else after
+            next_cursor = encode_cursor(since, watermark, name, last)
+            break
+        room -= len(page)
+        after = 0
+
+    return {
+        'watermark': watermark,
+        'next': next_cursor,
+        'projects': ProjectSummarySerializer(projects, many=True).data,
+        'tasks': TaskValuesSerializer(pages['tasks']).data,
+        'dependencies': TaskDependencyValuesSerializer(pages['dependencies']).data,
+        'deleted': {
+            'projects': deleted['project'],
+            'tasks': deleted['task'],
+            'dependencies': deleted['taskdependency'],
+        },
+    }
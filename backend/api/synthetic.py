@@ -0,0 +1,137 @@
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .counters import project_counters
+from .models import Project, Task, TaskDependency
+from .payload_cache import DEPENDENCIES_VERSION, USERS_VERSION, bump_versions
+from .search import index_objects
+
+WORDS = [
+    'api', 'auth', 'backlog', 'billing', 'board', 'cache', 'client', 'deploy', 'design',
+    'docs', 'export', 'feature', 'fix', 'import', 'login', 'mobile', 'onboarding',
+    'payments', 'report', 'review', 'search', 'settings', 'sprint', 'sync', 'test', 'ui',
+]
+
+
+def zipf_weights(count, exponent):
+    """Weight of the user at each rank: a few users get most of the tasks"""
+    return [1 / rank ** exponent for rank in range(1, count + 1)]
+
+
+def random_name(rng, words=3):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+class DatasetGenerator:
+    """
+    Builds a reproducible synthetic board: `projects` projects of
+    `tasks_per_project` tasks, assigned to `users` users with a power-law
+    (Zipf) spread, and a random DAG of about `dependencies_per_task` edges
+    per task inside each project. Edges only point from a task to tasks
+    created before it, so the graph is acyclic by construction.
+    """
+
+    def __init__(self, projects=10, tasks_per_project=100, users=50, dependencies_per_task=1.5,
+                 unassigned=0.1, completed=0.3, zipf_exponent=1.2, seed=0, batch_size=1000):
+        self.projects = projects
+        self.tasks_per_project = tasks_per_project
+        self.users = users
+        self.dependencies_per_task = dependencies_per_task
+        self.unassigned = unassigned
+        self.completed = completed
+        self.zipf_exponent = zipf_exponent
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+
+    def run(self):
+        with transaction.atomic():
+            users = self.create_users()
+            projects = self.create_projects()
+            tasks = self.create_tasks(projects, users)
+            dependencies = self.create_dependencies(tasks)
+        # Bulk writes skip the signals; new rows only affect the shared payloads
+        bump_versions(DEPENDENCIES_VERSION, USERS_VERSION)
+        return {
+            'users': len(users),
+            'projects': len(projects),
+            'tasks': sum(len(project_tasks) for project_tasks in tasks),
+            'dependencies': dependencies,
+        }
+
+    def create_users(self):
+        offset = User.objects.count()
+        users = [
+            User(username=f'user{offset + i}', email=f'user{offset + i}@example.com',
+                 first_name=self.rng.choice(WORDS).capitalize(),
+                 last_name=self.rng.choice(WORDS).capitalize())
+            for i in range(self.users)
+        ]
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def create_projects(self):
+        projects = []
+        for _ in range(self.projects):
+            start = date(2025, 1, 1) + timedelta(days=self.rng.randrange(365))
+            projects.append(Project(
+                name=random_name(self.rng), description=random_name(self.rng, 12),
+                start_date=start, end_date=start + timedelta(days=self.rng.randrange(30, 365)),
+                is_completed=self.rng.random() < self.completed / 2,
+            ))
+        projects = Project.objects.bulk_create(projects, batch_size=self.batch_size)
+        index_objects(projects)
+        return projects
+
+    def create_tasks(self, projects, users):
+        """Per project, its tasks in creation order"""
+        cum_weights = list(accumulate(zipf_weights(len(users), self.zipf_exponent)))
+        tasks = []
+        for project in projects:
+            project_tasks = []
+            for _ in range(self.tasks_per_project):
+                start = project.start_date + timedelta(days=self.rng.randrange(60))
+                end = start + timedelta(days=self.rng.randrange(1, 21)) if self.rng.random() < 0.8 else None
+                assignee = None
+                if users and self.rng.random() >= self.unassigned:
+                    assignee = self.rng.choices(users, cum_weights=cum_weights)[0]
+                project_tasks.append(Task(
+                    project=project, name=random_name(self.rng),
+                    description=random_name(self.rng, 20), start_date=start, end_date=end,
+                    priority=self.rng.choices([1, 2, 3], [3, 5, 2])[0],
+                    assigned_user=assignee, is_completed=self.rng.random() < self.completed,
+                ))
+            project_tasks = Task.objects.bulk_create(project_tasks, batch_size=self.batch_size)
+            with project_counters() as counters:
+                for task in project_tasks:
+                    counters.save(task)
+            index_objects(project_tasks)
+            tasks.append(project_tasks)
+        return tasks
+
+    def create_dependencies(self, tasks):
+        created = 0
+        batch = []
+        for project_tasks in tasks:
+            for index, task in enumerate(project_tasks[1:], start=1):
+                count = min(index, self.edge_count())
+                # Mostly recent predecessors, as in a real sequence of work
+                window = project_tasks[max(0, index - 50):index]
+                for dependent_on in self.rng.sample(window, min(count, len(window))):
+                    batch.append(TaskDependency(task=task, dependent_on_task=dependent_on))
+                if len(batch) >= self.batch_size:
+                    created += len(TaskDependency.objects.bulk_create(batch))
+                    batch = []
+        created += len(TaskDependency.objects.bulk_create(batch))
+        return created
+
+    def edge_count(self):
+        """Poisson-distributed number of edges with mean dependencies_per_task"""
+        mean, count = self.dependencies_per_task, 0
+        total = self.rng.expovariate(1)
+        while total < mean:
+            count += 1
+            total += self.rng.expovariate(1)
+        return count
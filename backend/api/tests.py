@@ -1,3 +1,1514 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import warnings
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from agileflow_backend.instrumentation import QueryRecorder, stats as request_stats
+
+from .async_views import change_stream
+from .benchmark import BenchmarkRunner, asgi_get, compare
+from .counters import recount_projects
+from .events import RESYNC, hub
+from .filters import TaskFilter
+from .graph import get_project_graph
+from .models import DeletionLog, Project, SearchTerm, Task, TaskDependency
+from .payload_cache import bump_versions, cached_payload, task_version
+from .renderers import FastJSONParser, FastJSONRenderer
+from .search import index_objects, search
+from .serializers import (
+    TaskDependencySerializer,
+    TaskDependencyValuesSerializer,
+    TaskSerializer,
+    TaskValuesSerializer,
+)
+from .synthetic import DatasetGenerator
+from .workload import get_workload
+
+
+class ApiTestCase(TestCase):
+    """Shared fixtures for the API tests"""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def make_project(self, name='Project', **kwargs):
+        kwargs.setdefault('start_date', date(2025, 1, 1))
+        return Project.objects.create(name=name, **kwargs)
+
+    def make_task(self, project, name='Task', **kwargs):
+        kwargs.setdefault('start_date', date(2025, 1, 1))
+        return Task.objects.create(project=project, name=name, **kwargs)
+
+    def make_board(self, projects, tasks_per_project):
+        """Create projects with assigned tasks chained by dependencies"""
+        user = User.objects.create(username=f'user{User.objects.count()}')
+        for i in range(projects):
+            project = self.make_project(name=f'Project {i}')
+            previous = None
+            for j in range(tasks_per_project):
+                task = self.make_task(project, name=f'Task {i}.{j}', assigned_user=user)
+                if previous is not None:
+                    TaskDependency.objects.create(task=task, dependent_on_task=previous)
+                previous = task
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+
+class QueryCountTests(ApiTestCase):
+    """List and detail endpoints run a fixed number of queries"""
+
+    def assertConstantQueries(self, url_for):
+        self.make_board(projects=1, tasks_per_project=1)
+        small = self.count_queries(url_for(Project.objects.first()))
+        self.make_board(projects=10, tasks_per_project=10)
+        large = self.count_queries(url_for(Project.objects.last()))
+        self.assertEqual(small, large)
+
+    def test_project_list(self):
+        self.assertConstantQueries(lambda project: '/api/project/')
+
+    def test_project_detail(self):
+        self.assertConstantQueries(lambda project: f'/api/project/{project.pk}/')
+
+    def test_project_tasks(self):
+        self.assertConstantQueries(lambda project: f'/api/project/{project.pk}/tasks/')
+
+    def test_task_list(self):
+        self.assertConstantQueries(lambda project: '/api/task/')
+
+    def test_task_detail(self):
+        self.assertConstantQueries(lambda project: f'/api/task/{project.tasks.last().pk}/')
+
+    def test_task_count_matches_tasks(self):
+        self.make_board(projects=2, tasks_per_project=3)
+        response = self.client.get('/api/project/')
+        self.assertEqual([p['task_count'] for p in response.data['results']], [3, 3])
+
+
+class AnalyticsTests(ApiTestCase):
+    """Dashboard aggregates are computed in the database"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username='alice')
+        self.alpha = self.make_project(name='Alpha', is_completed=True)
+        self.beta = self.make_project(name='Beta')
+        self.make_task(self.alpha, priority=1, is_completed=True, assigned_user=self.user)
+        self.make_task(self.alpha, priority=3)
+        self.make_task(self.beta, priority=3, end_date=date(2025, 2, 1))
+        self.make_task(self.beta, priority=2, is_completed=True, assigned_user=self.user)
+
+    def test_totals_and_buckets(self):
+        with self.assertNumQueries(3):
+            data = self.client.get('/api/analytics/').data
+        self.assertEqual(data['total_projects'], 2)
+        self.assertEqual(data['project_completion_rate'], 50)
+        self.assertEqual(data['total_tasks'], 4)
+        self.assertEqual(data['task_completion_rate'], 50)
+        self.assertEqual(data['status_distribution'], {'todo': 0, 'in_progress': 1, 'completed': 2})
+        self.assertEqual(data['priority_distribution'], {'low': 1, 'medium': 1, 'high': 2})
+        self.assertEqual(
+            [(p['name'], p['completed_tasks'], p['task_count']) for p in data['projects']],
+            [('Alpha', 1, 2), ('Beta', 1, 2)],
+        )
+
+    def test_scoped_to_project_and_user(self):
+        data = self.client.get('/api/analytics/', {'project': self.beta.pk}).data
+        self.assertEqual(data['total_tasks'], 2)
+        self.assertEqual([p['name'] for p in data['projects']], ['Beta'])
+
+        data = self.client.get('/api/analytics/', {'user': self.user.pk}).data
+        self.assertEqual(data['total_tasks'], 2)
+        self.assertEqual(data['task_completion_rate'], 100)
+        self.assertEqual([p['task_count'] for p in data['projects']], [1, 1])
+
+    def test_invalid_scope(self):
+        response = self.client.get('/api/analytics/', {'project': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CursorPaginationTests(ApiTestCase):
+    """`?pagination=cursor` switches to keyset pagination"""
+
+    def walk(self, url, params):
+        seen, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            pages += 1
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                return seen, pages
+            response = self.client.get(response.data['next'])
+
+    def test_task_list_walks_every_row_once(self):
+        self.make_board(projects=3, tasks_per_project=5)
+        seen, pages = self.walk('/api/task/', {'pagination': 'cursor', 'page_size': 4})
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list('id', flat=True)))
+        self.assertEqual(pages, 4)
+
+    def test_no_count_query_and_large_pages(self):
+        self.make_board(projects=1, tasks_per_project=30)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/task/', {'pagination': 'cursor', 'page_size': 3000})
+        self.assertEqual(len(response.data['results']), 30)
+        self.assertNotIn('count', response.data)
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+
+    def test_project_tasks(self):
+        self.make_board(projects=2, tasks_per_project=5)
+        project = Project.objects.last()
+        seen, _ = self.walk(f'/api/project/{project.pk}/tasks/', {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(seen, list(project.tasks.order_by('id').values_list('id', flat=True)))
+
+    def test_project_tasks_unpaginated_by_default(self):
+        self.make_board(projects=1, tasks_per_project=12)
+        response = self.client.get(f'/api/project/{Project.objects.get().pk}/tasks/')
+        self.assertEqual(len(response.data), 12)
+
+    def test_project_list(self):
+        self.make_board(projects=5, tasks_per_project=1)
+        seen, _ = self.walk('/api/project/', {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(len(seen), 5)
+
+
+class SyncTests(ApiTestCase):
+    """The sync endpoint returns only what changed after the watermark"""
+
+    def test_initial_sync_returns_everything(self):
+        self.make_board(projects=2, tasks_per_project=2)
+        data = self.client.get('/api/sync/').data
+        self.assertEqual(len(data['projects']), 2)
+        self.assertEqual(len(data['tasks']), 4)
+        self.assertEqual(len(data['dependencies']), 2)
+        self.assertEqual(data['deleted'], {'projects': [], 'tasks': [], 'dependencies': []})
+        self.assertIsNone(data['next'])
+
+    @override_settings(SYNC_PAGE_SIZE=3)
+    def test_pages_through_tasks_then_dependencies(self):
+        self.make_board(projects=2, tasks_per_project=3)
+        data = self.client.get('/api/sync/').data
+        self.assertEqual(len(data['projects']), 2)
+        pages = [data]
+        while pages[-1]['next']:
+            pages.append(self.client.get('/api/sync/', {'cursor': pages[-1]['next']}).data)
+        self.assertEqual([len(page['tasks']) + len(page['dependencies']) for page in pages],
+                         [3, 3, 3, 1])
+        self.assertEqual([page['watermark'] for page in pages], [data['watermark']] * 4)
+        self.assertEqual([page['projects'] for page in pages[1:]], [[], [], []])
+        tasks = [task['id'] for page in pages for task in page['tasks']]
+        self.assertEqual(tasks, sorted(Task.objects.values_list('id', flat=True)))
+        self.assertEqual(sum(len(page['dependencies']) for page in pages), 4)
+        self.assertEqual(pages[0]['tasks'][0]['assigned_user']['username'], 'user0')
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/sync/', {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_watermark_trails_late_commits(self):
+        task = self.make_task(self.make_project())
+        watermark = self.client.get('/api/sync/').json()['watermark']
+        # Saved by a transaction that was still open during the sync
+        Task.objects.filter(pk=task.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=30)
+        )
+        data = self.client.get('/api/sync/', {'since': watermark}).data
+        self.assertEqual([t['id'] for t in data['tasks']], [task.pk])
+
+    @override_settings(SYNC_WATERMARK_LAG=0)
+    def test_delta_since_watermark(self):
+        self.make_board(projects=2, tasks_per_project=2)
+        watermark = self.client.get('/api/sync/').json()['watermark']
+
+        changed = Task.objects.first()
+        changed.is_completed = True
+        changed.save()
+        doomed = Task.objects.last()
+        doomed_id = doomed.pk
+        doomed_dependencies = list(doomed.dependencies.values_list('id', flat=True))
+        doomed.delete()
+        added = self.make_task(Project.objects.first(), name='New')
+
+        data = self.client.get('/api/sync/', {'since': watermark}).data
+        self.assertEqual(data['projects'], [])
+        self.assertEqual(sorted(t['id'] for t in data['tasks']), [changed.pk, added.pk])
+        self.assertEqual(data['deleted']['tasks'], [doomed_id])
+        self.assertEqual(data['deleted']['dependencies'], doomed_dependencies)
+
+        data = self.client.get('/api/sync/', {'since': data['watermark']}).data
+        self.assertEqual(data['tasks'], [])
+        self.assertEqual(data['deleted']['tasks'], [])
+
+    def test_invalid_watermark(self):
+        response = self.client.get('/api/sync/', {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DependencyGraphTests(ApiTestCase):
+    """add_dependency rejects edges that would close a cycle"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = self.make_project()
+        self.a, self.b, self.c = (self.make_task(self.project, name=n) for n in 'abc')
+
+    def add(self, task, dependent_on):
+        return self.client.post(
+            f'/api/task/{task.pk}/add_dependency/?dependentOnTaskId={dependent_on.pk}'
+        )
+
+    def test_rejects_cycle_with_path(self):
+        self.assertEqual(self.add(self.a, self.b).status_code, 201)
+        self.assertEqual(self.add(self.b, self.c).status_code, 201)
+        response = self.add(self.c, self.a)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['cycle'], [self.c.pk, self.a.pk, self.b.pk, self.c.pk])
+        self.assertFalse(TaskDependency.objects.filter(task=self.c).exists())
+
+    def test_removal_invalidates_cached_graph(self):
+        self.add(self.a, self.b)
+        self.assertEqual(self.add(self.b, self.a).status_code, 400)
+        self.client.delete(f'/api/task/{self.a.pk}/remove_dependency/?dependentOnTaskId={self.b.pk}')
+        self.assertEqual(self.add(self.b, self.a).status_code, 201)
+
+    def test_cycle_across_projects(self):
+        other = self.make_task(self.make_project(name='Other'), name='x')
+        self.add(self.a, other)
+        self.add(other, self.b)
+        response = self.add(self.b, self.a)
+        self.assertEqual(response.data['cycle'], [self.b.pk, self.a.pk, other.pk, self.b.pk])
+
+    def test_check_reads_the_locked_projects_from_the_database(self):
+        get_project_graph(self.project.pk)
+        # An edge committed after this process memoized the graph
+        TaskDependency.objects.bulk_create([TaskDependency(task=self.a, dependent_on_task=self.b)])
+        response = self.add(self.b, self.a)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['cycle'], [self.b.pk, self.a.pk, self.b.pk])
+
+    def test_graph_is_loaded_once(self):
+        self.add(self.a, self.b)
+        with self.assertNumQueries(1):
+            get_project_graph(self.project.pk)
+        with self.assertNumQueries(0):
+            graph = get_project_graph(self.project.pk)
+        self.assertEqual(graph.depends_on, {self.a.pk: [self.b.pk]})
+
+
+class ScheduleTests(ApiTestCase):
+    """The schedule action runs the critical path method over dependencies"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = self.make_project()
+        day = lambda n: date(2025, 1, n)
+        # design (3 days) -> build (5 days) -> ship (1 day); docs (2 days) -> ship
+        self.design = self.make_task(self.project, start_date=day(1), end_date=day(3))
+        self.build = self.make_task(self.project, start_date=day(1), end_date=day(5))
+        self.docs = self.make_task(self.project, start_date=day(1), end_date=day(2))
+        self.ship = self.make_task(self.project, start_date=day(1))
+        for task, dependent_on in [(self.build, self.design), (self.ship, self.build),
+                                   (self.ship, self.docs)]:
+            TaskDependency.objects.create(task=task, dependent_on_task=dependent_on)
+
+    def get_schedule(self):
+        response = self.client.get(f'/api/project/{self.project.pk}/schedule/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_critical_path_and_slack(self):
+        data = self.get_schedule()
+        tasks = {t['id']: t for t in data['tasks']}
+        self.assertEqual(data['duration'], 9)
+        self.assertEqual(data['end_date'], date(2025, 1, 9))
+        self.assertEqual(data['critical_path'], [self.design.pk, self.build.pk, self.ship.pk])
+        self.assertEqual(tasks[self.docs.pk]['slack'], 6)
+        self.assertEqual(tasks[self.docs.pk]['latest_start'], date(2025, 1, 7))
+        self.assertEqual(tasks[self.ship.pk]['earliest_start'], date(2025, 1, 9))
+        # Finish dates are inclusive, like Task.end_date
+        self.assertEqual(tasks[self.design.pk]['earliest_finish'], date(2025, 1, 3))
+        self.assertEqual(tasks[self.docs.pk]['latest_finish'], date(2025, 1, 8))
+        self.assertEqual(tasks[self.ship.pk]['earliest_finish'], date(2025, 1, 9))
+
+    def test_memoized_until_a_task_changes(self):
+        self.get_schedule()
+        with self.assertNumQueries(1):
+            self.get_schedule()
+        self.docs.end_date = date(2025, 1, 20)
+        self.docs.save()
+        data = self.get_schedule()
+        self.assertEqual(data['critical_path'], [self.docs.pk, self.ship.pk])
+
+    def test_cycle_is_reported(self):
+        TaskDependency.objects.create(task=self.design, dependent_on_task=self.ship)
+        response = self.client.get(f'/api/project/{self.project.pk}/schedule/')
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkTaskTests(ApiTestCase):
+    """Bulk actions validate everything up front and write in one transaction"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = self.make_project()
+        self.user = User.objects.create(username='bob')
+
+    def payload(self, count, **overrides):
+        return [dict({'name': f'Task {i}', 'start_date': '2025-01-01', 'project': self.project.pk,
+                      'assigned_user': self.user.pk}, **overrides) for i in range(count)]
+
+    def test_bulk_create_runs_constant_queries(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.post('/api/task/bulk_create/', self.payload(2), format='json')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post('/api/task/bulk_create/', self.payload(50), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 50)
+        self.assertEqual(response.data[0]['assigned_user']['username'], 'bob')
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+        self.assertEqual(Task.objects.count(), 52)
+
+    def test_bulk_create_is_all_or_nothing(self):
+        payload = self.payload(3)
+        payload[1]['project'] = 999
+        response = self.client.post('/api/task/bulk_create/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        # Errors are keyed by the index of each invalid item
+        self.assertEqual(list(response.data), [1])
+        self.assertIn('project', response.data[1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_patch(self):
+        tasks = [self.make_task(self.project) for _ in range(3)]
+        before = tasks[0].updated_at
+        response = self.client.patch('/api/task/bulk_update/', {
+            'ids': [tasks[0].pk, tasks[1].pk, 999], 'patch': {'is_completed': True},
+        }, format='json')
+        self.assertEqual(response.data, {'updated': [tasks[0].pk, tasks[1].pk], 'not_found': [999]})
+        self.assertEqual(Task.objects.filter(is_completed=True).count(), 2)
+        tasks[0].refresh_from_db()
+        self.assertGreater(tasks[0].updated_at, before)
+
+    def test_bulk_update_payloads(self):
+        tasks = [self.make_task(self.project) for _ in range(2)]
+        response = self.client.patch('/api/task/bulk_update/', [
+            {'id': tasks[0].pk, 'name': 'Renamed'},
+            {'id': tasks[1].pk, 'priority': 3, 'assigned_user': self.user.pk},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Task.objects.get(pk=tasks[0].pk).name, 'Renamed')
+        self.assertEqual(Task.objects.get(pk=tasks[1].pk).assigned_user, self.user)
+
+        response = self.client.patch('/api/task/bulk_update/', [{'id': 999, 'name': 'x'}], format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.patch('/api/task/bulk_update/', [
+            {'id': tasks[0].pk}, {'id': tasks[0].pk, 'name': 'dup'},
+        ], format='json')
+        self.assertEqual((response.status_code, response.json()),
+                         (400, {'1': {'id': ['Task listed more than once']}}))
+        self.assertEqual(Task.objects.get(pk=tasks[0].pk).name, 'Renamed')
+
+    def test_bulk_delete(self):
+        tasks = [self.make_task(self.project) for _ in range(3)]
+        response = self.client.post('/api/task/bulk_delete/', {'ids': [tasks[0].pk, tasks[2].pk]},
+                                    format='json')
+        self.assertEqual(response.data['deleted'], [tasks[0].pk, tasks[2].pk])
+        self.assertEqual(list(Task.objects.values_list('id', flat=True)), [tasks[1].pk])
+
+    def test_bulk_delete_runs_constant_queries(self):
+        def delete(count):
+            tasks = [self.make_task(self.project, name=f'Doomed {i}') for i in range(count)]
+            for before, after in zip(tasks, tasks[1:]):
+                TaskDependency.objects.create(task=after, dependent_on_task=before)
+            ids = [task.pk for task in tasks]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/api/task/bulk_delete/', {'ids': ids}, format='json')
+            self.assertEqual(response.data['deleted'], ids)
+            self.assertEqual(
+                DeletionLog.objects.filter(model='task', object_id__in=ids).count(), count
+            )
+            self.assertEqual(DeletionLog.objects.filter(model='taskdependency').count(), count - 1)
+            DeletionLog.objects.all().delete()
+            return len(queries.captured_queries)
+
+        self.assertEqual(delete(2), delete(20))
+        self.assertFalse(SearchTerm.objects.filter(model='task').exists())
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.task_count, 0)
+
+
+class BulkDependencyTests(ApiTestCase):
+    """bulk_dependencies applies a whole batch of edge changes at once"""
+
+    def setUp(self):
+        super().setUp()
+        project = self.make_project()
+        self.tasks = [self.make_task(project, name=f'T{i}') for i in range(6)]
+        self.ids = [task.pk for task in self.tasks]
+
+    def edges(self, *pairs):
+        return [{'task': self.ids[a], 'dependent_on_task': self.ids[b]} for a, b in pairs]
+
+    def post(self, **body):
+        return self.client.post('/api/task/bulk_dependencies/', body, format='json')
+
+    def stored(self):
+        index = {task_id: i for i, task_id in enumerate(self.ids)}
+        return sorted((index[t], index[d]) for t, d in
+                      TaskDependency.objects.values_list('task_id', 'dependent_on_task_id'))
+
+    def test_add_and_remove(self):
+        self.post(add=self.edges((0, 1), (1, 2)))
+        response = self.post(add=self.edges((0, 1), (2, 3)), remove=self.edges((1, 2), (4, 5)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['added'], self.edges((2, 3)))
+        self.assertEqual(response.data['existing'], self.edges((0, 1)))
+        self.assertEqual(response.data['removed'], self.edges((1, 2)))
+        self.assertEqual(response.data['not_found'], self.edges((4, 5)))
+        self.assertEqual(self.stored(), [(0, 1), (2, 3)])
+
+    def test_remove_runs_constant_queries(self):
+        self.post(add=self.edges((0, 1), (1, 2), (2, 3), (3, 4), (4, 5)))
+        graph = get_project_graph(self.tasks[0].project_id)
+        self.assertEqual(sum(map(len, graph.depends_on.values())), 5)
+        with CaptureQueriesContext(connection) as one:
+            self.post(remove=self.edges((0, 1)))
+        with CaptureQueriesContext(connection) as many:
+            response = self.post(remove=self.edges((1, 2), (2, 3), (3, 4), (5, 0)))
+        self.assertEqual(len(one.captured_queries), len(many.captured_queries))
+        self.assertEqual(response.data['not_found'], self.edges((5, 0)))
+        self.assertEqual(self.stored(), [(4, 5)])
+        self.assertEqual(DeletionLog.objects.filter(model='taskdependency').count(), 4)
+        self.assertEqual(get_project_graph(self.tasks[0].project_id).depends_on, {self.ids[4]: [self.ids[5]]})
+
+    def test_check_reads_the_locked_projects_from_the_database(self):
+        get_project_graph(self.tasks[0].project_id)
+        # An edge committed after this process memoized the graph
+        TaskDependency.objects.bulk_create([
+            TaskDependency(task=self.tasks[0], dependent_on_task=self.tasks[1])
+        ])
+        response = self.post(add=self.edges((1, 0)))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stored(), [(0, 1)])
+
+    def test_cycle_within_batch_is_rejected(self):
+        self.post(add=self.edges((0, 1)))
+        response = self.post(add=self.edges((1, 2), (2, 0)))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['cycle'], [self.ids[1], self.ids[2], self.ids[0], self.ids[1]])
+        self.assertEqual(self.stored(), [(0, 1)])
+
+    def test_removal_in_same_batch_breaks_cycle(self):
+        self.post(add=self.edges((0, 1), (1, 2)))
+        response = self.post(add=self.edges((2, 0)), remove=self.edges((1, 2)))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stored(), [(0, 1), (2, 0)])
+
+    def test_unknown_tasks_are_validated_in_one_query(self):
+        response = self.post(add=self.edges((0, 1)) + [{'task': self.ids[0], 'dependent_on_task': 999}])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['tasks'], [999])
+        self.assertEqual(self.stored(), [])
+
+
+class ExportTests(ApiTestCase):
+    """Exports stream rows straight from values_list() iterators"""
+
+    def setUp(self):
+        super().setUp()
+        self.make_board(projects=2, tasks_per_project=3)
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export(self):
+        lines = self.read(self.client.get('/api/project/export/')).splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([r['type'] for r in records].count('project'), 2)
+        self.assertEqual([r['type'] for r in records].count('task'), 6)
+        self.assertEqual([r['type'] for r in records].count('dependency'), 4)
+        task = Task.objects.order_by('id').first()
+        self.assertEqual(records[2]['id'], task.pk)
+        self.assertEqual(records[2]['start_date'], '2025-01-01')
+        self.assertEqual(records[2]['assigned_user'], task.assigned_user_id)
+
+    def test_csv_export_for_one_project(self):
+        project = Project.objects.last()
+        content = self.read(self.client.get('/api/task/export/', {
+            'file_format': 'csv', 'resource': 'dependencies', 'project': project.pk,
+        }))
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(set(rows[0]), {'id', 'task', 'dependent_on_task', 'created_at'})
+
+    def test_invalid_format(self):
+        response = self.client.get('/api/task/export/', {'file_format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/task/export/', {'project': '\u00b2'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ImportTests(ApiTestCase):
+    """The importer maps source ids and reports per-row errors"""
+
+    def upload(self, content, name='tasks.ndjson', **data):
+        data['file'] = SimpleUploadedFile(name, content.encode())
+        return self.client.post('/api/task/import/', data, format='multipart')
+
+    def test_ndjson_round_trip_with_source_ids(self):
+        User.objects.create(username='carol')
+        lines = [
+            {'type': 'project', 'id': 70, 'name': 'Imported', 'start_date': '2025-03-01'},
+            {'type': 'task', 'id': 1, 'name': 'First', 'start_date': '2025-03-01',
+             'project': 70, 'assigned_user': 'carol'},
+            {'type': 'task', 'id': 2, 'name': 'Second', 'start_date': '2025-03-02', 'project': 70},
+            {'type': 'task', 'id': 3, 'name': '', 'start_date': '2025-03-02', 'project': 70},
+            {'type': 'dependency', 'task': 2, 'dependent_on_task': 1},
+            {'type': 'dependency', 'task': 1, 'dependent_on_task': 2},
+        ]
+        response = self.upload('\n'.join(json.dumps(line) for line in lines))
+        report = response.data
+        self.assertEqual((report['projects'], report['tasks'], report['dependencies']), (1, 2, 1))
+        self.assertEqual([e['line'] for e in report['errors']], [4, 6])
+
+        project = Project.objects.get(name='Imported')
+        first, second = project.tasks.order_by('id')
+        self.assertEqual(first.assigned_user.username, 'carol')
+        self.assertEqual(list(second.dependencies.values_list('dependent_on_task_id', flat=True)),
+                         [first.pk])
+
+    def test_csv_upload_into_existing_project(self):
+        project = self.make_project()
+        content = f'name,start_date,project,priority\nA,2025-01-01,{project.pk},3\nB,bad,{project.pk},1\n'
+        report = self.upload(content, name='tasks.csv').data
+        self.assertEqual(report['tasks'], 1)
+        self.assertEqual(report['errors'], [{'line': 3, 'error': 'start_date must be an ISO 8601 date'}])
+        self.assertEqual(project.tasks.get().priority, 3)
+
+    def test_management_command_chunks(self):
+        project = self.make_project()
+        path = self.tmp_file(''.join(
+            json.dumps({'type': 'task', 'name': f'T{i}', 'start_date': '2025-01-01', 'project': project.pk}) + '\n'
+            for i in range(25)
+        ))
+        out = io.StringIO()
+        call_command('import_tasks', path, '--chunk-size', '10', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['tasks'], 25)
+        self.assertEqual(project.tasks.count(), 25)
+
+    def test_every_cycle_closing_dependency_is_dropped(self):
+        project = self.make_project()
+        a, b, c = (self.make_task(project, name=n) for n in 'abc')
+        TaskDependency.objects.bulk_create([TaskDependency(task=b, dependent_on_task=c),
+                                            TaskDependency(task=c, dependent_on_task=a)])
+        task = {'type': 'task', 'start_date': '2025-01-01', 'project': project.pk}
+        lines = [
+            {**task, 'id': 'x1', 'name': 'X1'},
+            {**task, 'id': 'x2', 'name': 'X2'},
+            {'type': 'dependency', 'task': a.pk, 'dependent_on_task': b.pk},
+            {'type': 'dependency', 'task': 'x1', 'dependent_on_task': 'x2'},
+            {'type': 'dependency', 'task': 'x2', 'dependent_on_task': 'x1'},
+            {'type': 'dependency', 'task': 'x1', 'dependent_on_task': 'x3'},
+            {**task, 'id': 'x3', 'name': 'X3'},
+            {'type': 'dependency', 'task': 'x3', 'dependent_on_task': 'x1'},
+        ]
+        path = self.tmp_file(''.join(json.dumps(line) + '\n' for line in lines))
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_tasks', path, '--chunk-size', '2', stdout=out, stderr=err)
+        self.assertEqual(json.loads(out.getvalue())['dependencies'], 2)
+        self.assertEqual(err.getvalue().splitlines(), [
+            f"line {line}: Dependency would create a circular dependency" for line in (3, 5, 8)
+        ])
+        self.assertEqual(set(Task.objects.get(name='X1').dependencies.values_list(
+            'dependent_on_task__name', flat=True)), {'X2', 'X3'})
+
+    def tmp_file(self, content):
+        handle = tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False)
+        self.addCleanup(os.unlink, handle.name)
+        with handle:
+            handle.write(content)
+        return handle.name
+
+
+class PayloadCacheTests(ApiTestCase):
+    """Detail payloads are cached until a signal or bulk write bumps their version"""
+
+    def setUp(self):
+        super().setUp()
+        self.make_board(projects=1, tasks_per_project=3)
+        self.project = Project.objects.get()
+        self.task = self.project.tasks.last()
+
+    def test_versions_are_bumped_again_on_commit(self):
+        versions = [task_version(self.task.pk)]
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(*versions)
+            # A concurrent reader still sees the pre-commit row and caches it
+            cached_payload('task', self.task.pk, versions, lambda: 'stale')
+        self.assertEqual(cached_payload('task', self.task.pk, versions, lambda: 'fresh'), 'fresh')
+
+    def test_project_detail_hit_runs_no_serializer_queries(self):
+        first = self.client.get(f'/api/project/{self.project.pk}/').data
+        # Only the two ETag validator aggregates run
+        with self.assertNumQueries(2):
+            second = self.client.get(f'/api/project/{self.project.pk}/').data
+        self.assertEqual(first, second)
+
+    def test_task_save_invalidates_project_and_task(self):
+        self.client.get(f'/api/project/{self.project.pk}/tasks/')
+        self.client.get(f'/api/task/{self.task.pk}/')
+        self.task.name = 'Renamed'
+        self.task.save()
+        tasks = self.client.get(f'/api/project/{self.project.pk}/tasks/').data
+        self.assertIn('Renamed', [t['name'] for t in tasks])
+        self.assertEqual(self.client.get(f'/api/task/{self.task.pk}/').data['name'], 'Renamed')
+
+    def test_task_move_invalidates_both_projects(self):
+        other = self.make_project('Other')
+        self.client.get(f'/api/project/{self.project.pk}/')
+        self.client.get(f'/api/project/{self.project.pk}/tasks/')
+        self.client.get(f'/api/project/{self.project.pk}/schedule/')
+        task = Task.objects.get(pk=self.task.pk)
+        task.project = other
+        task.save()
+        self.assertEqual(len(self.client.get(f'/api/project/{self.project.pk}/').data['tasks']), 2)
+        self.assertEqual(len(self.client.get(f'/api/project/{self.project.pk}/tasks/').data), 2)
+        schedule = self.client.get(f'/api/project/{self.project.pk}/schedule/').data
+        self.assertNotIn(self.task.pk, [row['id'] for row in schedule['tasks']])
+        self.assertEqual(len(self.client.get(f'/api/project/{other.pk}/tasks/').data), 1)
+
+    def test_bulk_patch_invalidates(self):
+        self.client.get(f'/api/task/{self.task.pk}/')
+        self.client.patch('/api/task/bulk_update/', {'ids': [self.task.pk], 'patch': {'priority': 3}},
+                          format='json')
+        self.assertEqual(self.client.get(f'/api/task/{self.task.pk}/').data['priority'], 3)
+
+    def test_dependency_changes_invalidate(self):
+        first = self.project.tasks.first()
+        self.assertEqual(len(self.client.get('/api/task/dependencies/').data), 2)
+        self.client.delete(f'/api/task/{self.task.pk}/remove_dependency/',
+                           QUERY_STRING=f'dependentOnTaskId={self.task.dependencies.get().dependent_on_task_id}')
+        self.assertEqual(len(self.client.get('/api/task/dependencies/').data), 1)
+        self.client.post('/api/task/bulk_dependencies/',
+                         {'add': [{'task': self.task.pk, 'dependent_on_task': first.pk}]}, format='json')
+        self.assertEqual(self.client.get(f'/api/task/{self.task.pk}/').data['dependencies'], [first.pk])
+        self.assertEqual(len(self.client.get('/api/task/dependencies/').data), 2)
+
+    def test_user_change_invalidates_embedded_user(self):
+        self.client.get(f'/api/task/{self.task.pk}/')
+        user = self.task.assigned_user
+        user.username = 'renamed'
+        user.save()
+        data = self.client.get(f'/api/task/{self.task.pk}/').data
+        self.assertEqual(data['assigned_user']['username'], 'renamed')
+
+    def test_stats(self):
+        self.client.get(f'/api/task/{self.task.pk}/')
+        self.client.get(f'/api/task/{self.task.pk}/')
+        data = self.client.get('/api/cache-stats/').data
+        self.assertGreaterEqual(data['hits'], 1)
+        self.assertGreaterEqual(data['misses'], 1)
+
+
+class ConditionalGetTests(ApiTestCase):
+    """Unchanged resources answer 304 Not Modified"""
+
+    def setUp(self):
+        super().setUp()
+        self.make_board(projects=1, tasks_per_project=2)
+        self.project = Project.objects.get()
+        self.task = self.project.tasks.last()
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_non_ascii_digit_ids_are_not_found(self):
+        for url in ['/api/project/%C2%B2/', '/api/task/%C2%B2/', '/api/project/%C2%B2/tasks/']:
+            self.assertEqual(self.client.get(url).status_code, 404, url)
+
+    def test_unchanged_resources_are_not_modified(self):
+        for url in ['/api/project/', f'/api/project/{self.project.pk}/',
+                    f'/api/project/{self.project.pk}/tasks/', '/api/task/',
+                    f'/api/task/{self.task.pk}/']:
+            response = self.client.get(url)
+            self.assertIn('Last-Modified', response)
+            self.assertEqual(self.revalidate(url, response).status_code, 304, url)
+
+    def test_task_update_changes_etag(self):
+        url = f'/api/project/{self.project.pk}/tasks/'
+        response = self.client.get(url)
+        self.task.is_completed = True
+        self.task.save()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_assignee_change_changes_etag(self):
+        urls = [f'/api/project/{self.project.pk}/', f'/api/project/{self.project.pk}/tasks/',
+                '/api/task/', '/api/project/?expand=tasks']
+        responses = [self.client.get(url) for url in urls]
+        user = self.task.assigned_user
+        user.email = 'new@example.com'
+        user.save()
+        for url, response in zip(urls, responses):
+            response = self.revalidate(url, response)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertIn('new@example.com', response.content.decode(), url)
+
+    def test_deletion_changes_etag(self):
+        url = '/api/task/'
+        response = self.client.get(url)
+        self.project.tasks.first().delete()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_new_dependency_changes_task_etag(self):
+        url = f'/api/task/{self.task.pk}/'
+        response = self.client.get(url)
+        TaskDependency.objects.filter(task=self.task).delete()
+        self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_page_is_part_of_etag(self):
+        response = self.client.get('/api/task/')
+        response = self.client.get('/api/task/?page=1&page_size=1', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_modified_since(self):
+        url = f'/api/project/{self.project.pk}/'
+        response = self.client.get(url)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+
+class RendererTests(ApiTestCase):
+    def test_fast_renderer_matches_stock_renderer(self):
+        data = {
+            'date': date(2024, 1, 2),
+            'datetime': datetime(2024, 1, 2, 3, 4, 5, 600, tzinfo=dt_timezone.utc),
+            'decimal': Decimal('1.50'),
+            'unicode': 'caf\u00e9 \u2028 \u2029',
+            'nested': [{1: None, 'flag': True}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_indent_falls_back_to_stock_renderer(self):
+        data = {'a': [1, 2]}
+        context = {'indent': 2}
+        self.assertEqual(FastJSONRenderer().render(data, renderer_context=context),
+                         JSONRenderer().render(data, renderer_context=context))
+
+    def test_parser(self):
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"a": [1, 2]}')), {'a': [1, 2]})
+
+    def test_api_uses_fast_renderer(self):
+        project = self.make_project()
+        self.make_task(project)
+        response = self.client.get('/api/task/')
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.json()['count'], 1)
+        response = self.client.post('/api/project/', {'name': 'Posted', 'start_date': '2024-01-01'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+
+class ValuesSerializerTests(ApiTestCase):
+    """values()-based list serializers render the same bytes as the model serializers"""
+
+    def setUp(self):
+        super().setUp()
+        user = User.objects.create(username='alice', email='alice@example.com', first_name='Alice')
+        self.project = self.make_project()
+        first = self.make_task(self.project, description='Säen', assigned_user=user, end_date=date(2025, 2, 1))
+        second = self.make_task(self.project, name='Second', priority=3, is_completed=True)
+        TaskDependency.objects.create(task=second, dependent_on_task=first)
+
+    def render(self, data):
+        return FastJSONRenderer().render(data)
+
+    def test_task_parity(self):
+        tasks = Task.objects.select_related('assigned_user').order_by('id')
+        expected = self.render(TaskSerializer(tasks, many=True).data)
+        rows = TaskValuesSerializer.values(Task.objects.order_by('id'))
+        self.assertEqual(self.render(TaskValuesSerializer(rows).data), expected)
+
+    def test_dependency_parity(self):
+        expected = self.render(TaskDependencySerializer(TaskDependency.objects.all(), many=True).data)
+        rows = TaskDependencyValuesSerializer.values(TaskDependency.objects.all())
+        self.assertEqual(self.render(TaskDependencyValuesSerializer(rows).data), expected)
+
+    def test_endpoints(self):
+        tasks = TaskSerializer(Task.objects.order_by('id'), many=True).data
+        self.assertEqual(self.client.get('/api/task/').json()['results'], tasks)
+        self.assertEqual(self.client.get(f'/api/project/{self.project.pk}/tasks/').json(), tasks)
+        cursor = self.client.get(f'/api/project/{self.project.pk}/tasks/?pagination=cursor&page_size=1').json()
+        self.assertEqual(self.client.get(cursor['next']).json()['results'], tasks[1:])
+        dependencies = TaskDependencySerializer(TaskDependency.objects.all(), many=True).data
+        self.assertEqual(self.client.get('/api/task/dependencies/').json(), dependencies)
+
+
+class FieldsetTests(ApiTestCase):
+    """?fields= and ?expand= narrow payloads and the queries behind them"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username='alice')
+        self.project = self.make_project()
+        self.task = self.make_task(self.project, description='Long text', assigned_user=self.user)
+
+    def test_task_list_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/task/', {'fields': 'id,name,is_completed'})
+        self.assertEqual(response.json()['results'], [{'id': self.task.pk, 'name': 'Task', 'is_completed': False}])
+        select = queries.captured_queries[-1]['sql']
+        self.assertNotIn('description', select)
+        self.assertNotIn('auth_user', select)
+
+    def test_collapsed_assigned_user(self):
+        response = self.client.get('/api/task/', {'fields': 'id,assigned_user', 'expand': ''})
+        self.assertEqual(response.json()['results'], [{'id': self.task.pk, 'assigned_user': self.user.pk}])
+        response = self.client.get('/api/task/', {'fields': 'id,assigned_user'})
+        self.assertEqual(response.json()['results'][0]['assigned_user']['username'], 'alice')
+
+    def test_task_detail_fields(self):
+        url = f'/api/task/{self.task.pk}/'
+        data = self.client.get(url, {'fields': 'id,dependencies'}).json()
+        self.assertEqual(data, {'id': self.task.pk, 'dependencies': []})
+        self.assertIn('description', self.client.get(url).json())
+
+    def test_project_tasks_only_when_expanded(self):
+        url = f'/api/project/{self.project.pk}/'
+        self.assertEqual(len(self.client.get(url).json()['tasks']), 1)
+        # Two validator queries, then the project row without a tasks prefetch
+        with self.assertNumQueries(3):
+            data = self.client.get(url, {'fields': 'id,name'}).json()
+        self.assertEqual(data, {'id': self.project.pk, 'name': 'Project'})
+        data = self.client.get('/api/project/', {'expand': 'tasks'}).json()['results'][0]
+        self.assertEqual(data['tasks'][0]['assigned_user']['username'], 'alice')
+        self.assertNotIn('tasks', self.client.get('/api/project/').json()['results'][0])
+
+    def test_project_tasks_action(self):
+        url = f'/api/project/{self.project.pk}/tasks/'
+        self.assertEqual(self.client.get(url, {'fields': 'id'}).json(), [{'id': self.task.pk}])
+        self.assertIn('name', self.client.get(url).json()[0])
+
+    def test_unknown_fields(self):
+        response = self.client.get('/api/task/', {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'unknown fields: secret'})
+        response = self.client.get('/api/project/', {'expand': 'owner'})
+        self.assertEqual(response.status_code, 400)
+
+
+class IndexUsageTests(ApiTestCase):
+    """EXPLAIN shows each hot query served by its index"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username='alice')
+        self.make_board(projects=3, tasks_per_project=5)
+        self.project = Project.objects.first()
+        self.task = self.project.tasks.first()
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be scanned sequentially
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def assertUsesIndex(self, queryset, index):
+        plan = queryset.explain()
+        self.assertIn(index, plan, f'{index} not used by {queryset.query}:\n{plan}')
+
+    def test_task_queries(self):
+        since, until = date(2025, 1, 1), date(2025, 2, 1)
+        self.assertUsesIndex(Task.objects.filter(project=self.project, is_completed=False),
+                             'task_project_open_idx')
+        self.assertUsesIndex(Task.objects.filter(assigned_user=self.user, is_completed=False),
+                             'task_assignee_open_idx')
+        self.assertUsesIndex(Task.objects.filter(assigned_user=self.user, is_completed=False, priority=3),
+                             'task_assignee_open_idx')
+        self.assertUsesIndex(Task.objects.filter(priority=3), 'task_priority_idx')
+        self.assertUsesIndex(Task.objects.filter(start_date__range=(since, until)), 'task_start_date_idx')
+        self.assertUsesIndex(Task.objects.filter(end_date__range=(since, until)), 'task_end_date_idx')
+        self.assertUsesIndex(Task.objects.order_by('-updated_at', '-id')[:10], 'task_updated_id_idx')
+        # Either (project, id) or the project FK index, which SQLite keys on the rowid too
+        plan = Task.objects.filter(project=self.project).order_by('id')[:10].explain()
+        self.assertIn('INDEX', plan.upper())
+        self.assertNotIn('TEMP B-TREE', plan.upper())
+
+    def test_reverse_dependencies(self):
+        queryset = TaskDependency.objects.filter(dependent_on_task=self.task).values_list('task_id')
+        self.assertUsesIndex(queryset, 'taskdep_reverse_idx')
+
+    def test_latest_deletion(self):
+        queryset = DeletionLog.objects.filter(model__in=['task']).order_by('-deleted_at')[:1]
+        self.assertUsesIndex(queryset, 'deletionlog_model_idx')
+
+    def test_self_dependency_rejected_by_database(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            TaskDependency.objects.create(task=self.task, dependent_on_task=self.task)
+
+
+class RequestStatsTests(ApiTestCase):
+    """Per-endpoint query counts and timings from the instrumentation middleware"""
+
+    def setUp(self):
+        super().setUp()
+        request_stats.reset()
+        self.make_board(projects=2, tasks_per_project=3)
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/task/')
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        for metric in ('db;dur=', 'render;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+    def test_stats_endpoint(self):
+        project = Project.objects.first()
+        self.client.get('/api/task/')
+        self.client.get('/api/task/')
+        self.client.get(f'/api/project/{project.pk}/tasks/')
+        data = self.client.get('/api/request-stats/').json()
+        self.assertEqual(data['TaskViewSet.list']['count'], 2)
+        self.assertEqual(data['ProjectViewSet.tasks']['count'], 1)
+        self.assertEqual(set(data['TaskViewSet.list']['total_ms']), {'p50', 'p90', 'p99', 'max'})
+        self.assertGreater(data['TaskViewSet.list']['queries']['p50'], 0)
+
+    @override_settings(REQUEST_STATS_DUPLICATE_QUERY_THRESHOLD=1)
+    def test_repeated_queries_logged(self):
+        with self.assertLogs('agileflow_backend.instrumentation', 'WARNING') as logs:
+            self.client.get('/api/task/')
+        self.assertIn('TaskViewSet.list ran the same query 1 times', logs.output[0])
+
+    def test_duplicates(self):
+        recorder = QueryRecorder()
+        for sql in ['SELECT 1', 'SELECT 2', 'SELECT 2', 'SELECT 2']:
+            recorder(lambda *args: None, sql, (), False, {})
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.duplicates(3), [('SELECT 2', 3)])
+
+
+class SyntheticDataTests(ApiTestCase):
+    """The data generator and the benchmark suite built on it"""
+
+    def test_generated_dataset(self):
+        counts = DatasetGenerator(projects=3, tasks_per_project=40, users=10, seed=1).run()
+        self.assertEqual((counts['projects'], counts['tasks'], counts['users']), (3, 120, 10))
+        self.assertEqual(TaskDependency.objects.count(), counts['dependencies'])
+        # Edges only point at earlier tasks of the same project: a DAG
+        for task_id, dependent_on_id in TaskDependency.objects.values_list('task_id', 'dependent_on_task_id'):
+            self.assertGreater(task_id, dependent_on_id)
+        self.assertFalse(TaskDependency.objects.exclude(
+            task__project_id=F('dependent_on_task__project_id')).exists())
+        per_user = sorted(
+            Task.objects.filter(assigned_user__isnull=False).values('assigned_user')
+            .annotate(n=Count('id')).values_list('n', flat=True), reverse=True)
+        self.assertGreater(per_user[0], 3 * per_user[-1])
+
+    def test_same_seed_same_dataset(self):
+        DatasetGenerator(projects=1, tasks_per_project=20, users=5, seed=7).run()
+        first = list(Task.objects.order_by('id').values_list('name', 'priority', 'assigned_user__username'))
+        Task.objects.all().delete()
+        User.objects.all().delete()
+        DatasetGenerator(projects=1, tasks_per_project=20, users=5, seed=7).run()
+        second = list(Task.objects.order_by('id').values_list('name', 'priority', 'assigned_user__username'))
+        self.assertEqual(first, second)
+
+    def test_benchmark_runner(self):
+        DatasetGenerator(projects=2, tasks_per_project=10, users=3).run()
+        report = BenchmarkRunner(requests=3, warmup=1, scenarios=['task-list', 'project-tasks']).run()
+        self.assertEqual(set(report['results']), {'task-list', 'project-tasks'})
+        result = report['results']['task-list']
+        self.assertEqual(result['requests'], 3)
+        self.assertGreater(result['queries_per_request'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+        changes = compare(report, report)
+        self.assertEqual(changes['task-list']['p50_ms'], 0)
+
+
+class ProjectCounterTests(ApiTestCase):
+    """Task writes keep Project.task_count and friends in step with the tasks"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = self.make_project()
+
+    def counters(self, project=None):
+        project = Project.objects.get(pk=(project or self.project).pk)
+        return (project.task_count, project.completed_task_count, project.low_priority_count,
+                project.medium_priority_count, project.high_priority_count)
+
+    def assertConsistent(self):
+        # Nothing for a full recount to repair
+        self.assertEqual(recount_projects(), 0)
+
+    def test_project_save_keeps_concurrent_counts(self):
+        loaded = Project.objects.get(pk=self.project.pk)
+        self.make_task(self.project)
+        loaded.name = 'Renamed'
+        loaded.save()
+        self.assertEqual(self.counters()[0], 1)
+        self.assertEqual(Project.objects.get(pk=self.project.pk).name, 'Renamed')
+        self.assertConsistent()
+
+    def test_stale_task_copies_count_once(self):
+        task = self.make_task(self.project)
+        first, second, third = (Task.objects.get(pk=task.pk) for _ in range(3))
+        first.is_completed = True
+        first.save()
+        second.is_completed = True
+        second.save()
+        self.assertEqual(self.counters()[:2], (1, 1))
+        # A save that leaves is_completed alone does not write the stale value
+        third.name = 'Renamed'
+        third.save(update_fields=['name'])
+        self.assertEqual(self.counters()[:2], (1, 1))
+        self.assertConsistent()
+
+    def test_save_and_delete(self):
+        task = self.make_task(self.project, priority=1)
+        self.make_task(self.project, priority=2)
+        self.assertEqual(self.counters(), (2, 0, 1, 1, 0))
+        task.is_completed, task.priority = True, 3
+        task.save()
+        self.assertEqual(self.counters(), (2, 1, 0, 1, 1))
+        self.assertEqual(Project.objects.get(pk=self.project.pk).tasks_updated_at, task.updated_at)
+
+        other = self.make_project('Other')
+        Task.objects.get(pk=task.pk).save()  # an unchanged save is a no-op
+        task = Task.objects.get(pk=task.pk)
+        task.project = other
+        task.save()
+        self.assertEqual(self.counters(), (1, 0, 0, 1, 0))
+        self.assertEqual(self.counters(other), (1, 1, 0, 0, 1))
+        task.delete()
+        self.assertEqual(self.counters(other), (0, 0, 0, 0, 0))
+        self.assertIsNone(Project.objects.get(pk=other.pk).tasks_updated_at)
+        self.assertConsistent()
+
+    def test_bulk_endpoints(self):
+        tasks = [self.make_task(self.project) for _ in range(4)]
+        self.client.post('/api/task/bulk_create/', [
+            {'name': f'New {i}', 'start_date': '2025-01-01', 'project': self.project.pk, 'priority': 3}
+            for i in range(3)
+        ], format='json')
+        self.assertEqual(self.counters(), (7, 0, 0, 4, 3))
+        self.client.patch('/api/task/bulk_update/', {
+            'ids': [tasks[0].pk, tasks[1].pk], 'patch': {'is_completed': True, 'priority': 1},
+        }, format='json')
+        self.assertEqual(self.counters(), (7, 2, 2, 2, 3))
+        self.client.patch('/api/task/bulk_update/', [
+            {'id': tasks[2].pk, 'priority': 3}, {'id': tasks[0].pk, 'is_completed': False},
+        ], format='json')
+        self.assertEqual(self.counters(), (7, 1, 2, 1, 4))
+        self.client.post('/api/task/bulk_delete/', {'ids': [tasks[1].pk, tasks[2].pk]}, format='json')
+        self.assertEqual(self.counters(), (5, 0, 1, 1, 3))
+        self.assertConsistent()
+
+    def test_import_and_project_delete(self):
+        content = ''.join(f'T{i},2025-01-01,{self.project.pk},{i % 3 + 1}\n' for i in range(6))
+        self.client.post('/api/task/import/', {
+            'file': SimpleUploadedFile('tasks.csv', f'name,start_date,project,priority\n{content}'.encode()),
+        }, format='multipart')
+        self.assertEqual(self.counters(), (6, 0, 2, 2, 2))
+        self.assertConsistent()
+        self.project.delete()
+        self.assertConsistent()
+
+    def test_recount_repairs_drift(self):
+        self.make_task(self.project, is_completed=True)
+        untouched = self.make_project('Untouched')
+        Project.objects.filter(pk=self.project.pk).update(task_count=F('task_count') + 5,
+                                                          completed_task_count=0)
+        out = io.StringIO()
+        call_command('recount_projects', stdout=out)
+        self.assertIn('1 project(s) repaired', out.getvalue())
+        self.assertEqual(self.counters(), (1, 1, 0, 1, 0))
+        self.assertEqual(recount_projects([untouched.pk]), 0)
+
+    def test_project_list_reads_counters(self):
+        for i in range(2):
+            self.make_task(self.make_project(f'P{i}'), is_completed=bool(i))
+        small = self.count_queries('/api/project/')
+        for i in range(5):
+            self.make_task(self.make_project(f'Q{i}'))
+        cache.clear()
+        self.assertEqual(self.count_queries('/api/project/'), small)
+        rows = {row['name']: row for row in self.client.get('/api/project/').data['results']}
+        self.assertEqual((rows['P1']['task_count'], rows['P1']['completed_task_count']), (1, 1))
+
+
+@override_settings(ASGI_ASYNC_READ_VIEWS=True)
+class AsyncReadViewTests(TransactionTestCase):
+    """The ASGI application serves the async read views with the sync views' payloads"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        user = User.objects.create(username='fay')
+        self.project = Project.objects.create(name='Async', start_date=date(2025, 1, 1))
+        for i in range(12):
+            task = Task.objects.create(project=self.project, name=f'Task {i}', start_date=date(2025, 1, 1),
+                                       assigned_user=user if i % 2 else None)
+        TaskDependency.objects.create(task=task, dependent_on_task=Task.objects.first())
+
+    def asgi_get(self, path, headers=()):
+        from agileflow_backend.asgi import application
+        return asyncio.run(asgi_get(application, path, headers))
+
+    def test_payloads_match_the_sync_views(self):
+        paths = ['/api/project/', f'/api/project/{self.project.pk}/',
+                 f'/api/project/{self.project.pk}/tasks/', '/api/task/', '/api/task/?page=2',
+                 '/api/task/dependencies/', '/api/task/?page=9', '/api/project/999/',
+                 f'/api/task/?project={self.project.pk}&assigned_user=none&blocked=false',
+                 '/api/task/?priority_min=x']
+        for path in paths:
+            cache.clear()
+            expected = self.client.get(path)
+            cache.clear()
+            status, body = self.asgi_get(path)
+            self.assertEqual((status, json.loads(body)), (expected.status_code, expected.json()), path)
+
+    def test_conditional_get_and_delegation(self):
+        path = f'/api/project/{self.project.pk}/tasks/'
+        etag = self.client.get(path)['ETag']
+        self.assertEqual(self.asgi_get(path, [('if-none-match', etag)])[0], 304)
+        # Parameters only the DRF views implement are passed on to them
+        path = '/api/task/?fields=id,name&page=2'
+        status, body = self.asgi_get(path)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body), self.client.get(path).json())
+        self.assertEqual(list(json.loads(body)['results'][0]), ['id', 'name'])
+
+    def test_export_streams_asynchronously(self):
+        expected = b''.join(self.client.get('/api/project/export/').streaming_content)
+        with warnings.catch_warnings():
+            # Raised when Django has to buffer a synchronous iterator
+            warnings.simplefilter('error')
+            status, body = self.asgi_get('/api/project/export/')
+        self.assertEqual((status, body), (200, expected))
+        self.assertEqual(len(body.splitlines()), 1 + 12 + 1)
+
+    def test_change_feed_is_asgi_only(self):
+        self.assertEqual(self.asgi_get('/api/changes/?project=1,x')[0], 400)
+        self.assertEqual(self.asgi_get('/api/changes/?project=%C2%B2')[0], 400)
+        self.assertEqual(self.client.get('/api/changes/').status_code, 404)
+
+    def test_non_ascii_digit_ids_are_not_found(self):
+        self.assertEqual(self.asgi_get('/api/project/%C2%B2/')[0], 404)
+        self.assertEqual(self.asgi_get('/api/project/%C2%B2/tasks/')[0], 404)
+
+    @override_settings(ASGI_ASYNC_READ_VIEWS=False)
+    def test_async_views_are_opt_in(self):
+        path = f'/api/project/{self.project.pk}/tasks/'
+        status, body = self.asgi_get(path)
+        self.assertEqual((status, json.loads(body)), (200, self.client.get(path).json()))
+        self.assertEqual(self.asgi_get('/api/changes/')[0], 404)
+
+
+class ChangeFeedTests(ApiTestCase):
+    """Writes publish change events to the feed's subscribers once they commit"""
+
+    def received(self, callbacks, project_ids=None):
+        """Events a subscription to `project_ids` gets when the on-commit callbacks run"""
+        async def listen():
+            async with hub.subscribe(project_ids) as subscription:
+                for callback in callbacks:
+                    callback()
+                events = []
+                while (event := await subscription.get(0.01)) is not None:
+                    events.append(event)
+                return events
+        return asyncio.run(listen())
+
+    def test_task_writes_publish_on_commit(self):
+        source, target = self.make_project('Source'), self.make_project('Target')
+        with self.captureOnCommitCallbacks() as callbacks:
+            task = self.make_task(source)
+            task.project = target
+            task.save()
+            task_id = task.pk
+            task.delete()
+        events = [
+            {'type': 'task', 'action': 'created', 'id': task_id, 'project': source.pk},
+            {'type': 'task', 'action': 'updated', 'id': task_id, 'project': target.pk,
+             'previous_project': source.pk},
+            {'type': 'task', 'action': 'deleted', 'id': task_id, 'project': target.pk},
+        ]
+        self.assertEqual(self.received(callbacks), events)
+        # A task moving out of a project is still news to that project's subscribers
+        self.assertEqual(self.received(callbacks, {source.pk}), events[:2])
+        self.assertEqual(self.received(callbacks, {999}), [])
+
+    def test_bulk_patch_publishes_each_task(self):
+        project = self.make_project()
+        tasks = [self.make_task(project) for _ in range(3)]
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.patch('/api/task/bulk_update/', {
+                'ids': [task.pk for task in tasks], 'patch': {'priority': 3},
+            }, format='json')
+        self.assertEqual(
+            sorted(event['id'] for event in self.received(callbacks) if event['type'] == 'task'),
+            [task.pk for task in tasks],
+        )
+
+    @override_settings(CHANGE_FEED_MAX_EVENTS=2)
+    def test_slow_subscriber_is_told_to_resync(self):
+        project = self.make_project()
+        with self.captureOnCommitCallbacks() as callbacks:
+            for _ in range(5):
+                self.make_task(project)
+        self.assertEqual(self.received(callbacks), [RESYNC])
+
+    def test_event_stream(self):
+        project = self.make_project()
+
+        async def read():
+            stream = change_stream({project.pk})
+            ready = await anext(stream)
+            hub.deliver([{'type': 'task', 'action': 'created', 'id': 1, 'project': 999},
+                         {'type': 'task', 'action': 'created', 'id': 2, 'project': project.pk}])
+            change = await anext(stream)
+            await stream.aclose()
+            return ready, change
+
+        ready, change = asyncio.run(read())
+        self.assertTrue(ready.startswith(b'retry: 5000\nevent: ready\ndata: {"since":'))
+        self.assertEqual(change, b'event: change\ndata: {"type":"task","action":"created","id":2,'
+                                 b'"project":%d}\n\n' % project.pk)
+        self.assertEqual(hub._subscriptions, set())
+
+
+class SearchTests(ApiTestCase):
+    """?search= is answered from the full-text index, best match first"""
+
+    def setUp(self):
+        super().setUp()
+        self.project = self.make_project('Billing revamp', description='Invoices and payments')
+        self.login = self.make_task(self.project, 'Fix login redirect', description='Users land on a blank page')
+        self.mention = self.make_task(self.project, 'Write docs', description='Cover the login flow')
+        self.other = self.make_task(self.project, 'Deploy billing')
+
+    def search_ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_ranked_by_where_the_terms_appear(self):
+        self.assertEqual(self.search_ids('/api/task/?search=login'), [self.login.pk, self.mention.pk])
+        # Every term has to match, case-insensitively; stop words are ignored
+        self.assertEqual(self.search_ids('/api/task/?search=LOGIN+the+Flow'), [self.mention.pk])
+        self.assertEqual(self.search_ids('/api/task/?search=login+billing'), [])
+        self.assertEqual(self.search_ids('/api/project/?search=payments'), [self.project.pk])
+        self.assertEqual(len(self.search_ids('/api/task/?search=')), 3)
+
+    def test_paginated(self):
+        for i in range(12):
+            self.make_task(self.project, f'Login task {i}')
+        response = self.client.get('/api/task/?search=login&page=2')
+        self.assertEqual(response.data['count'], 14)
+        self.assertEqual(len(response.data['results']), 4)
+
+    def test_index_follows_writes(self):
+        self.login.name = 'Fix signup redirect'
+        self.login.save()
+        self.client.patch('/api/task/bulk_update/', {
+            'ids': [self.other.pk], 'patch': {'description': 'Needs the login fix'},
+        }, format='json')
+        self.client.post('/api/task/bulk_create/', [{
+            'name': 'Login audit', 'start_date': '2025-01-01', 'project': self.project.pk,
+        }], format='json')
+        audit = Task.objects.get(name='Login audit')
+        self.assertEqual(self.search_ids('/api/task/?search=login'),
+                         [audit.pk, self.mention.pk, self.other.pk])
+        self.mention.delete()
+        self.project.delete()
+        self.assertFalse(SearchTerm.objects.exists())
+
+    def test_object_listed_twice_is_indexed_once(self):
+        renamed = Task.objects.get(pk=self.login.pk)
+        renamed.name = 'Fix signup redirect'
+        index_objects([self.login, renamed])
+        self.assertEqual(self.search_ids('/api/task/?search=signup'), [self.login.pk])
+        self.assertEqual(self.search_ids('/api/task/?search=login'), [self.mention.pk])
+
+    def test_project_delete_unindexes_in_one_batch(self):
+        def delete(count):
+            project = self.make_project('Doomed')
+            for i in range(count):
+                self.make_task(project, f'Doomed task {i}')
+            with CaptureQueriesContext(connection) as queries:
+                self.client.delete(f'/api/project/{project.pk}/')
+            return len(queries.captured_queries)
+
+        self.assertEqual(delete(2), delete(20))
+        self.assertEqual(self.search_ids('/api/task/?search=doomed'), [])
+        self.assertEqual(DeletionLog.objects.filter(model='task').count(), 22)
+
+    def test_detail_routes_ignore_search(self):
+        response = self.client.get(f'/api/project/{self.project.pk}/tasks/?search=nothing')
+        self.assertEqual(len(response.data), 3)
+
+    def test_served_by_the_index(self):
+        index = 'task_search_idx' if connection.vendor == 'postgresql' else 'searchterm_lookup_idx'
+        plan = search(Task.objects.all(), 'login').explain()
+        self.assertIn(index, plan)
+
+    def test_rebuild_command(self):
+        SearchTerm.objects.all().delete()
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertEqual(out.getvalue().strip(), '4 row(s) indexed')
+        self.assertEqual(self.search_ids('/api/task/?search=blank'), [self.login.pk])
+
+
+class TaskFilterTests(ApiTestCase):
+    """Task list query parameters compile into the list's SQL"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create(username='dana')
+        self.project, self.other = self.make_project('One'), self.make_project('Two')
+        self.design = self.make_task(self.project, 'Design', priority=3, assigned_user=self.user,
+                                     is_completed=True, end_date=date(2025, 1, 10))
+        self.build = self.make_task(self.project, 'Build', priority=2, assigned_user=self.user,
+                                    start_date=date(2025, 2, 1), end_date=date(2025, 3, 1))
+        self.ship = self.make_task(self.project, 'Ship', priority=1, start_date=date(2025, 3, 1))
+        self.plan = self.make_task(self.other, 'Plan', priority=3)
+        TaskDependency.objects.create(task=self.build, dependent_on_task=self.design)
+        TaskDependency.objects.create(task=self.ship, dependent_on_task=self.build)
+
+    def filtered(self, params):
+        response = self.client.get(f'/api/task/?page_size=100&{params}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return {row['id'] for row in response.data['results']}
+
+    def test_filters(self):
+        cases = {
+            f'project={self.other.pk}': {self.plan.pk},
+            f'project={self.project.pk},{self.other.pk}&priority=3': {self.design.pk, self.plan.pk},
+            f'assigned_user={self.user.pk}&is_completed=false': {self.build.pk},
+            'assigned_user=none': {self.ship.pk, self.plan.pk},
+            f'assigned_user=none,{self.user.pk}&priority_max=1': {self.ship.pk},
+            'priority_min=2&priority_max=2': {self.build.pk},
+            'start_date_after=2025-02-01&start_date_before=2025-02-28': {self.build.pk},
+            'end_date_before=2025-02-01': {self.design.pk},
+            'end_date_after=2025-01-01': {self.design.pk, self.build.pk},
+            # Build's dependency is done; Ship waits on Build
+            'blocked=true': {self.ship.pk},
+            f'blocked=false&project={self.project.pk}': {self.design.pk, self.build.pk},
+            'project=&is_completed=': {self.design.pk, self.build.pk, self.ship.pk, self.plan.pk},
+        }
+        for params, expected in cases.items():
+            self.assertEqual(self.filtered(params), expected, params)
+
+    def test_combines_with_search_and_cursor_pagination(self):
+        self.assertEqual(self.filtered(f'search=build&project={self.project.pk}'), {self.build.pk})
+        self.assertEqual(self.filtered(f'pagination=cursor&project={self.other.pk}'), {self.plan.pk})
+
+    def test_invalid_values(self):
+        for params, error in [('project=1,x', 'project must be a comma-separated list of ids'),
+                              ('project=%C2%B2', 'project must be a comma-separated list of ids'),
+                              ('priority_min=high', 'priority_min must be an integer'),
+                              ('priority_min=--5', 'priority_min must be an integer'),
+                              ('is_completed=maybe', 'is_completed must be true or false'),
+                              ('end_date_before=01/02/2025', 'end_date_before must be an ISO 8601 date')]:
+            response = self.client.get(f'/api/task/?{params}')
+            self.assertEqual((response.status_code, response.json()), (400, {'error': error}))
+
+    def test_blocked_invalidates_etag_when_a_dependency_completes(self):
+        etag = self.client.get('/api/task/?blocked=true')['ETag']
+        Task.objects.filter(pk=self.build.pk).update(is_completed=True, updated_at=datetime.now(dt_timezone.utc))
+        response = self.client.get('/api/task/?blocked=true', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_one_indexed_query(self):
+        params = {'project': str(self.project.pk), 'is_completed': 'false', 'priority_min': '2'}
+        queryset = TaskFilter().filter_params(Task.objects.all(), params)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(list(queryset), [self.build])
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertIn('INDEX', queryset.explain().upper())
+
+
+class WorkloadTests(ApiTestCase):
+    """Per-user workload comes from one conditional aggregation, cached briefly"""
+
+    def setUp(self):
+        super().setUp()
+        self.alice, self.bob, self.carol = [
+            User.objects.create(username=name) for name in ('alice', 'bob', 'carol')
+        ]
+        project = self.make_project()
+        for start, end, priority, user, completed in [
+            (date(2025, 1, 1), date(2025, 1, 10), 3, self.alice, False),
+            (date(2025, 1, 12), None, 2, self.alice, False),
+            (date(2025, 1, 6), date(2025, 1, 12), 1, self.alice, True),
+            (date(2024, 12, 1), date(2099, 1, 1), 1, self.alice, False),
+            (date(2025, 1, 13), date(2025, 1, 20), 3, self.bob, False),
+            (date(2025, 1, 6), date(2025, 1, 6), 3, None, False),
+        ]:
+            self.make_task(project, start_date=start, end_date=end, priority=priority,
+                           assigned_user=user, is_completed=completed)
+        self.url = '/api/workload/?start=2025-01-06&end=2025-01-12'
+
+    def test_counts_per_user(self):
+        with self.assertNumQueries(1):
+            data = get_workload(date(2025, 1, 6), date(2025, 1, 12), date(2026, 1, 1))
+        rows = {row['username']: row for row in data['users']}
+        self.assertEqual([row['username'] for row in data['users']], ['alice', 'bob', 'carol'])
+        self.assertEqual(rows['alice']['open_tasks'], {'low': 1, 'medium': 1, 'high': 1})
+        self.assertEqual(rows['alice']['open_total'], 3)
+        self.assertEqual(rows['alice']['overdue'], 1)
+        # 6-10 Jan, 12 Jan (no end date) and the whole window
+        self.assertEqual(rows['alice']['scheduled_days'], 13)
+        self.assertEqual((rows['bob']['overdue'], rows['bob']['scheduled_days']), (1, 0))
+        self.assertEqual((rows['carol']['open_total'], rows['carol']['scheduled_days']), (0, 0))
+
+    def test_endpoint(self):
+        data = self.client.get(f'{self.url}&user={self.bob.pk},{self.carol.pk}').data
+        self.assertEqual((data['start'], data['end']), (date(2025, 1, 6), date(2025, 1, 12)))
+        self.assertEqual([row['username'] for row in data['users']], ['bob', 'carol'])
+        data = self.client.get('/api/workload/').data
+        self.assertEqual((data['end'] - data['start']).days, 6)
+
+    def test_cached_briefly(self):
+        first = self.client.get(self.url).json()
+        self.make_task(Project.objects.get(), assigned_user=self.carol)
+        self.assertEqual(self.client.get(self.url).json(), first)
+        with override_settings(WORKLOAD_CACHE_TIMEOUT=0):
+            cache.clear()
+            self.client.get(self.url)
+            data = self.client.get(self.url).json()
+        self.assertNotEqual(data, first)
+
+    def test_invalid_parameters(self):
+        for params, error in [('start=soon', 'start must be an ISO 8601 date'),
+                              ('user=me', 'user must be a comma-separated list of ids'),
+                              # Not an ASCII digit, though str.isdigit() says it is
+                              ('user=%C2%B2', 'user must be a comma-separated list of ids'),
+                              ('start=2025-02-01&end=2025-01-01', 'end must not be before start')]:
+            response = self.client.get(f'/api/workload/?{params}')
+            self.assertEqual((response.status_code, response.data), (400, {'error': error}))
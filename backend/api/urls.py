@@ -1,11 +1,25 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, ProjectViewSet, TaskViewSet
+from .views import (
+    UserViewSet,
+    ProjectViewSet,
+    TaskViewSet,
+    AnalyticsViewSet,
+    WorkloadViewSet,
+    SyncViewSet,
+    CacheStatsViewSet,
+    RequestStatsViewSet,
+)
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
 router.register(r'project', ProjectViewSet)
 router.register(r'task', TaskViewSet)
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
+router.register(r'workload', WorkloadViewSet, basename='workload')
+router.register(r'sync', SyncViewSet, basename='sync')
+router.register(r'cache-stats', CacheStatsViewSet, basename='cache-stats')
+router.register(r'request-stats', RequestStatsViewSet, basename='request-stats')
 
 urlpatterns = [
     path('', include(router.urls)),
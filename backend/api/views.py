@@ -1,46 +1,263 @@
+import hashlib
+import io
+from datetime import timedelta
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth.models import User
-from django.db.models import Count
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from agileflow_backend.instrumentation import stats as request_stats
+from .analytics import get_analytics
+from .conditional import (
+    ConditionalGetMixin,
+    project_list_validators,
+    project_tasks_validators,
+    project_validators,
+    task_list_validators,
+    task_validators,
+)
+from .counters import count_states, project_counters
+from .events import dependency_event, hub, task_event
+from .export import export_querysets, streaming_export
+from .fieldsets import FieldsetViewMixin
+from .filters import FilterError, IndexedSearchFilter, TaskFilter, is_id, parse_date, parse_ids
+from .graph import find_cycle, find_cycle_in_batch
+from .importer import IMPORT_FORMATS, RECORD_TYPES, TaskImporter, iter_records
 from .models import Project, Task, TaskDependency
+from .pagination import OptInCursorPaginationMixin, ProjectTaskCursorPagination
+from .payload_cache import (
+    DEPENDENCIES_VERSION,
+    USERS_VERSION,
+    cached_payload,
+    project_version,
+    stats as cache_stats,
+    task_version,
+)
+from .schedule import DependencyCycle, get_project_schedule
+from .search import reindex
+from .signals import deletion_batch, invalidate_project_caches, invalidate_task_payloads
+from .sync import get_changes
+from .workload import get_workload
 from .serializers import (
     UserSerializer,
     ProjectSerializer, 
     ProjectListSerializer,
     TaskSerializer, 
     TaskDetailSerializer, 
-    TaskDependencySerializer
+    TaskDependencyValuesSerializer,
+    TaskValuesSerializer,
 )
 
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class AnalyticsViewSet(viewsets.ViewSet):
+    def list(self, request):
+        """Get dashboard aggregates, optionally scoped by ?project= or ?user="""
+        scope = {}
+        for param in ('project', 'user'):
+            value = request.query_params.get(param)
+            if value is None:
+                continue
+            try:
+                scope[f'{param}_id'] = int(value)
+            except ValueError:
+                return Response({"error": f"{param} must be an integer"}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+        return Response(get_analytics(**scope))
+
+class WorkloadViewSet(viewsets.ViewSet):
+    def list(self, request):
+        """
+        Get each user's open tasks by priority, overdue tasks and scheduled
+        task-days between ?start= and ?end= (default: the coming week),
+        optionally only for the ?user= ids
+        """
+        parsed = {}
+        for param, parse in (('start', parse_date), ('end', parse_date), ('user', parse_ids)):
+            value = request.query_params.get(param)
+            try:
+                parsed[param] = parse(value) if value else None
+            except FilterError as exc:
+                return Response({"error": f"{param} {exc}"}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+        today = timezone.localdate()
+        start = parsed['start'] or today
+        end = parsed['end'] or start + timedelta(days=6)
+        user_ids = sorted(set(parsed['user'])) if parsed['user'] else None
+        if end < start:
+            return Response({"error": "end must not be before start"},
+                           status=status.HTTP_400_BAD_REQUEST)
+        key = hashlib.sha1(repr((start, end, today, user_ids)).encode()).hexdigest()
+        return Response(cached_payload(
+            'workload', key, [USERS_VERSION], lambda: get_workload(start, end, today, user_ids),
+            timeout=getattr(settings, 'WORKLOAD_CACHE_TIMEOUT', 30),
+        ))
+
+class SyncViewSet(viewsets.ViewSet):
+    def list(self, request):
+        """Get everything that changed after the ?since= watermark, a page at a time"""
+        cursor = request.query_params.get('cursor')
+        if cursor is not None:
+            try:
+                return Response(get_changes(cursor=cursor))
+            except ValueError as exc:
+                return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                return Response({"error": "since must be an ISO 8601 datetime"}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        return Response(get_changes(since))
+
+class CacheStatsViewSet(viewsets.ViewSet):
+    def list(self, request):
+        """Get this process' payload cache hit/miss counters"""
+        return Response(cache_stats.as_dict())
+
+class RequestStatsViewSet(viewsets.ViewSet):
+    def list(self, request):
+        """Get this process' per-endpoint query count and latency percentiles"""
+        return Response(request_stats.as_dict())
+
+class ProjectViewSet(ConditionalGetMixin, OptInCursorPaginationMixin, FieldsetViewMixin, 
+                     viewsets.ModelViewSet):
     queryset = Project.objects.all()
+    filter_backends = [IndexedSearchFilter]
     
     def get_serializer_class(self):
         if self.action == 'list':
             return ProjectListSerializer
         return ProjectSerializer
     
+    def get_fieldset_serializer_class(self):
+        if self.action == 'tasks':
+            return TaskValuesSerializer
+        return self.get_serializer_class()
+    
+    def get_queryset(self):
+        """Eager-load what each action's serializer reads to avoid N+1 queries"""
+        queryset = super().get_queryset()
+        if self.action in ['tasks', 'schedule']:
+            return queryset
+        fieldset = self.get_fieldset()
+        serializer_class = self.get_serializer_class()
+        if fieldset is not None and fieldset.fields is not None:
+            queryset = queryset.only(*fieldset.model_fields(Project))
+        if serializer_class.fieldset_expands(fieldset, 'tasks'):
+            queryset = queryset.prefetch_related(
+                Prefetch('tasks', queryset=Task.objects.select_related('assigned_user'))
+            )
+        return queryset
+    
+    def get_validators(self):
+        pk = self.kwargs.get('pk', '')
+        if self.action == 'list':
+            return project_list_validators(self.request)
+        if self.action == 'retrieve' and is_id(pk):
+            return project_validators(self.request, pk)
+        if self.action == 'tasks' and is_id(pk):
+            return project_tasks_validators(self.request, pk)
+        return None
+    
+    def list(self, request, *args, **kwargs):
+        return self.not_modified(request) or super().list(request, *args, **kwargs)
+    
+    def perform_destroy(self, instance):
+        # The cascaded tasks' and edges' tombstones and index rows go out together
+        with transaction.atomic(), deletion_batch():
+            instance.delete()
+    
+    def retrieve(self, request, *args, **kwargs):
+        not_modified = self.not_modified(request)
+        if not_modified:
+            return not_modified
+        if not is_id(kwargs['pk']):
+            return super().retrieve(request, *args, **kwargs)
+        return Response(cached_payload(
+            'project', self.fieldset_cache_id(kwargs['pk']), 
+            [project_version(kwargs['pk']), USERS_VERSION],
+            lambda: super(ProjectViewSet, self).retrieve(request, *args, **kwargs).data,
+        ))
+    
     @action(detail=True, methods=['get'])
     def tasks(self, request, pk=None):
         """Get all tasks for a specific project"""
+        not_modified = self.not_modified(request)
+        if not_modified:
+            return not_modified
+        fieldset = self.get_fieldset()
+        if self.use_cursor_pagination():
+            project = self.get_object()
+            rows = TaskValuesSerializer.values(Task.objects.filter(project=project), fieldset)
+            paginator = ProjectTaskCursorPagination()
+            page = paginator.paginate_queryset(rows, request, view=self)
+            return paginator.get_paginated_response(TaskValuesSerializer(page, fieldset).data)
+        
+        def build():
+            project = self.get_object()
+            rows = TaskValuesSerializer.values(Task.objects.filter(project=project), fieldset)
+            return TaskValuesSerializer(rows, fieldset).data
+        
+        if not is_id(pk):
+            return Response(build())
+        return Response(cached_payload(
+            'project-tasks', self.fieldset_cache_id(pk), [project_version(pk), USERS_VERSION], build
+        ))
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream projects, tasks and dependencies as NDJSON or CSV"""
+        querysets = export_querysets('projects', 'tasks', 'dependencies')
+        return streaming_export(request, querysets, 'projects')
+    
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        """Get earliest/latest start, slack and the critical path of a project"""
         project = self.get_object()
-        tasks = Task.objects.filter(project=project)
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        try:
+            return Response(get_project_schedule(project.pk))
+        except DependencyCycle as cycle:
+            return Response({"error": "Project dependencies contain a cycle", 
+                             "tasks": cycle.task_ids}, 
+                           status=status.HTTP_400_BAD_REQUEST)
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, OptInCursorPaginationMixin, FieldsetViewMixin, 
+                  viewsets.ModelViewSet):
     queryset = Task.objects.all()
+    filter_backends = [TaskFilter, IndexedSearchFilter]
+    # Largest batch accepted by the bulk_* actions
+    bulk_max_items = 5000
     
     def get_serializer_class(self):
         if self.action in ['retrieve', 'update', 'partial_update']:
             return TaskDetailSerializer
         return TaskSerializer
     
+    def get_queryset(self):
+        """Join the assigned user and prefetch dependency ids in bulk"""
+        queryset = super().get_queryset()
+        fieldset = self.get_fieldset()
+        if fieldset is not None and fieldset.fields is not None:
+            queryset = queryset.only(*fieldset.model_fields(Task))
+        if TaskSerializer.fieldset_expands(fieldset, 'assigned_user'):
+            queryset = queryset.select_related('assigned_user')
+        if (self.action in ['retrieve', 'update', 'partial_update'] 
+                and (fieldset is None or fieldset.includes('dependencies'))):
+            queryset = queryset.prefetch_related('dependencies')
+        return queryset
+    
     def create(self, request, *args, **kwargs):
         """Custom create method to handle task creation with proper field mapping"""
         serializer = self.get_serializer(data=request.data)
@@ -49,12 +266,305 @@ class TaskViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
     
+    def get_validators(self):
+        pk = self.kwargs.get('pk', '')
+        if self.action == 'list':
+            return task_list_validators(self.request, self.filter_queryset(self.get_queryset()))
+        if self.action == 'retrieve' and is_id(pk):
+            return task_validators(self.request, pk)
+        return None
+    
+    def list(self, request, *args, **kwargs):
+        """Serialize pages from values() rows instead of model instances"""
+        not_modified = self.not_modified(request)
+        if not_modified:
+            return not_modified
+        fieldset = self.get_fieldset()
+        rows = TaskValuesSerializer.values(self.filter_queryset(self.get_queryset()), fieldset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(TaskValuesSerializer(page, fieldset).data)
+        return Response(TaskValuesSerializer(rows, fieldset).data)
+    
+    def retrieve(self, request, *args, **kwargs):
+        not_modified = self.not_modified(request)
+        if not_modified:
+            return not_modified
+        if not is_id(kwargs['pk']):
+            return super().retrieve(request, *args, **kwargs)
+        return Response(cached_payload(
+            'task', self.fieldset_cache_id(kwargs['pk']), 
+            [task_version(kwargs['pk']), USERS_VERSION],
+            lambda: super(TaskViewSet, self).retrieve(request, *args, **kwargs).data,
+        ))
+    
+    def bulk_error(self, data):
+        """Return an error response if `data` is not a list of a sane size"""
+        if not isinstance(data, list) or not data:
+            return Response({"error": "Expected a non-empty list"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        if len(data) > self.bulk_max_items:
+            return Response({"error": f"At most {self.bulk_max_items} items per request"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        return None
+    
+    def parse_bulk_ids(self, request):
+        """Return (ids, error_response) for a body of the form {"ids": [...]}"""
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        error = self.bulk_error(ids)
+        if error:
+            return None, error
+        if not all(isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in ids):
+            return None, Response({"error": "ids must be a list of task ids"}, 
+                                  status=status.HTTP_400_BAD_REQUEST)
+        return ids, None
+    
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """Create a list of tasks in one transaction"""
+        error = self.bulk_error(request.data)
+        if error:
+            return error
+        serializer = TaskSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            tasks = serializer.save()
+        for project_id in {task.project_id for task in tasks}:
+            invalidate_project_caches(project_id)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['patch'])
+    def bulk_update(self, request):
+        """
+        Update tasks in one transaction, either from a list of partial task
+        payloads with ids, or from {"ids": [...], "patch": {...}} applying
+        the same patch to every listed task
+        """
+        if isinstance(request.data, dict):
+            return self.bulk_patch(request)
+        
+        error = self.bulk_error(request.data)
+        if error:
+            return error
+        ids = [item.get('id') if isinstance(item, dict) else None for item in request.data]
+        found = Task.objects.select_related('assigned_user').in_bulk(
+            [task_id for task_id in ids if isinstance(task_id, int)]
+        )
+        # Keyed by item index, like the errors of a many=True serializer
+        missing = {index: {"id": ["Task not found"]} 
+                   for index, task_id in enumerate(ids) if task_id not in found}
+        if missing:
+            return Response(missing, status=status.HTTP_400_BAD_REQUEST)
+        seen = set()
+        duplicates = {}
+        for index, task_id in enumerate(ids):
+            if task_id in seen:
+                duplicates[index] = {"id": ["Task listed more than once"]}
+            seen.add(task_id)
+        if duplicates:
+            return Response(duplicates, status=status.HTTP_400_BAD_REQUEST)
+        
+        tasks = [found[task_id] for task_id in ids]
+        previous_project_ids = {task.project_id for task in tasks}
+        serializer = TaskSerializer(tasks, data=request.data, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            tasks = serializer.save()
+        for project_id in previous_project_ids | {task.project_id for task in tasks}:
+            invalidate_project_caches(project_id)
+        invalidate_task_payloads([task.pk for task in tasks])
+        return Response(serializer.data)
+    
+    def bulk_patch(self, request):
+        ids, error = self.parse_bulk_ids(request)
+        if error:
+            return error
+        serializer = TaskSerializer(data=request.data.get('patch'), partial=True)
+        serializer.is_valid(raise_exception=True)
+        if not serializer.validated_data:
+            return Response({"error": "patch must change at least one field"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        with transaction.atomic():
+            tasks = Task.objects.select_for_update().filter(pk__in=ids)
+            found = dict(tasks.values_list('id', 'project_id'))
+            # The rows are locked now; GROUP BY cannot take FOR UPDATE itself
+            states = count_states(Task.objects.filter(pk__in=found))
+            # update() bypasses save(), so auto_now has to be applied by hand
+            now = timezone.now()
+            tasks.update(updated_at=now, **serializer.validated_data)
+            with project_counters() as counters:
+                counters.patch(states, serializer.validated_data, now)
+            if {'name', 'description'} & set(serializer.validated_data):
+                reindex(Task, found)
+            project = serializer.validated_data.get('project')
+            hub.publish(
+                task_event(task_id, project.pk if project else project_id, 'updated', project_id)
+                for task_id, project_id in found.items()
+            )
+        project_ids = set(found.values())
+        if 'project' in serializer.validated_data:
+            project_ids.add(serializer.validated_data['project'].pk)
+        for project_id in project_ids:
+            invalidate_project_caches(project_id)
+        invalidate_task_payloads(found)
+        return Response({
+            "updated": [task_id for task_id in ids if task_id in found],
+            "not_found": [task_id for task_id in ids if task_id not in found],
+        })
+    
+    @action(detail=False, methods=['post'])
+    def bulk_delete(self, request):
+        """Delete the tasks listed in {"ids": [...]} in one transaction"""
+        ids, error = self.parse_bulk_ids(request)
+        if error:
+            return error
+        # The rows' post_delete receivers only fill these batches
+        with transaction.atomic(), deletion_batch(), project_counters():
+            tasks = Task.objects.filter(pk__in=ids)
+            found = set(tasks.values_list('id', flat=True))
+            tasks.delete()
+        return Response({
+            "deleted": [task_id for task_id in ids if task_id in found],
+            "not_found": [task_id for task_id in ids if task_id not in found],
+        })
+    
+    def parse_edges(self, items):
+        """Return (pairs, error_response) for a list of {"task", "dependent_on_task"}"""
+        if items is None:
+            return [], None
+        if not isinstance(items, list) or len(items) > self.bulk_max_items:
+            return None, Response({"error": f"Expected a list of at most {self.bulk_max_items} edges"}, 
+                                  status=status.HTTP_400_BAD_REQUEST)
+        pairs = []
+        for item in items:
+            pair = (item.get('task'), item.get('dependent_on_task')) if isinstance(item, dict) else ()
+            if len(pair) != 2 or not all(
+                isinstance(task_id, int) and not isinstance(task_id, bool) for task_id in pair
+            ):
+                return None, Response({"error": "Each edge needs integer task and dependent_on_task"}, 
+                                      status=status.HTTP_400_BAD_REQUEST)
+            pairs.append(pair)
+        return pairs, None
+    
+    @action(detail=False, methods=['post'])
+    def bulk_dependencies(self, request):
+        """
+        Add and remove many dependencies in one transaction, from
+        {"add": [{"task": id, "dependent_on_task": id}, ...], "remove": [...]}
+        """
+        data = request.data if isinstance(request.data, dict) else {}
+        added, error = self.parse_edges(data.get('add'))
+        if error:
+            return error
+        removed, error = self.parse_edges(data.get('remove'))
+        if error:
+            return error
+        
+        self_dependent = sorted({task_id for task_id, dependent_on_id in added 
+                                 if task_id == dependent_on_id})
+        if self_dependent:
+            return Response({"error": "A task cannot depend on itself", "tasks": self_dependent}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        task_ids = {task_id for pair in added + removed for task_id in pair}
+        project_of = dict(Task.objects.filter(pk__in=task_ids).values_list('id', 'project_id'))
+        missing = sorted(task_ids - set(project_of))
+        if missing:
+            return Response({"error": "Tasks not found", "tasks": missing}, 
+                           status=status.HTTP_404_NOT_FOUND)
+        
+        # Removed edges' tombstones, cache bumps and events go out together
+        with transaction.atomic(), deletion_batch():
+            # As in add_dependency: concurrent edits of these projects wait here
+            locked = set(Project.objects.select_for_update().filter(
+                pk__in=set(project_of.values())
+            ).order_by('pk').values_list('pk', flat=True))
+            cycle = find_cycle_in_batch(set(added), set(removed), project_of, fresh=locked)
+            if cycle:
+                return Response({"error": "These dependencies would create a circular dependency", 
+                                 "cycle": cycle}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+            
+            existing = set()
+            if added:
+                existing = set(TaskDependency.objects.filter(
+                    task_id__in={task_id for task_id, _ in added},
+                    dependent_on_task_id__in={dependent_on_id for _, dependent_on_id in added},
+                ).values_list('task_id', 'dependent_on_task_id'))
+                TaskDependency.objects.bulk_create([
+                    TaskDependency(task_id=task_id, dependent_on_task_id=dependent_on_id)
+                    for task_id, dependent_on_id in added
+                ], ignore_conflicts=True, batch_size=1000)
+                # bulk_create skips the signals, and its rows have no ids
+                hub.publish(
+                    dependency_event(None, task_id, dependent_on_id, project_of[task_id], 'created')
+                    for task_id, dependent_on_id in added if (task_id, dependent_on_id) not in existing
+                )
+            
+            removed_pairs = set()
+            if removed:
+                condition = Q()
+                for task_id, dependent_on_id in removed:
+                    condition |= Q(task_id=task_id, dependent_on_task_id=dependent_on_id)
+                removable = TaskDependency.objects.filter(condition)
+                removed_pairs = set(removable.values_list('task_id', 'dependent_on_task_id'))
+                removable.delete()
+        
+        if added:
+            for project_id in {project_of[task_id] for task_id, _ in added}:
+                invalidate_project_caches(project_id)
+            invalidate_task_payloads({task_id for task_id, _ in added}, dependencies=True)
+        
+        def as_edges(pairs):
+            return [{"task": t, "dependent_on_task": d} for t, d in pairs]
+        
+        return Response({
+            "added": as_edges(pair for pair in added if pair not in existing),
+            "existing": as_edges(pair for pair in added if pair in existing),
+            "removed": as_edges(pair for pair in removed if pair in removed_pairs),
+            "not_found": as_edges(pair for pair in removed if pair not in removed_pairs),
+        })
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream tasks and their dependencies as NDJSON or CSV"""
+        querysets = export_querysets('tasks', 'dependencies')
+        return streaming_export(request, querysets, 'tasks')
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_tasks(self, request):
+        """
+        Stream an uploaded NDJSON or CSV `file` of projects, tasks and
+        dependencies into the database and report per-row errors
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "file is required"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        default_format = 'csv' if upload.name.endswith('.csv') else 'ndjson'
+        file_format = request.data.get('file_format', default_format)
+        record_type = request.data.get('type', 'task')
+        if file_format not in IMPORT_FORMATS or record_type not in RECORD_TYPES:
+            return Response({"error": "Unsupported file_format or type"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        stream = io.TextIOWrapper(upload, encoding='utf-8', newline='')
+        try:
+            report = TaskImporter().run(iter_records(stream, file_format, record_type))
+        except UnicodeDecodeError:
+            return Response({"error": "file must be UTF-8 encoded"}, 
+                           status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+    
     @action(detail=False, methods=['get'])
     def dependencies(self, request):
         """Get all task dependencies"""
-        dependencies = TaskDependency.objects.all()
-        serializer = TaskDependencySerializer(dependencies, many=True)
-        return Response(serializer.data)
+        def build():
+            rows = TaskDependencyValuesSerializer.values(TaskDependency.objects.all())
+            return TaskDependencyValuesSerializer(rows).data
+        
+        return Response(cached_payload('dependencies', 'all', [DEPENDENCIES_VERSION], build))
     
     @action(detail=True, methods=['post'])
     def add_dependency(self, request, pk=None):
@@ -77,10 +587,22 @@ class TaskViewSet(viewsets.ModelViewSet):
             return Response({"error": "A task cannot depend on itself"}, 
                            status=status.HTTP_400_BAD_REQUEST)
         
-        dependency, created = TaskDependency.objects.get_or_create(
-            task=task, 
-            dependent_on_task=dependent_task
-        )
+        with transaction.atomic():
+            # Concurrent edits of these projects' edges wait here, so two
+            # requests cannot each pass the check and together close a cycle
+            locked = set(Project.objects.select_for_update().filter(
+                pk__in={task.project_id, dependent_task.project_id}
+            ).order_by('pk').values_list('pk', flat=True))
+            cycle = find_cycle(task, dependent_task, fresh=locked)
+            if cycle:
+                return Response({"error": "This dependency would create a circular dependency", 
+                                 "cycle": cycle}, 
+                               status=status.HTTP_400_BAD_REQUEST)
+            
+            dependency, created = TaskDependency.objects.get_or_create(
+                task=task, 
+                dependent_on_task=dependent_task
+            )
         
         if created:
             return Response({"message": "Dependency added successfully"}, 
@@ -0,0 +1,51 @@
+from django.contrib.auth.models import User
+from django.db.models import Count, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import Task
+
+PRIORITY_KEYS = {value: label.lower() for value, label in Task.PRIORITY_CHOICES}
+
+
+def get_workload(start, end, today, user_ids=None):
+    """
+    Each user's open tasks by priority, how many are overdue on `today`,
+    and the task-days they have scheduled between `start` and `end`
+    (inclusive), in one query. Open tasks are joined to users through the
+    partial assignee index with the condition in the ON clause, so
+    completed tasks are never read and idle users still get a row.
+    A task without an end date is scheduled on its start date only.
+    """
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    task_end = Coalesce('open_tasks__end_date', 'open_tasks__start_date')
+    in_window = (
+        Q(open_tasks__start_date__lte=end, open_tasks__end_date__gte=start)
+        | Q(open_tasks__end_date__isnull=True, open_tasks__start_date__range=(start, end))
+    )
+    rows = users.annotate(
+        open_tasks=FilteredRelation('assigned_tasks', condition=Q(assigned_tasks__is_completed=False)),
+    ).order_by().values('id', 'username', 'first_name', 'last_name').annotate(
+        open_total=Count('open_tasks'),
+        overdue=Count('open_tasks', filter=Q(open_tasks__end_date__lt=today)),
+        # Days of overlap, less one per task; the Count below adds those back
+        window_span=Sum(
+            Least(task_end, Value(end)) - Greatest('open_tasks__start_date', Value(start)),
+            filter=in_window,
+        ),
+        window_tasks=Count('open_tasks', filter=in_window),
+        **{
+            f'open_{key}': Count('open_tasks', filter=Q(open_tasks__priority=value))
+            for value, key in PRIORITY_KEYS.items()
+        },
+    )
+    workload = []
+    for row in rows:
+        span = row.pop('window_span')
+        row['scheduled_days'] = (span.days if span else 0) + row.pop('window_tasks')
+        row['open_tasks'] = {key: row.pop(f'open_{key}') for key in PRIORITY_KEYS.values()}
+        workload.append(row)
+    # Most loaded first
+    workload.sort(key=lambda row: (-row['scheduled_days'], -row['open_total'], row['id']))
+    return {'start': start, 'end': end, 'users': workload}
@@ -33,6 +33,23 @@ export const updateTask = (id, task) => api.put(`/task/${id}/`, task);
 export const deleteTask = (id) => api.delete(`/task/${id}/`);
 export const markTaskComplete = (id) => api.patch(`/task/${id}/`, { is_completed: true });
 export const markTaskIncomplete = (id) => api.patch(`/task/${id}/`, { is_completed: false });
+export const bulkCreateTasks = (tasks) => api.post('/task/bulk_create/', tasks);
+export const bulkUpdateTasks = (tasks) => api.patch('/task/bulk_update/', tasks);
+export const bulkPatchTasks = (ids, patch) => api.patch('/task/bulk_update/', { ids, patch });
+export const bulkDeleteTasks = (ids) => api.post('/task/bulk_delete/', { ids });
+export const importTasks = (file) => {
+    const data = new FormData();
+    data.append('file', file);
+    return api.post('/task/import/', data, { headers: { 'Content-Type': 'multipart/form-data' } });
+};
+
+// API function for dashboard analytics (optionally scoped by { project, user })
+export const getAnalytics = (params) => api.get('/analytics/', { params });
+
+// API function for delta sync: pass the previous sync's watermark as `since`,
+// then the response's `next` cursor as `cursor` until it is null
+export const getChanges = (since, cursor) =>
+  api.get('/sync/', { params: cursor ? { cursor } : since ? { since } : {} });
 
 // API function for Task Dependencies
 export const getDependencies = () => api.get('/task/dependencies/');
@@ -44,3 +61,6 @@ export const removeDependency = (taskId, depTaskId) =>
     api.delete(`/task/${taskId}/remove_dependency/`, {
         params: { dependentOnTaskId: depTaskId }
     });
+// add/remove: arrays of { task, dependent_on_task }
+export const bulkEditDependencies = (add = [], remove = []) =>
+    api.post('/task/bulk_dependencies/', { add, remove });
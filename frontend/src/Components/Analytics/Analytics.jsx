@@ -1,16 +1,17 @@
 import React, { useState, useEffect } from 'react';
-import { getProjects, getTasks } from '../../ApiService';
+import { getAnalytics } from '../../ApiService';
 import './Analytics.css';
 
 const Analytics = ({ showToast }) => {
     const [projects, setProjects] = useState([]);
-    const [tasks, setTasks] = useState([]);
     const [loading, setLoading] = useState(true);
     const [stats, setStats] = useState({
         totalProjects: 0,
         completedProjects: 0,
         totalTasks: 0,
         completedTasks: 0,
+        projectCompletionRate: 0,
+        taskCompletionRate: 0,
         tasksDistribution: {
             todo: 0,
             inProgress: 0,
@@ -30,21 +31,26 @@ const Analytics = ({ showToast }) => {
             try {
                 setLoading(true);
                 
-                const [projectsResponse, tasksResponse] = await Promise.all([
-                    getProjects(),
-                    getTasks()
-                ]);
+                // Aggregates are computed server-side over all projects and tasks
+                const { data } = await getAnalytics();
 
-                // Parse the data based on Django REST Framework format
-                const projectsData = projectsResponse.data?.results || 
-                    (Array.isArray(projectsResponse.data) ? projectsResponse.data : []);
-                
-                const tasksData = tasksResponse.data?.results || 
-                    (Array.isArray(tasksResponse.data) ? tasksResponse.data : []);
-
-                setProjects(projectsData);
-                setTasks(tasksData);
-                calculateStats(projectsData, tasksData);
+                setProjects(data.projects || []);
+                setStats({
+                    totalProjects: data.total_projects,
+                    completedProjects: data.completed_projects,
+                    totalTasks: data.total_tasks,
+                    completedTasks: data.completed_tasks,
+                    projectCompletionRate: data.project_completion_rate,
+                    taskCompletionRate: data.task_completion_rate,
+                    tasksDistribution: {
+                        todo: data.status_distribution.todo,
+                        inProgress: data.status_distribution.in_progress,
+                        review: 0, // We could add a 'status' field to tasks model for this
+                        completed: data.status_distribution.completed,
+                        blocked: 0 // This would also require a 'status' field
+                    },
+                    priorityDistribution: data.priority_distribution
+                });
             } catch (error) {
                 console.error('Error fetching analytics data:', error);
                 showToast('Failed to load analytics data', 'error');
@@ -56,41 +62,6 @@ const Analytics = ({ showToast }) => {
         fetchData();
     }, [showToast]);
 
-    const calculateStats = (projects, tasks) => {
-        // Calculate project stats
-        const totalProjects = projects.length;
-        const completedProjects = projects.filter(p => p.is_completed).length;
-
-        // Calculate task stats
-        const totalTasks = tasks.length;
-        const completedTasks = tasks.filter(t => t.is_completed).length;
-
-        // Task status distribution (based on our model)
-        const tasksDistribution = {
-            todo: tasks.filter(t => !t.is_completed && !t.start_date).length,
-            inProgress: tasks.filter(t => !t.is_completed && t.start_date && !t.end_date).length,
-            review: 0, // We could add a 'status' field to tasks model for this
-            completed: completedTasks,
-            blocked: 0 // This would also require a 'status' field
-        };
-
-        // Priority distribution
-        const priorityDistribution = {
-            low: tasks.filter(t => t.priority === 1).length,
-            medium: tasks.filter(t => t.priority === 2).length,
-            high: tasks.filter(t => t.priority === 3).length
-        };
-
-        setStats({
-            totalProjects,
-            completedProjects,
-            totalTasks,
-            completedTasks,
-            tasksDistribution,
-            priorityDistribution
-        });
-    };
-
     if (loading) {
         return (
             <div className="loading-container">
@@ -101,13 +72,7 @@ const Analytics = ({ showToast }) => {
         );
     }
 
-    const projectCompletionRate = stats.totalProjects > 0 
-        ? Math.round((stats.completedProjects / stats.totalProjects) * 100) 
-        : 0;
-        
-    const taskCompletionRate = stats.totalTasks > 0 
-        ? Math.round((stats.completedTasks / stats.totalTasks) * 100) 
-        : 0;
+    const { projectCompletionRate, taskCompletionRate } = stats;
 
     return (
         <div className="analytics-container">
@@ -306,10 +271,7 @@ const Analytics = ({ showToast }) => {
                                 </thead>
                                 <tbody>
                                     {projects.map(project => {
-                                        const projectTasks = tasks.filter(t => t.project === project.id);
-                                        const completedTasks = projectTasks.filter(t => t.is_completed).length;
-                                        const taskCount = projectTasks.length;
-                                        const completion = taskCount > 0 ? Math.round((completedTasks / taskCount) * 100) : 0;
+                                        const { completed_tasks: completedTasks, task_count: taskCount, completion } = project;
                                         
                                         return (
                                             <tr key={project.id}>
@@ -397,7 +397,8 @@ const TaskDependenciesGraph = ({ showToast }) => {
       })
       .catch(err => {
         console.error("Error adding dependency:", err);
-        setError("Failed to add dependency. It may already exist or there might be a circular dependency.");
+        setError(err.response?.data?.error ||
+          "Failed to add dependency. It may already exist or there might be a circular dependency.");
       });
   };
     // Handle removing a dependency